@@ -0,0 +1,181 @@
+"""
+Benchmark cases of the handler hot paths. A case prepares its input from a size in setup, only
+the call returned by setup is measured.
+"""
+
+import base64
+import io
+import typing as t
+
+from docx import Document
+
+from benchmarks import generators
+from xfilios import compression, xlsx
+from xfilios.compression import CompressionPolicy
+from xfilios.docx import DocxHandler, LazyDocxHandler
+from xfilios.excel import ExcelHandler
+from xfilios.html import create_download_link
+from xfilios.table import TableHandler
+from xfilios.tabular import ArrowHandler, CsvHandler, ParquetHandler
+
+ROWS = [1_000, 10_000, 100_000, 1_000_000]
+PAGES = [1, 10, 100, 500]
+
+
+class Case(t.NamedTuple):
+    """A benchmark case, setup(size) returns the function to measure"""
+
+    name: str
+    unit: str
+    sizes: t.List[int]
+    setup: t.Callable[[int], t.Callable[[], t.Any]]
+    # Largest size per preset when lower than the limit of the unit in the preset
+    limits: t.Optional[t.Dict[str, int]] = None
+
+
+def _table(rows: int) -> TableHandler:
+    return TableHandler.from_records(generators.records(rows), None, "Sheet")
+
+
+def _xlsx_bytes(rows: int) -> bytes:
+    """Workbook of the size, written with the native writer to keep the setup fast"""
+    output = io.BytesIO()
+    table = _table(rows)
+    xlsx.write_workbook(output, ["Sheet"], xlsx.render_sheets([table]))
+    return output.getvalue()
+
+
+def from_records(rows: int):
+    data = generators.records(rows)
+    return lambda: TableHandler.from_records(data, None, "Sheet")
+
+
+def from_list(rows: int):
+    data = generators.rows(rows)
+    return lambda: TableHandler.from_list(data, generators.COLUMNS, "Sheet")
+
+
+def from_file_like(engine: str):
+    def setup(rows: int):
+        content = _xlsx_bytes(rows)
+        return lambda: TableHandler.from_file_like(io.BytesIO(content), engine=engine)
+
+    return setup
+
+
+def excel_to_bytes(compression: t.Optional[CompressionPolicy] = None, **options):
+    def setup(rows: int):
+        handler = ExcelHandler([_table(rows)], compression=compression)
+        return lambda: handler.to_bytes(**options)
+
+    return setup
+
+
+def tabular_to_bytes(handler: t.Type):
+    def setup(rows: int):
+        return handler(_table(rows)).to_bytes
+
+    return setup
+
+
+def tabular_read(handler: t.Type, filetype: str):
+    def setup(rows: int):
+        content = handler(_table(rows)).to_bytes()
+        return lambda: TableHandler.from_format(io.BytesIO(content), filetype)
+
+    return setup
+
+
+def docx_from_base64(pages: int):
+    encoded = base64.b64encode(generators.docx_bytes(pages)).decode("utf-8")
+    return lambda: DocxHandler.from_base64(encoded, "bench.docx")
+
+
+def docx_to_byte(compression: t.Optional[CompressionPolicy] = None):
+    def setup(pages: int):
+        handler = DocxHandler(generators.document(pages), "bench.docx", compression=compression)
+        return handler.to_byte
+
+    return setup
+
+
+def docx_get_stat(pages: int):
+    handler = DocxHandler(generators.document(pages), "bench.docx")
+    return handler.get_stat
+
+
+def docx_to_table_handlers(pages: int):
+    content = generators.docx_bytes(pages)
+    return lambda: LazyDocxHandler(content, "bench.docx").to_table_handlers()
+
+
+def docx_add_table(rows: int):
+    table = _table(rows)
+    return lambda: DocxHandler(Document(), "bench.docx").add_table(table)
+
+
+def docx_add_table_cells(rows: int):
+    """Baseline filling a python-docx table row by row and cell by cell"""
+    values = _table(rows).get_data_as_dataframe().astype(str).values.tolist()
+
+    def call():
+        table = Document().add_table(rows=1, cols=len(generators.COLUMNS))
+        for cell, name in zip(table.rows[0].cells, generators.COLUMNS):
+            cell.text = name
+        for row in values:
+            for cell, text in zip(table.add_row().cells, row):
+                cell.text = text
+        return table
+
+    return call
+
+
+def download_link(pages: int):
+    encoded = base64.b64encode(generators.docx_bytes(pages)).decode("utf-8")
+    return lambda: create_download_link(encoded, "bench.docx", "docx")
+
+
+CASES = [
+    Case("table.from_records", "rows", ROWS, from_records),
+    Case("table.from_list", "rows", ROWS, from_list),
+    Case("table.from_file_like[openpyxl]", "rows", ROWS, from_file_like("openpyxl")),
+    Case("table.from_file_like[fast]", "rows", ROWS, from_file_like("fast")),
+    Case("excel.to_bytes", "rows", ROWS, excel_to_bytes()),
+    Case("excel.to_bytes[streaming]", "rows", ROWS, excel_to_bytes(streaming=True)),
+    Case("excel.to_bytes[xlsxwriter]", "rows", ROWS, excel_to_bytes(engine="xlsxwriter")),
+    Case("excel.to_bytes[native]", "rows", ROWS, excel_to_bytes(engine="native")),
+    Case(
+        "excel.to_bytes[native,stored]",
+        "rows",
+        ROWS,
+        excel_to_bytes(compression.STORED, engine="native"),
+    ),
+    Case(
+        "excel.to_bytes[native,fast]",
+        "rows",
+        ROWS,
+        excel_to_bytes(compression.FAST, engine="native"),
+    ),
+    Case(
+        "excel.to_bytes[native,smallest]",
+        "rows",
+        ROWS,
+        excel_to_bytes(compression.SMALLEST, engine="native"),
+    ),
+    Case("csv.to_bytes", "rows", ROWS, tabular_to_bytes(CsvHandler)),
+    Case("csv.read", "rows", ROWS, tabular_read(CsvHandler, "csv")),
+    Case("parquet.to_bytes", "rows", ROWS, tabular_to_bytes(ParquetHandler)),
+    Case("parquet.read", "rows", ROWS, tabular_read(ParquetHandler, "parquet")),
+    Case("arrow.to_bytes", "rows", ROWS, tabular_to_bytes(ArrowHandler)),
+    Case("arrow.read", "rows", ROWS, tabular_read(ArrowHandler, "arrow")),
+    Case("docx.from_base64", "pages", PAGES, docx_from_base64),
+    Case("docx.to_byte", "pages", PAGES, docx_to_byte()),
+    Case("docx.to_byte[stored]", "pages", PAGES, docx_to_byte(compression.STORED)),
+    Case("docx.to_byte[smallest]", "pages", PAGES, docx_to_byte(compression.SMALLEST)),
+    Case("docx.get_stat", "pages", PAGES, docx_get_stat),
+    Case("docx.to_table_handlers", "pages", PAGES, docx_to_table_handlers),
+    Case("docx.add_table", "rows", ROWS, docx_add_table),
+    # Grows quadratic with the rows, 100k rows take many minutes and only run in the full preset
+    Case("docx.add_table[cells]", "rows", ROWS[:3], docx_add_table_cells, limits={"default": 10_000}),
+    Case("html.create_download_link", "pages", PAGES, download_link),
+]
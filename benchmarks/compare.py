@@ -0,0 +1,62 @@
+"""
+Compare two benchmark result files
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/head.json
+
+Prints the ratio head/base of the median wall time, the peak RSS and the peak allocations of
+every case and size present in both files. Exits with 1 when a wall time ratio exceeds the
+threshold.
+"""
+
+import argparse
+import json
+import sys
+import typing as t
+
+METRICS = ["wall_median", "peak_rss", "peak_alloc"]
+
+
+def load(path: str) -> t.Dict[t.Tuple[str, int], t.Dict]:
+    with open(path) as file:
+        results = json.load(file)["results"]
+    return {(result["case"], result["size"]): result for result in results if "error" not in result}
+
+
+def compare(base: t.Dict, head: t.Dict) -> t.List[t.Dict]:
+    """Ratios head/base of every metric for the keys of both results"""
+    rows = []
+    for key in sorted(set(base) & set(head)):
+        row = {"case": key[0], "size": key[1]}
+        for metric in METRICS:
+            before, after = base[key][metric], head[key][metric]
+            row[metric] = after / before if before else float("nan")
+        rows.append(row)
+    return rows
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed relative slow down, 0.2 is 20%%"
+    )
+    args = parser.parse_args(argv)
+
+    rows = compare(load(args.base), load(args.head))
+    regressions = 0
+    print(f"{'case':<34} {'size':>9} {'time':>7} {'rss':>7} {'alloc':>7}")
+    for row in rows:
+        flag = ""
+        if row["wall_median"] > 1 + args.threshold:
+            regressions += 1
+            flag = "  <- slower"
+        print(
+            f"{row['case']:<34} {row['size']:>9} "
+            f"{row['wall_median']:>6.2f}x {row['peak_rss']:>6.2f}x {row['peak_alloc']:>6.2f}x{flag}"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
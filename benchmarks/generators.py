@@ -0,0 +1,74 @@
+"""
+Deterministic synthetic inputs for the benchmarks, the same size always produces the same data
+"""
+
+import datetime
+import io
+import random
+import typing as t
+
+from docx import Document
+
+CATEGORIES = ["Spam", "Eggs", "Bacon", "Beans", "Sausage"]
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua"
+).split()
+COLUMNS = ["id", "name", "amount", "created", "flag", "category"]
+PARAGRAPHS_PER_PAGE = 8
+TABLE_ROWS_PER_PAGE = 5
+
+
+def records(rows: int, seed: int = 0) -> t.List[t.Dict]:
+    """Records with int, str, float, datetime, bool and low cardinality str values"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2021, 1, 1)
+    return [
+        {
+            "id": index,
+            "name": f"customer-{rng.randrange(rows)}",
+            "amount": round(rng.uniform(0, 10_000), 2),
+            "created": start + datetime.timedelta(minutes=rng.randrange(525_600)),
+            "flag": rng.random() < 0.5,
+            "category": rng.choice(CATEGORIES),
+        }
+        for index in range(rows)
+    ]
+
+
+def rows(count: int, seed: int = 0) -> t.List[t.Tuple]:
+    """Same data as records as list of tuples in COLUMNS order"""
+    return [tuple(record.values()) for record in records(count, seed)]
+
+
+def sentence(rng: random.Random, words: int = 40) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def document(pages: int, seed: int = 0):
+    """
+    python-docx Document of roughly the given number of pages, every page has a heading,
+    paragraphs, a small table and ends with a page break
+    """
+    rng = random.Random(seed)
+    doc = Document()
+    for page in range(pages):
+        doc.add_heading(f"Section {page + 1}", level=1)
+        for _ in range(PARAGRAPHS_PER_PAGE):
+            doc.add_paragraph(sentence(rng))
+        table = doc.add_table(rows=1, cols=3)
+        for cell, text in zip(table.rows[0].cells, ["Qty", "Id", "Desc"]):
+            cell.text = text
+        for _ in range(TABLE_ROWS_PER_PAGE):
+            cells = table.add_row().cells
+            cells[0].text = str(rng.randrange(100))
+            cells[1].text = str(rng.randrange(1000))
+            cells[2].text = sentence(rng, 4)
+        doc.add_page_break()
+    return doc
+
+
+def docx_bytes(pages: int, seed: int = 0) -> bytes:
+    output = io.BytesIO()
+    document(pages, seed).save(output)
+    return output.getvalue()
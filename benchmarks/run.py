@@ -0,0 +1,173 @@
+"""
+Run the benchmark cases and save the results as JSON
+
+    python -m benchmarks.run --preset quick --output benchmarks/results/quick.json
+
+Every case and size runs in a fresh process so the peak RSS of one case does not leak into the
+next. The call is timed `repeat` times without tracing, then once more under tracemalloc to
+record the allocations.
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import multiprocessing
+import platform
+import queue
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+import typing as t
+
+PRESETS = {
+    "quick": {"rows": 10_000, "pages": 10},
+    "default": {"rows": 100_000, "pages": 100},
+    "full": {"rows": 1_000_000, "pages": 500},
+}
+# Seconds a single case may run, and seconds between the checks of the child process
+TIMEOUT = 3600.0
+POLL_INTERVAL = 1.0
+
+
+def peak_rss() -> int:
+    """Peak resident set size of the current process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(name: str, size: int, repeat: int) -> t.Dict:
+    """Measure a single case and size, run inside the child process"""
+    from benchmarks.cases import CASES
+
+    case = next(case for case in CASES if case.name == name)
+    call = case.setup(size)
+    rss_before = peak_rss()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = call()
+        timings.append(time.perf_counter() - start)
+    rss_after = peak_rss()
+    tracemalloc.start()
+    call()
+    _, peak_alloc = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    return {
+        "case": name,
+        "size": size,
+        "unit": case.unit,
+        "repeat": repeat,
+        "wall_min": min(timings),
+        "wall_median": statistics.median(timings),
+        "peak_rss": rss_after,
+        "peak_rss_setup": rss_before,
+        "peak_alloc": peak_alloc,
+        "alloc_blocks": blocks,
+        "output_bytes": len(value) if isinstance(value, (bytes, str)) else None,
+    }
+
+
+def _child(name: str, size: int, repeat: int, queue) -> None:
+    try:
+        queue.put(measure(name, size, repeat))
+    except Exception as e:  # pragma: no cover
+        queue.put({"case": name, "size": size, "error": repr(e)})
+
+
+def run_isolated(name: str, size: int, repeat: int, timeout: float = TIMEOUT) -> t.Dict:
+    """
+    Measure a case in a new interpreter. A child killed e.g. by the OOM killer, or running longer
+    than timeout seconds, is recorded as failed case instead of blocking the run
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_child, args=(name, size, repeat, results))
+    process.start()
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if not process.is_alive():
+                # The result may still be in the pipe when the child has just exited
+                try:
+                    result = results.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    error = f"process exited with code {process.exitcode}"
+                    result = {"case": name, "size": size, "error": error}
+            elif time.monotonic() > deadline:
+                process.terminate()
+                error = f"timed out after {timeout:.0f} s"
+                result = {"case": name, "size": size, "error": error}
+    process.join()
+    return result
+
+
+def metadata() -> t.Dict:
+    import docx
+    import openpyxl
+    import pandas
+
+    import xfilios
+
+    return {
+        "xfilios": xfilios.VERSION,
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "openpyxl": openpyxl.__version__,
+        "python-docx": getattr(docx, "__version__", "unknown"),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> int:
+    from benchmarks.cases import CASES
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--case", action="append", help="Glob of the cases to run, e.g. 'docx.*'")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Path of the JSON result file")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="Seconds per case")
+    args = parser.parse_args(argv)
+
+    limits = PRESETS[args.preset]
+    results = []
+    for case in CASES:
+        if args.case and not any(fnmatch.fnmatch(case.name, pattern) for pattern in args.case):
+            continue
+        limit = min(limits[case.unit], (case.limits or {}).get(args.preset, limits[case.unit]))
+        for size in case.sizes:
+            if size > limit:
+                continue
+            result = run_isolated(case.name, size, args.repeat, args.timeout)
+            results.append(result)
+            if "error" in result:
+                print(f"{case.name:<34} {size:>9} {case.unit:<5} ERROR {result['error']}")
+                continue
+            print(
+                f"{case.name:<34} {size:>9} {case.unit:<5} "
+                f"{result['wall_median'] * 1000:>10.1f} ms "
+                f"{result['peak_rss'] / 1024 ** 2:>8.1f} MB rss "
+                f"{result['peak_alloc'] / 1024 ** 2:>8.1f} MB alloc"
+                + (
+                    f" {result['output_bytes'] / 1024:>10.1f} KB out"
+                    if result["output_bytes"] is not None
+                    else ""
+                )
+            )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"meta": metadata(), "preset": args.preset, "results": results}, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
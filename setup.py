@@ -14,6 +14,7 @@ setup(
     package_dir={"": "src"},
     packages=find_packages(where="src"),
     install_requires=SetupConfig.get_install_requirements(),
+    extras_require={"xlsxwriter": ["xlsxwriter"], "arrow": ["pyarrow"]},
     license="MIT",
     license_files=("LICENSE",),
     keywords="FileIO, Docx, Excel, Streamlit, Dash",
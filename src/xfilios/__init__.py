@@ -1 +1,55 @@
+"""
+Docx, Excel, csv, parquet and arrow file handlers. The handlers are exported lazily, the module
+of a handler and its dependencies (pandas, python-docx, openpyxl, pyarrow) are imported when the
+handler is first accessed, e.g. xfilios.LazyDocxHandler does not import pandas.
+"""
+
+import importlib
+import typing as t
+
 VERSION = "0.0.4"
+
+# Exported name -> module defining it
+_EXPORTS = {
+    "DocxHandler": "docx",
+    "LazyDocxHandler": "docx",
+    "ExcelHandler": "excel",
+    "TableHandler": "table",
+    "LazyTableHandler": "table",
+    "CsvHandler": "tabular",
+    "ParquetHandler": "tabular",
+    "ArrowHandler": "tabular",
+    "Schema": "schema",
+    "Column": "schema",
+    "ConversionCache": "cache",
+    "CompressionPolicy": "compression",
+    "convert_many": "batch",
+    "FileTypeError": "exceptions",
+    "DocxHandlerError": "exceptions",
+    "TableHandlerError": "exceptions",
+}
+
+__all__ = ["VERSION", *_EXPORTS]
+
+if t.TYPE_CHECKING:
+    from .batch import convert_many
+    from .cache import ConversionCache
+    from .compression import CompressionPolicy
+    from .docx import DocxHandler, LazyDocxHandler
+    from .exceptions import DocxHandlerError, FileTypeError, TableHandlerError
+    from .excel import ExcelHandler
+    from .schema import Column, Schema
+    from .table import LazyTableHandler, TableHandler
+    from .tabular import ArrowHandler, CsvHandler, ParquetHandler
+
+
+def __getattr__(name: str) -> t.Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> t.List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
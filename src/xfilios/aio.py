@@ -0,0 +1,119 @@
+"""
+Offloading of the blocking conversions to an executor shared by every handler, so that they can
+be awaited from an asyncio event loop without stalling it. asyncio and the executors are only
+imported once a conversion is awaited.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import threading
+import typing as t
+import weakref
+
+if t.TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Executor
+
+T = t.TypeVar("T")
+
+_lock = threading.Lock()
+_executor: t.Optional[Executor] = None
+_owned = False
+_max_workers: t.Optional[int] = None
+_max_concurrency: t.Optional[int] = None
+_semaphores: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]"
+) = weakref.WeakKeyDictionary()
+
+
+def configure(
+    executor: t.Optional[Executor] = None,
+    max_workers: t.Optional[int] = None,
+    max_concurrency: t.Optional[int] = None,
+) -> None:
+    """
+    Configure the executor used by the async methods of the handlers
+    :param executor: Executor to run the conversions in, by default a thread pool owned by xfilios.
+        A process pool can be used as long as the handlers and their arguments can be pickled
+    :param max_workers: Size of the default thread pool, ignored when an executor is given
+    :param max_concurrency: Maximum number of conversions running at once per event loop, the
+        others wait without holding a worker. Unbounded if not provided
+    """
+    global _executor, _owned, _max_workers, _max_concurrency
+    with _lock:
+        previous, owned = _executor, _owned
+        _executor, _owned = executor, False
+        _max_workers = max_workers
+        _max_concurrency = max_concurrency
+        _semaphores.clear()
+    if owned and previous is not None:
+        previous.shutdown(wait=False)
+
+
+def get_executor() -> Executor:
+    """The configured executor, the default thread pool is created on first use"""
+    global _executor, _owned
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers, thread_name_prefix="xfilios"
+            )
+            _owned = True
+        return _executor
+
+
+def shutdown(wait: bool = True) -> None:
+    """Shut down the default thread pool, a configured executor is left to its owner"""
+    global _executor, _owned
+    with _lock:
+        executor, owned = _executor, _owned
+        _executor, _owned = None, False
+    if owned and executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run(func: t.Callable[..., T], *args: t.Any, **kwargs: t.Any) -> T:
+    """
+    Run a blocking function in the shared executor and wait for its result. When the awaiting
+    task is cancelled, the call is dropped if it has not started yet, a call already running
+    completes in the background and its result is discarded
+    :param func: Function to run
+    :return: The return value of the function, its exception is raised as is
+    """
+    semaphore = _get_semaphore()
+    if semaphore is None:
+        return await _submit(func, *args, **kwargs)
+    async with semaphore:
+        return await _submit(func, *args, **kwargs)
+
+
+async def _submit(func: t.Callable[..., T], *args: t.Any, **kwargs: t.Any) -> T:
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    call = functools.partial(func, *args, **kwargs)
+    if not isinstance(executor, ProcessPoolExecutor):
+        # The context is copied so that the worker sees the stage recorder of the caller
+        call = functools.partial(contextvars.copy_context().run, call)
+    return await loop.run_in_executor(executor, call)
+
+
+def _get_semaphore() -> t.Optional[asyncio.Semaphore]:
+    """Semaphore bounding the conversions of the running event loop"""
+    if _max_concurrency is None:
+        return None
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    with _lock:
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(_max_concurrency)
+            _semaphores[loop] = semaphore
+        return semaphore
@@ -0,0 +1,189 @@
+"""
+Batch conversion of many files in a process pool. The inputs are sent to the workers as paths or
+raw bytes and every worker builds its own handlers, python-docx and pandas objects never cross
+process boundaries. The handlers are imported by the converters, a worker only loads the
+libraries its target needs, e.g. neither pandas nor python-docx for "base64".
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import time
+import typing as t
+
+from .exceptions import DocxHandlerError, TableHandlerError
+
+Source = t.Union[str, os.PathLike, bytes]
+Input = t.Union[Source, t.Tuple[str, Source]]
+Converter = t.Callable[[bytes, str], t.Any]
+
+
+def to_base64(data: bytes, name: str) -> str:
+    """Base64 payload of a docx file, the bytes are checked but not parsed"""
+    from .docx import LazyDocxHandler
+
+    return LazyDocxHandler(data, name).to_base64_str()
+
+
+def to_docx(data: bytes, name: str) -> bytes:
+    """Docx file loaded with python-docx and saved again"""
+    from docx import Document as ReadDocFunc
+
+    from .docx import DocxHandler
+
+    return DocxHandler(ReadDocFunc(io.BytesIO(data)), name).to_byte()
+
+
+def to_stat(data: bytes, name: str) -> t.Dict:
+    """Detailed statistics of a docx file, see DocxHandler.get_stat"""
+    from .docx import LazyDocxHandler
+
+    return LazyDocxHandler(data, name).get_stat(detailed=True)
+
+
+def to_xlsx(data: bytes, name: str) -> bytes:
+    """Workbook rebuilt from every sheet of a xlsx file"""
+    from .excel import ExcelHandler
+    from .table import TableHandler
+
+    tables = TableHandler.from_file_like_all(io.BytesIO(data), engine="fast")
+    return ExcelHandler(tables).to_bytes()
+
+
+TARGETS: t.Dict[str, Converter] = {
+    "base64": to_base64,
+    "docx": to_docx,
+    "stat": to_stat,
+    "xlsx": to_xlsx,
+}
+# Exception raised for failures of a target which are not already a handler error
+TARGET_ERRORS: t.Dict[str, t.Type[Exception]] = {"xlsx": TableHandlerError}
+
+
+class BatchItem(t.NamedTuple):
+    """Outcome of the conversion of a single input"""
+
+    index: int
+    name: str
+    value: t.Any = None
+    error: t.Optional[Exception] = None
+    size: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchResult:
+    """Results of convert_many in input order together with throughput figures"""
+
+    def __init__(self, items: t.List[BatchItem], seconds: float) -> None:
+        self.items = items
+        self.seconds = seconds
+
+    def values(self) -> t.List[t.Any]:
+        """Converted values in input order, None for the failed inputs"""
+        return [item.value for item in self.items]
+
+    def errors(self) -> t.List[BatchItem]:
+        """Items which failed"""
+        return [item for item in self.items if not item.ok]
+
+    def raise_errors(self) -> None:
+        """Raise the error of the first failed item if any"""
+        for item in self.items:
+            if item.error is not None:
+                raise item.error
+
+    def throughput(self) -> t.Dict[str, float]:
+        """Number of files and input bytes converted per second of wall time"""
+        total = sum(item.size for item in self.items)
+        seconds = self.seconds or float("nan")
+        return {
+            "items": len(self.items),
+            "failed": len(self.errors()),
+            "seconds": self.seconds,
+            "items_per_second": len(self.items) / seconds,
+            "megabytes_per_second": total / 1024**2 / seconds,
+        }
+
+    def __str__(self) -> str:
+        """String representation of the class"""
+        return (
+            f"{self.__class__.__name__}(items={len(self.items)}, "
+            f"failed={len(self.errors())}, seconds={self.seconds:.3f})"
+        )
+
+    def __repr__(self) -> str:
+        """Dev string representation of the class"""
+        return f"{self.__class__.__name__}({self.items})"
+
+    def __len__(self) -> int:
+        """Number of inputs"""
+        return len(self.items)
+
+
+def convert_many(
+    inputs: t.Iterable[Input],
+    target: t.Union[str, Converter] = "base64",
+    max_workers: t.Optional[int] = None,
+    chunksize: int = 1,
+    parallel: bool = True,
+) -> BatchResult:
+    """
+    Convert many files across a process pool
+    :param inputs: Paths, bytes or (name, path or bytes) tuples. Paths are read by the workers
+    :param target: "base64", "docx", "stat" or "xlsx", see TARGETS, or a function taking the
+        bytes and the name of a file. The function must be importable by the worker processes
+    :param max_workers: Size of the process pool, defaults to the number of CPUs
+    :param chunksize: Number of inputs sent to a worker at once, larger values lower the
+        overhead for many small files
+    :param parallel: Convert in the current process when False
+    :return: The results in input order, a failure is stored on its item as DocxHandlerError or
+        TableHandlerError without stopping the other conversions
+    """
+    if isinstance(target, str) and target not in TARGETS:
+        raise ValueError(f"target must be one of {sorted(TARGETS)}, got {target}")
+    jobs = [(index, *_named(index, item), target) for index, item in enumerate(inputs)]
+    start = time.perf_counter()
+    if parallel and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            items = list(executor.map(_convert, jobs, chunksize=chunksize))
+    else:
+        items = [_convert(job) for job in jobs]
+    return BatchResult(items, time.perf_counter() - start)
+
+
+def _named(index: int, item: Input) -> t.Tuple[str, Source]:
+    """Name and source of an input"""
+    if isinstance(item, tuple):
+        return item[0], item[1]
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        return f"item-{index}", bytes(item)
+    return os.path.basename(os.fspath(item)), item
+
+
+def _convert(job: t.Tuple[int, str, Source, t.Union[str, Converter]]) -> BatchItem:
+    """Convert a single input, run in the worker processes"""
+    index, name, source, target = job
+    start = time.perf_counter()
+    size = 0
+    try:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            data = bytes(source)
+        else:
+            with open(source, "rb") as file:
+                data = file.read()
+        size = len(data)
+        convert = TARGETS[target] if isinstance(target, str) else target
+        value = convert(data, name)
+    except (DocxHandlerError, TableHandlerError) as e:
+        return BatchItem(index, name, error=e, size=size)
+    except Exception as e:
+        error = TARGET_ERRORS.get(t.cast(str, target), DocxHandlerError)
+        return BatchItem(index, name, error=error(f"{name}: {e}"), size=size)
+    return BatchItem(index, name, value, None, size, time.perf_counter() - start)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import typing as t
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def hash_bytes(data: t.Union[bytes, bytearray, memoryview]) -> str:
+    """Content hash of raw bytes used as cache key"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ConversionCache:
+    """
+    Content addressed LRU cache for serialized handler outputs. The size of the cache is bounded
+    by the total number of bytes stored, least recently used entries are evicted first and,
+    when a spill directory is configured, written to disk instead of being dropped.
+    """
+
+    def __init__(
+        self, max_bytes: int = DEFAULT_MAX_BYTES, spill_dir: t.Optional[str] = None
+    ) -> None:
+        """
+        Initializer of the ConversionCache class
+        :param max_bytes: Maximum number of bytes kept in memory
+        :param spill_dir: Directory where evicted entries are stored, if not provided they are dropped
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self._entries: t.OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def get(self, key: str) -> t.Optional[bytes]:
+        """
+        Get an entry from memory, or from the spill directory in which case it is moved back to memory
+        :param key: Content hash of the inputs
+        :return: Stored bytes or None when the key is unknown
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        value = self._read_spilled(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.put(key, value)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """
+        Store an entry and evict the least recently used ones until the cache fits into max_bytes,
+        entries larger than max_bytes are only written to the spill directory
+        :param key: Content hash of the inputs
+        :param value: Serialized output
+        """
+        evicted = []
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            if len(value) > self.max_bytes:
+                evicted.append((key, value))
+            else:
+                self._entries[key] = value
+                self._size += len(value)
+            while self._size > self.max_bytes:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._size -= len(old_value)
+                self.evictions += 1
+                evicted.append((old_key, old_value))
+        for old_key, old_value in evicted:
+            self._spill(old_key, old_value)
+
+    def get_or_create(self, key: str, factory: t.Callable[[], bytes]) -> bytes:
+        """
+        Get an entry or create it with the factory and store it
+        :param key: Content hash of the inputs
+        :param factory: Callable serializing the output on a cache miss
+        """
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all the entries from memory and from the spill directory"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.spill_dir:
+            for filename in os.listdir(self.spill_dir):
+                if filename.endswith(".bin"):
+                    os.remove(os.path.join(self.spill_dir, filename))
+
+    def stats(self) -> t.Dict:
+        """Hit and miss counters and the current size of the cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(t.cast(str, self.spill_dir), f"{key}.bin")
+
+    def _spill(self, key: str, value: bytes) -> None:
+        if not self.spill_dir:
+            return
+        path = self._spill_path(key)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(value)
+        os.replace(f"{path}.tmp", path)
+        with self._lock:
+            self.spills += 1
+
+    def _read_spilled(self, key: str) -> t.Optional[bytes]:
+        if not self.spill_dir:
+            return None
+        try:
+            with open(self._spill_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def __len__(self) -> int:
+        """Number of entries kept in memory"""
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __str__(self) -> str:
+        """String representation of the class"""
+        return f"{self.__class__.__name__}(max_bytes={self.max_bytes}, spill_dir={self.spill_dir})"
+
+    def __repr__(self) -> str:
+        """Dev string representation of the class"""
+        return f"{self.__class__.__name__}({self.max_bytes}, {self.spill_dir!r})"
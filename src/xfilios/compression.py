@@ -0,0 +1,87 @@
+"""
+Compression settings of the generated zip containers (docx and xlsx files). A policy trades CPU
+time against file size, e.g. level 1 for internal downloads or level 9 for emailed exports.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import io
+import typing as t
+import zipfile
+
+# Level zipfile deflates with when none is given, python-docx, openpyxl and xlsxwriter use it
+ZIPFILE_LEVEL = 6
+# Parts which are already compressed and gain nothing from deflate
+MEDIA_PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.gif", "*.tif", "*.tiff", "*.wdp")
+
+
+class CompressionPolicy(t.NamedTuple):
+    """
+    Deflate level of the parts of a zip container
+    :param level: zlib compression level from 1 (fastest) to 9 (smallest), 0 stores every part
+    :param stored: fnmatch patterns of the part names written without compression
+    """
+
+    level: int = 6
+    stored: t.Tuple[str, ...] = ()
+
+    def check(self) -> None:
+        if not 0 <= self.level <= 9:
+            raise ValueError(
+                f"Compression level must be between 0 and 9, got {self.level}"
+            )
+
+    def level_for(self, name: str) -> int:
+        """Compression level of a part, 0 when the part is stored"""
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in self.stored):
+            return 0
+        return self.level
+
+
+FAST = CompressionPolicy(level=1, stored=MEDIA_PATTERNS)
+BALANCED = CompressionPolicy(level=6, stored=MEDIA_PATTERNS)
+SMALLEST = CompressionPolicy(level=9)
+STORED = CompressionPolicy(level=0)
+
+
+def needs_repack(data: t.BinaryIO, policy: CompressionPolicy) -> bool:
+    """
+    Check if a container written by zipfile with its default level has parts a policy writes
+    differently, a policy deflating every part at ZIPFILE_LEVEL would only rewrite the same file
+    :param data: Binary file like object of the zip container, its position is kept
+    :param policy: Compression policy to apply
+    """
+    if policy.level != ZIPFILE_LEVEL:
+        return True
+    position = data.tell()
+    with zipfile.ZipFile(data) as archive:
+        infos = archive.infolist()
+    data.seek(position)
+    return any(
+        info.compress_type != zipfile.ZIP_DEFLATED
+        or policy.level_for(info.filename) != ZIPFILE_LEVEL
+        for info in infos
+    )
+
+
+def repack(data: t.Union[bytes, t.BinaryIO], policy: CompressionPolicy) -> io.BytesIO:
+    """
+    Write the entries of a zip container again with the levels of a policy. Entries keep their
+    order and timestamps, each entry is decompressed and compressed once
+    :param data: Bytes or binary file like object of the zip container
+    :param policy: Compression policy of the new container
+    :return: BytesIO positioned at the start of the new container
+    """
+    policy.check()
+    source = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    output = io.BytesIO()
+    with zipfile.ZipFile(source) as archive, zipfile.ZipFile(output, "w") as target:
+        for info in archive.infolist():
+            level = policy.level_for(info.filename)
+            entry = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+            entry.external_attr = info.external_attr
+            entry.compress_type = zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED
+            target.writestr(entry, archive.read(info), compresslevel=level or None)
+    output.seek(0)
+    return output
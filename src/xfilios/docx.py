@@ -2,31 +2,211 @@ from __future__ import annotations
 
 import base64
 import io
+import mmap
 import os
 import typing as t
 from io import BytesIO
 
-from docx import Document as ReadDocFunc
-from docx.document import Document
-
+from . import aio
+from .cache import ConversionCache, hash_bytes
+from .compression import CompressionPolicy, needs_repack, repack
+from .docxml import (
+    DocxStat,
+    DocxTable,
+    iter_tables,
+    open_document_part,
+    render_table,
+    scan_document,
+    scan_element,
+    walk_tables,
+)
+from .encoding import BytesLike
 from .exceptions import DocxHandlerError
-from .handler import Handler
-from .html import create_download_link
+from .fileio import PathLike, map_file
+from .handler import Handler, stage
+from .html import iter_download_link
+
+# python-docx and pandas are imported when a document is parsed or tables are converted, passing
+# the bytes of a docx file on needs neither
+if t.TYPE_CHECKING:
+    import pandas as pd
+    from docx.document import Document
+    from docx.shared import Length
+    from docx.table import Table
+
+    from .table import TableHandler
+
+TABLE_LABEL = "Table {index}"
 
 
 class DocxHandler(Handler):
-    def __init__(self, document: Document, name: str) -> None:
+    filetype = "docx"
+
+    def __init__(
+        self,
+        document: Document,
+        name: str,
+        cache: t.Optional[ConversionCache] = None,
+        source_digest: t.Optional[str] = None,
+        compression: t.Optional[CompressionPolicy] = None,
+    ) -> None:
         """
         Handle all the conversion to and from document file
         :param document: A docx file like object
+        :param cache: Cache to reuse the serialized document, only used together with source_digest
+        :param source_digest: Content hash of the file the document was read from. The cache
+            assumes the document is not edited after reading, set it to None after editing
+        :param compression: Deflate level per part, the saved document is repacked with it, see
+            xfilios.compression. The python-docx defaults are kept if not provided, or when the
+            policy deflates every part at the default level. Repacking comes on top of saving, a
+            policy can make the file smaller but not faster to save than the defaults
         """
+        if compression is not None:
+            compression.check()
         self.document = document
         self.name = name
+        self.cache = cache
+        self.source_digest = source_digest
+        self.compression = compression
+
+    def get_stat(self, detailed: bool = False) -> t.Dict:
+        """
+        Count the tables and the non empty paragraphs of the document body, the xml of the
+        document is scanned directly without creating python-docx Paragraph objects
+        :param detailed: Also count images, sections, words and empty paragraphs
+        """
+        stat = self._scan()
+        if detailed:
+            return stat.to_dict()
+        return {"tables": stat.tables, "paragraphs": stat.paragraphs}
+
+    @classmethod
+    def stat_file_like(
+        cls, content: t.Union[t.BinaryIO, bytes], detailed: bool = False
+    ) -> t.Dict:
+        """
+        Same statistics as get_stat, streamed out of a docx file without loading it as Document
+        :param content: Bytes or binary file like object of a docx file
+        :param detailed: Also count images, sections, words and empty paragraphs
+        """
+        try:
+            stat = scan_document(content)
+        except Exception as e:
+            raise DocxHandlerError(e)
+        if detailed:
+            return stat.to_dict()
+        return {"tables": stat.tables, "paragraphs": stat.paragraphs}
+
+    def to_table_handlers(
+        self,
+        header: t.Union[None, bool, int] = None,
+        fill_merged: bool = True,
+        label: str = TABLE_LABEL,
+    ) -> t.List[TableHandler]:
+        """
+        Extract the tables of the document body, e.g. to write them into an ExcelHandler. The
+        table xml is read in one pass straight into columns, no python-docx Table or Cell object
+        is created. The values are the cell texts, merged cells are resolved to the table grid
+        :param header: Number of header rows naming the columns, True for one and False for none.
+            When None the rows marked to repeat as header are used, else the first row when the
+            table style formats it as header or when its cells are all filled and distinct
+        :param fill_merged: Repeat the text of a merged cell in every grid cell it covers,
+            otherwise only its first grid cell holds the text and the others are None
+        :param label: Label of the handlers, formatted with the 1 based index of the table
+        :return: One TableHandler per table of the body in document order
+        """
+        try:
+            with self._stage("parse"):
+                tables = list(self._iter_tables(fill_merged))
+            return [
+                _table_handler(table, header, label.format(index=index))
+                for index, table in enumerate(tables, 1)
+            ]
+        except DocxHandlerError:
+            raise
+        except Exception as e:
+            raise DocxHandlerError(f"Could not read the tables of {self.name}: {e}")
+
+    def add_table(
+        self,
+        table: TableHandler,
+        header: bool = True,
+        style: t.Optional[str] = None,
+        header_bold: bool = True,
+        header_fill: t.Optional[str] = None,
+        column_widths: t.Optional[t.Sequence[Length]] = None,
+        na_rep: str = "",
+    ) -> Table:
+        """
+        Append the data of a TableHandler as table at the end of the document. The table xml is
+        rendered at once from the DataFrame columns instead of adding rows and cells one by one
+        :param table: The TableHandler to write, every value is written as text
+        :param header: Write the schema as header row, repeated at the top of every page
+        :param style: Name of a table style of the document e.g. "Table Grid", the document
+            default when not provided
+        :param header_bold: Write the header texts in bold
+        :param header_fill: Hex color of the header cell background e.g. "D9D9D9"
+        :param column_widths: Width of every column e.g. docx.shared.Cm(3), the widths are then
+            kept fixed. The width of the page is split evenly when not provided
+        :param na_rep: Text of the missing values
+        :return: The python-docx Table of the added table, the cache of the source file is no
+            longer used once the document is edited
+        """
+        from docx.oxml import parse_xml
+        from docx.shared import Length
+        from docx.table import Table
 
-    def get_stat(self) -> t.Dict:
-        total_tables = len([table for table in self.document.tables])
-        total_paragraphs = self.__len__()
-        return {"tables": total_tables, "paragraphs": total_paragraphs}
+        df = table.get_data_as_dataframe()
+        names = [str(name) for name in table.get_schema()]
+        if column_widths is not None and len(column_widths) != len(names):
+            raise DocxHandlerError(
+                "Length of column_widths does not match with the number of columns"
+            )
+        style_id = None
+        if style is not None:
+            try:
+                style_id = self.document.styles[style].style_id
+            except KeyError:
+                raise DocxHandlerError(f"No table style named {style}")
+        if column_widths is None:
+            section = self.document.sections[-1]
+            block_width = (
+                section.page_width - section.left_margin - section.right_margin
+            )
+            widths = [Length(block_width // max(len(names), 1)).twips] * len(names)
+        else:
+            widths = [Length(width).twips for width in column_widths]
+        with self._stage("render_table"):
+            xml = render_table(
+                names,
+                [
+                    _column_texts(df.iloc[:, index], na_rep)
+                    for index in range(df.shape[1])
+                ],
+                widths,
+                header=header,
+                style_id=style_id,
+                header_bold=header_bold,
+                header_fill=header_fill,
+                fixed_layout=column_widths is not None,
+            )
+            element = parse_xml(xml)
+        body = self.document.element.body
+        if body.sectPr is None:
+            body.append(element)
+        else:
+            body.sectPr.addprevious(element)
+        # The saved document changes, the cached file of the source must not be reused
+        self.source_digest = None
+        return Table(element, self.document)
+
+    def to_buffer(self) -> io.BytesIO:
+        """
+        Save the Python Docx file into an in memory buffer
+        :return: BytesIO positioned at the start of the Document
+        """
+        output = self._serialize()
+        return output if isinstance(output, BytesIO) else BytesIO(output)
 
     def to_byte(self) -> bytes:
         """
@@ -34,10 +214,43 @@ class DocxHandler(Handler):
         :param doc: Python Document type from Docx
         :return: Bytes of Document
         """
+        output = self._serialize()
+        return output.getvalue() if isinstance(output, BytesIO) else bytes(output)
+
+    def _payload(self) -> BytesLike:
+        """View on the saved buffer, or the cached bytes when a cache is used"""
+        output = self._serialize()
+        return output.getbuffer() if isinstance(output, BytesIO) else output
+
+    def _serialize(self) -> t.Union[bytes, BytesIO]:
+        """Get the document from the cache if one is used, otherwise save it into a new buffer"""
+        if self.cache is None or self.source_digest is None:
+            return self._render()
+        key = hash_bytes(
+            f"docx:{self.source_digest}:{self.compression}".encode("utf-8")
+        )
+        return self.cache.get_or_create(key, lambda: self._render().getvalue())
+
+    def _render(self) -> BytesIO:
+        """Save the document into a new buffer"""
         byte_stream = BytesIO()
-        self.document.save(byte_stream)
+        with self._stage("save_zip") as record:
+            self.document.save(byte_stream)
+            record.size = byte_stream.tell()
         byte_stream.seek(0)
-        return byte_stream.read()
+        # python-docx deflates every part at the zipfile default level
+        if self.compression is None or not needs_repack(byte_stream, self.compression):
+            return byte_stream
+        return self._repack(byte_stream)
+
+    def _repack(self, byte_stream: BytesIO) -> BytesIO:
+        """Apply the compression policy to a saved document"""
+        if self.compression is None:
+            return byte_stream
+        with self._stage("repack") as record:
+            output = repack(byte_stream, self.compression)
+            record.size = len(output.getbuffer())
+        return output
 
     def to_base64_str(self) -> str:
         """
@@ -45,35 +258,125 @@ class DocxHandler(Handler):
         :param byte_data: data as byte
         :return: base 64 encoded string of the byte data
         """
-        byte_data = self.to_byte()
-        b64_encoded_str = base64.b64encode(byte_data).decode("utf-8")
-        return b64_encoded_str
+        return "".join(self.iter_base64_chunks())
 
     @classmethod
-    def from_base64(cls, b64_str: str, filename: t.Optional[str] = None) -> DocxHandler:
+    def from_base64(
+        cls,
+        b64_str: str,
+        filename: t.Optional[str] = None,
+        cache: t.Optional[ConversionCache] = None,
+        compression: t.Optional[CompressionPolicy] = None,
+    ) -> DocxHandler:
         """
         Create a instance of DocxHandler from base64 encoded string
+        :param cache: Cache to reuse the serialized document
+        :param compression: Deflate level per part of the saved document
         :return: a DocxHandler object
         """
-        bytes_stream = base64.b64decode(b64_str.encode("utf-8"))
-        document = ReadDocFunc(io.BytesIO(bytes_stream))
-        if filename:
-            return cls(document=document, name=filename)
-        return cls(document=document, name="document")
+        with stage(cls.__name__, "decode") as record:
+            bytes_stream = base64.b64decode(b64_str.encode("utf-8"))
+            record.size = len(bytes_stream)
+        with stage(cls.__name__, "parse") as record:
+            document = _read_document(io.BytesIO(bytes_stream))
+            record.size = len(bytes_stream)
+        digest = hash_bytes(bytes_stream) if cache is not None else None
+        return cls(
+            document=document,
+            name=filename or "document",
+            cache=cache,
+            source_digest=digest,
+            compression=compression,
+        )
+
+    @classmethod
+    async def afrom_base64(cls, *args: t.Any, **kwargs: t.Any) -> DocxHandler:
+        """Async from_base64, run in the executor configured with xfilios.aio.configure"""
+        return await aio.run(cls.from_base64, *args, **kwargs)
+
+    @classmethod
+    async def afrom_file_like(cls, *args: t.Any, **kwargs: t.Any) -> DocxHandler:
+        """Async from_file_like, run in the executor configured with xfilios.aio.configure"""
+        return await aio.run(cls.from_file_like, *args, **kwargs)
 
     def write_to_local(self, path: str, filename: str) -> None:
-        full_path = os.path.join(path, filename)
-        self.document.save(full_path)
+        """Write the document as filename into the directory path, see to_path"""
+        self.to_path(os.path.join(path, filename))
+
+    def _write_file(self, file: t.BinaryIO) -> None:
+        """Save the document straight into the file unless it has to be cached or repacked"""
+        if self.compression is not None or (
+            self.cache is not None and self.source_digest is not None
+        ):
+            file.write(self._payload())
+            return
+        with self._stage("save_zip") as record:
+            self.document.save(file)
+            record.size = file.tell()
 
     @classmethod
-    def from_file_like(cls, content: t.Union[t.TextIO, t.BinaryIO]) -> DocxHandler:
+    def from_path(
+        cls,
+        path: PathLike,
+        cache: t.Optional[ConversionCache] = None,
+        compression: t.Optional[CompressionPolicy] = None,
+    ) -> DocxHandler:
+        """
+        Create itself from a local docx file, python-docx reads the parts straight from the file
+        :param path: Path of the docx file, its name is used as name of the handler
+        :param cache: Cache to reuse the serialized document, the file is hashed through a memory map
+        :param compression: Deflate level per part of the saved document
+        """
+        try:
+            with stage(cls.__name__, "parse"):
+                document = _read_document(os.fspath(path))
+            digest = None
+            if cache is not None:
+                source = map_file(path)
+                digest = hash_bytes(source)
+                if isinstance(source, mmap.mmap):
+                    source.close()
+        except Exception as e:
+            raise DocxHandlerError(f"Could not read {path}: {e}")
+        return cls(
+            document=document,
+            name=os.path.basename(path),
+            cache=cache,
+            source_digest=digest,
+            compression=compression,
+        )
+
+    @classmethod
+    def from_file_like(
+        cls,
+        content: t.Union[t.TextIO, t.BinaryIO],
+        cache: t.Optional[ConversionCache] = None,
+        compression: t.Optional[CompressionPolicy] = None,
+    ) -> DocxHandler:
         """
         Create itself from a file like object from framework like Streamlit/Dash
+        :param cache: Cache to reuse the serialized document
+        :param compression: Deflate level per part of the saved document
         """
 
         try:
-            document = ReadDocFunc(content)
-            return cls(document=document, name=content.name)
+            if cache is None:
+                with stage(cls.__name__, "parse"):
+                    document = _read_document(content)
+                return cls(
+                    document=document, name=content.name, compression=compression
+                )
+            data = content.read()
+            with stage(cls.__name__, "parse") as record:
+                document = _read_document(BytesIO(data))  # type: ignore
+                record.size = len(data)
+            return cls(
+                document=document,
+                name=content.name,
+                cache=cache,
+                source_digest=hash_bytes(data),  # type: ignore
+                compression=compression,
+            )
 
         except DocxHandlerError:
             raise DocxHandlerError
@@ -87,9 +390,9 @@ class DocxHandler(Handler):
         :return: Html anchor tag annotated String
         """
 
-        content = self.to_base64_str()
-        return create_download_link(
-            base64_str=content, filename=filename, filetype="docx"
+        chunks = self.iter_base64_chunks()
+        return "".join(
+            iter_download_link(base64_chunks=chunks, filename=filename, filetype="docx")
         )
 
     def __str__(self) -> str:
@@ -100,7 +403,198 @@ class DocxHandler(Handler):
         raise NotImplementedError
 
     def __len__(self) -> int:
-        """Determine if there is any table in the docx or not"""
-        return len(
-            [para for para in self.document.paragraphs if len(para.text.strip()) > 0]
+        """Number of non empty paragraphs in the body of the document"""
+        return self._scan().paragraphs
+
+    def _scan(self) -> DocxStat:
+        """Structural statistics of the loaded document"""
+        return scan_element(self.document.element)
+
+    def _iter_tables(self, fill_merged: bool) -> t.Iterator[DocxTable]:
+        """Tables of the loaded document"""
+        return walk_tables(self.document.element, fill_merged)
+
+
+class LazyDocxHandler(DocxHandler):
+    """
+    Docx handler backed by the raw bytes of the file. The python-docx Document is only built when
+    it is accessed, as long as it is not, the original bytes are returned unchanged by to_byte and
+    the base64 methods, and statistics are streamed out of the bytes.
+    """
+
+    def __init__(
+        self,
+        source: t.Union[bytes, mmap.mmap],
+        name: str,
+        compression: t.Optional[CompressionPolicy] = None,
+    ) -> None:
+        """
+        Initializer of the LazyDocxHandler class
+        :param source: Bytes of the docx file, or a memory map of it, checked to be a zip file
+            with a document part
+        :param name: Name of the document
+        :param compression: Deflate level per part, the source bytes are repacked with it instead
+            of being returned unchanged, still without parsing the Document
+        """
+        if compression is not None:
+            compression.check()
+        try:
+            archive, stream = open_document_part(source)
+            stream.close()
+            archive.close()
+        except Exception as e:
+            raise DocxHandlerError(f"{name} is not a valid docx file: {e}")
+        self.source = (
+            source if isinstance(source, (bytes, mmap.mmap)) else bytes(source)
+        )
+        self.name = name
+        self.cache = None
+        self.source_digest = None
+        self.compression = compression
+        self._document: t.Optional[Document] = None
+        self._dirty = False
+
+    @property
+    def document(self) -> Document:  # type: ignore[override]
+        """
+        The python-docx Document, parsed on first access. Any access marks the handler as dirty,
+        as the document may be edited through it, and the following saves render the Document
+        """
+        if self._document is None:
+            self._document = _read_document(BytesIO(self.source))
+        self._dirty = True
+        return self._document
+
+    @document.setter
+    def document(self, document: Document) -> None:
+        self._document = document
+        self._dirty = True
+
+    @property
+    def is_loaded(self) -> bool:
+        """True when the Document has been parsed"""
+        return self._document is not None
+
+    @property
+    def is_dirty(self) -> bool:
+        """True when the Document has been accessed and is saved instead of the source bytes"""
+        return self._dirty
+
+    def close(self) -> None:
+        """
+        Close the memory map of a handler created with from_path. The source can not be read
+        afterwards, only a Document loaded before can still be converted
+        """
+        if isinstance(self.source, mmap.mmap):
+            self.source.close()
+
+    def __enter__(self) -> LazyDocxHandler:
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        self.close()
+
+    @classmethod
+    def from_base64(  # type: ignore[override]
+        cls,
+        b64_str: str,
+        filename: t.Optional[str] = None,
+        compression: t.Optional[CompressionPolicy] = None,
+    ) -> LazyDocxHandler:
+        """
+        Create a instance of LazyDocxHandler from base64 encoded string, without parsing it
+        :param compression: Deflate level per part of the returned document
+        :return: a LazyDocxHandler object
+        """
+        with stage(cls.__name__, "decode") as record:
+            source = base64.b64decode(b64_str.encode("utf-8"))
+            record.size = len(source)
+        return cls(source=source, name=filename or "document", compression=compression)
+
+    @classmethod
+    def from_file_like(  # type: ignore[override]
+        cls, content: t.BinaryIO, compression: t.Optional[CompressionPolicy] = None
+    ) -> LazyDocxHandler:
+        """
+        Create itself from a file like object from framework like Streamlit/Dash, the content is
+        read into memory but not parsed
+        :param compression: Deflate level per part of the returned document
+        """
+        return cls(
+            source=content.read(),
+            name=getattr(content, "name", "document"),
+            compression=compression,
         )
+
+    def _serialize(self) -> t.Union[bytes, BytesIO]:
+        """The source bytes while the Document is untouched, otherwise the saved Document"""
+        if self._dirty:
+            return self._render()
+        if self.compression is None:
+            return self.source
+        return self._repack(BytesIO(self.source))
+
+    def _scan(self) -> DocxStat:
+        """Structural statistics of the loaded Document, or of the source bytes"""
+        if self._document is None:
+            return scan_document(self.source)
+        return scan_element(self._document.element)
+
+    def _iter_tables(self, fill_merged: bool) -> t.Iterator[DocxTable]:
+        """Tables of the loaded Document, or streamed out of the source bytes"""
+        if self._document is None:
+            return iter_tables(self.source, fill_merged)
+        return walk_tables(self._document.element, fill_merged)
+
+    @classmethod
+    def from_path(  # type: ignore[override]
+        cls, path: PathLike, compression: t.Optional[CompressionPolicy] = None
+    ) -> LazyDocxHandler:
+        """
+        Create itself from a local docx file mapped into memory, nothing is read or copied until
+        it is converted, to_path, to_base64_str and the statistics work on the mapped pages. Use
+        the handler as context manager, or call close, to release the map
+        :param path: Path of the docx file, its name is used as name of the handler
+        :param compression: Deflate level per part of the returned document
+        """
+        try:
+            source = map_file(path)
+        except OSError as e:
+            raise DocxHandlerError(f"Could not read {path}: {e}")
+        return cls(source=source, name=os.path.basename(path), compression=compression)
+
+    def _write_file(self, file: t.BinaryIO) -> None:
+        """Write the source unchanged while the Document is untouched"""
+        if self._dirty or self.compression is not None:
+            return super()._write_file(file)
+        file.write(self.source)
+
+
+def _read_document(source: t.Union[str, t.BinaryIO]) -> Document:
+    """Parse a docx file into a python-docx Document"""
+    from docx import Document as ReadDocFunc
+
+    return ReadDocFunc(source)
+
+
+def _table_handler(
+    table: DocxTable, header: t.Union[None, bool, int], label: str
+) -> TableHandler:
+    """Build the DataFrame of a table from its columns"""
+    import pandas as pd
+
+    from .table import TableHandler
+
+    names, columns = table.to_columns(header)
+    with stage(TableHandler.__name__, "build_frame"):
+        df = pd.DataFrame(dict(zip(names, columns)), columns=names)
+    return TableHandler(df=df, schema=names, label=label)
+
+
+def _column_texts(series: pd.Series, na_rep: str) -> t.List[str]:
+    """Texts of the values of a column, missing values give na_rep"""
+    texts = series.astype(str).tolist()
+    missing = series.isna().to_numpy()
+    if missing.any():
+        return [na_rep if miss else text for text, miss in zip(texts, missing)]
+    return texts
@@ -0,0 +1,537 @@
+"""
+Direct access to the xml of the main document part of a docx file. The scanners work on the
+raw wordprocessingml events, either streamed out of the zip container or walked over an already
+loaded python-docx element tree, without building the python-docx object model. Tables are
+rendered the other way round, as one xml string parsed at once. lxml is imported on first use,
+opening a docx file without reading its document xml does not need it.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import posixpath
+import re
+import typing as t
+import zipfile
+
+from .fileio import MappedReader
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+OFFICE_DOCUMENT = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+DEFAULT_DOCUMENT_PART = "word/document.xml"
+
+W_BODY = f"{W_NS}body"
+W_P = f"{W_NS}p"
+W_TBL = f"{W_NS}tbl"
+W_T = f"{W_NS}t"
+W_SECT_PR = f"{W_NS}sectPr"
+W_TR = f"{W_NS}tr"
+W_TC = f"{W_NS}tc"
+W_TBL_PR = f"{W_NS}tblPr"
+W_TBL_LOOK = f"{W_NS}tblLook"
+W_TR_PR = f"{W_NS}trPr"
+W_TC_PR = f"{W_NS}tcPr"
+W_TBL_HEADER = f"{W_NS}tblHeader"
+W_GRID_BEFORE = f"{W_NS}gridBefore"
+W_GRID_AFTER = f"{W_NS}gridAfter"
+W_GRID_SPAN = f"{W_NS}gridSpan"
+W_V_MERGE = f"{W_NS}vMerge"
+W_H_MERGE = f"{W_NS}hMerge"
+W_VAL = f"{W_NS}val"
+W_FIRST_ROW = f"{W_NS}firstRow"
+# Content controls and custom markup wrapping rows, cells or paragraphs without changing the grid
+W_WRAPPERS = frozenset(
+    f"{W_NS}{name}" for name in ("sdt", "sdtContent", "customXml", "smartTag")
+)
+# tblLook w:val bit of the header formatting of the first row
+TBL_LOOK_FIRST_ROW = 0x0020
+# Same table properties python-docx writes for a new table
+TBL_LOOK = (
+    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+    'w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+)
+W_NS_DECL = f'xmlns:w="{W_NS[1:-1]}"'
+ILLEGAL_CHARACTERS = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+RUN_SPECIAL = re.compile(r"(\t|\r\n|\n|\r)")
+# Run content python-docx turns into text besides w:t
+W_TEXT_CHARACTERS = {
+    f"{W_NS}tab": "\t",
+    f"{W_NS}ptab": "\t",
+    f"{W_NS}br": "\n",
+    f"{W_NS}cr": "\n",
+    f"{W_NS}noBreakHyphen": "-",
+}
+IMAGE_TAGS = frozenset(
+    [
+        "{http://schemas.openxmlformats.org/drawingml/2006/main}blip",
+        "{urn:schemas-microsoft-com:vml}imagedata",
+    ]
+)
+
+Source = t.Union[bytes, bytearray, memoryview, mmap.mmap, t.BinaryIO, str]
+
+
+class DocxStat(t.NamedTuple):
+    """Structural statistics of a document"""
+
+    paragraphs: int
+    tables: int
+    images: int
+    sections: int
+    words: int
+    empty_paragraphs: int
+
+    def to_dict(self) -> t.Dict[str, int]:
+        return dict(self._asdict())
+
+
+class _StatCollector:
+    """
+    Count the structure of a document from start/end events. Paragraphs and tables are only
+    counted when they are direct children of the body, the same way python-docx lists them,
+    words and images are counted in the whole document
+    """
+
+    def __init__(self) -> None:
+        self.paragraphs = 0
+        self.empty_paragraphs = 0
+        self.tables = 0
+        self.images = 0
+        self.sections = 0
+        self.words = 0
+        self.path: t.List[str] = []
+        self.texts: t.List[t.List[str]] = []
+
+    def start(self, tag: str) -> None:
+        self.path.append(tag)
+        if tag == W_P:
+            self.texts.append([])
+
+    def end(self, tag: str, element) -> bool:
+        """Handle an end event, True when the element is a direct child of the body"""
+        self.path.pop()
+        if tag == W_T:
+            if self.texts:
+                self.texts[-1].append(element.text or "")
+        elif tag in W_TEXT_CHARACTERS:
+            if self.texts:
+                self.texts[-1].append(W_TEXT_CHARACTERS[tag])
+        elif tag == W_P:
+            text = "".join(self.texts.pop())
+            self.words += len(text.split())
+            if self.path and self.path[-1] == W_BODY:
+                if text.strip():
+                    self.paragraphs += 1
+                else:
+                    self.empty_paragraphs += 1
+        elif tag == W_TBL:
+            if self.path and self.path[-1] == W_BODY:
+                self.tables += 1
+        elif tag == W_SECT_PR:
+            self.sections += 1
+        elif tag in IMAGE_TAGS:
+            self.images += 1
+        return bool(self.path) and self.path[-1] == W_BODY
+
+    def result(self) -> DocxStat:
+        return DocxStat(
+            paragraphs=self.paragraphs,
+            tables=self.tables,
+            images=self.images,
+            sections=self.sections,
+            words=self.words,
+            empty_paragraphs=self.empty_paragraphs,
+        )
+
+
+class DocxTable(t.NamedTuple):
+    """
+    Text of a table laid out on its grid, a merged cell covers every grid cell it spans
+    :param rows: Rows of cell texts, all of the grid width, None where a row has no cell
+    :param header_rows: Number of leading rows marked to repeat as header on every page
+    :param first_row: The table style formats the first row as header
+    """
+
+    rows: t.List[t.List[t.Optional[str]]]
+    header_rows: int
+    first_row: bool
+
+    @property
+    def width(self) -> int:
+        return len(self.rows[0]) if self.rows else 0
+
+    def header_count(self, header: t.Union[None, bool, int] = None) -> int:
+        """
+        Number of header rows
+        :param header: Number of rows, True for one and False for none. When None the rows marked
+            as header are used, else the first row when the style marks it or when its cells are
+            all filled and distinct
+        """
+        if header is None:
+            if self.header_rows:
+                return self.header_rows
+            first = self.rows[0] if len(self.rows) > 1 else []
+            filled = all(first) and len(set(first)) == len(first)
+            header = self.first_row or bool(first and filled)
+        return min(int(header), len(self.rows))
+
+    def to_columns(
+        self, header: t.Union[None, bool, int] = None
+    ) -> t.Tuple[t.List[str], t.List[t.List[t.Optional[str]]]]:
+        """
+        Split the table into column names and columns of values
+        :param header: Number of header rows, see header_count
+        :return: Unique column names, the texts of the header rows joined per grid column or
+            Column <n> when empty, and the values of every column
+        """
+        count = self.header_count(header)
+        names: t.List[str] = []
+        seen: t.Dict[str, int] = {}
+        for index in range(self.width):
+            parts: t.List[str] = []
+            for row in self.rows[:count]:
+                text = (row[index] or "").strip()
+                if text and (not parts or parts[-1] != text):
+                    parts.append(text)
+            name = " ".join(parts) or f"Column {index + 1}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            seen.setdefault(name, 0)
+            names.append(name)
+        body = self.rows[count:]
+        if not body:
+            return names, [[] for _ in names]
+        return names, [list(column) for column in zip(*body)]
+
+
+def read_table(element, fill_merged: bool = True) -> DocxTable:
+    """
+    Lay the cells of a w:tbl element out on the table grid. Cells spanning several columns
+    (gridSpan, hMerge) or continuing the cell above (vMerge) are resolved to the text of the
+    cell they merge into, rows skipping grid columns (gridBefore, gridAfter) get None
+    :param element: The w:tbl element, parsed or from a loaded python-docx Document
+    :param fill_merged: Repeat the text of a merged cell in every grid cell it covers,
+        otherwise only its first grid cell holds the text and the others are None
+    """
+    rows: t.List[t.List[t.Optional[str]]] = []
+    # Text of the cell covering every grid column in the previous row, used by vMerge
+    above: t.List[t.Optional[str]] = []
+    header_rows = 0
+    for tr in _children(element, W_TR):
+        row_pr = tr.find(W_TR_PR)
+        resolved: t.List[t.Optional[str]] = [None] * _int_val(row_pr, W_GRID_BEFORE)
+        row: t.List[t.Optional[str]] = list(resolved)
+        for tc in _children(tr, W_TC):
+            cell_pr = tc.find(W_TC_PR)
+            span = max(_int_val(cell_pr, W_GRID_SPAN, 1), 1)
+            start = len(resolved)
+            if _continues(cell_pr, W_V_MERGE):
+                texts = [
+                    above[column] if column < len(above) else None
+                    for column in range(start, start + span)
+                ]
+                merged = True
+            elif _continues(cell_pr, W_H_MERGE) and resolved:
+                texts = [resolved[-1]] * span
+                merged = True
+            else:
+                texts = [_cell_text(tc)] * span
+                merged = False
+            resolved.extend(texts)
+            if fill_merged:
+                row.extend(texts)
+            elif merged:
+                row.extend([None] * span)
+            else:
+                row.extend(texts[:1] + [None] * (span - 1))
+        resolved.extend([None] * _int_val(row_pr, W_GRID_AFTER))
+        row.extend([None] * (len(resolved) - len(row)))
+        if header_rows == len(rows) and _is_on(row_pr, W_TBL_HEADER):
+            header_rows += 1
+        rows.append(row)
+        above = resolved
+    width = max((len(row) for row in rows), default=0)
+    for row in rows:
+        row.extend([None] * (width - len(row)))
+    return DocxTable(rows=rows, header_rows=header_rows, first_row=_first_row(element))
+
+
+def iter_tables(source: Source, fill_merged: bool = True) -> t.Iterator[DocxTable]:
+    """
+    Stream the tables of the document body out of a docx file, every body element is dropped
+    once it has been read so memory only holds one table at a time
+    :param source: Bytes of the file, a binary file like object or a path
+    :param fill_merged: Repeat the text of merged cells, see read_table
+    """
+    archive, stream = open_document_part(source)
+    path: t.List[str] = []
+    with archive, stream:
+        for event, element in _iterparse(stream, events=("start", "end")):
+            if event == "start":
+                path.append(element.tag)
+                continue
+            path.pop()
+            if path and path[-1] == W_BODY:
+                if element.tag == W_TBL:
+                    yield read_table(element, fill_merged)
+                _release(element)
+
+
+def walk_tables(element, fill_merged: bool = True) -> t.Iterator[DocxTable]:
+    """
+    Tables of the body of an already loaded document element e.g. python-docx document.element,
+    read from the xml without creating Table or Cell objects
+    """
+    body = element.find(W_BODY)
+    for child in body if body is not None else ():
+        if child.tag == W_TBL:
+            yield read_table(child, fill_merged)
+
+
+def render_table(
+    names: t.Sequence[str],
+    columns: t.Sequence[t.Sequence[str]],
+    widths: t.Sequence[int],
+    header: bool = True,
+    style_id: t.Optional[str] = None,
+    header_bold: bool = True,
+    header_fill: t.Optional[str] = None,
+    fixed_layout: bool = False,
+) -> str:
+    """
+    Render the xml of a w:tbl element in one go, the cells are built column by column as plain
+    strings instead of adding rows and cells through python-docx
+    :param names: Column names, written as first row when header is set
+    :param columns: Texts of the cells per column, all of the same length
+    :param widths: Width of every column in twips
+    :param header: Write the names as header row, repeated at the top of every page
+    :param style_id: Id of the table style, the document default when not provided
+    :param header_bold: Write the header texts in bold
+    :param header_fill: Hex color of the header cell background e.g. "D9D9D9"
+    :param fixed_layout: Keep the column widths instead of fitting them to the content
+    :return: The xml of the table, declaring the w namespace
+    """
+    cell_props = [f'<w:tcW w:w="{width}" w:type="dxa"/>' for width in widths]
+    properties = "".join(
+        [
+            f"<w:tblStyle w:val={quote_xml(style_id)}/>" if style_id else "",
+            '<w:tblW w:type="auto" w:w="0"/>',
+            '<w:tblLayout w:type="fixed"/>' if fixed_layout else "",
+            TBL_LOOK,
+        ]
+    )
+    grid = "".join(f'<w:gridCol w:w="{width}"/>' for width in widths)
+    parts = [
+        f"<w:tbl {W_NS_DECL}><w:tblPr>{properties}</w:tblPr><w:tblGrid>{grid}</w:tblGrid>"
+    ]
+    if header:
+        fill = (
+            f'<w:shd w:val="clear" w:color="auto" w:fill={quote_xml(header_fill)}/>'
+            if header_fill
+            else ""
+        )
+        run_props = "<w:rPr><w:b/></w:rPr>" if header_bold else ""
+        cells = "".join(
+            _cell_xml(f"<w:tcPr>{props}{fill}</w:tcPr>", str(name), run_props)
+            for props, name in zip(cell_props, names)
+        )
+        parts.append(f"<w:tr><w:trPr><w:tblHeader/></w:trPr>{cells}</w:tr>")
+    rendered = [
+        [_cell_xml(f"<w:tcPr>{props}</w:tcPr>", text) for text in column]
+        for props, column in zip(cell_props, columns)
+    ]
+    parts.extend(f"<w:tr>{''.join(cells)}</w:tr>" for cells in zip(*rendered))
+    parts.append("</w:tbl>")
+    return "".join(parts)
+
+
+def open_document_part(source: Source) -> t.Tuple[zipfile.ZipFile, t.BinaryIO]:
+    """
+    Open the main document part of a docx file
+    :param source: Bytes of the file, a binary file like object or a path
+    :return: The opened zip file and the stream of the document part, both need to be closed
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif isinstance(source, mmap.mmap):
+        source = MappedReader(source)
+    archive = zipfile.ZipFile(source)
+    try:
+        return archive, archive.open(_document_part_name(archive))
+    except Exception:
+        archive.close()
+        raise
+
+
+def scan_document(source: Source) -> DocxStat:
+    """
+    Count the structure of a docx file by streaming its document xml, memory stays constant
+    because every top level paragraph and table is dropped once it has been counted
+    :param source: Bytes of the file, a binary file like object or a path
+    """
+    archive, stream = open_document_part(source)
+    collector = _StatCollector()
+    with archive, stream:
+        for event, element in _iterparse(stream, events=("start", "end")):
+            if event == "start":
+                collector.start(element.tag)
+            elif collector.end(element.tag, element):
+                _release(element)
+    return collector.result()
+
+
+def scan_element(element) -> DocxStat:
+    """
+    Count the structure of an already loaded document element e.g. python-docx document.element
+    without creating Paragraph or Table objects, the tree is left untouched
+    """
+    from lxml.etree import iterwalk
+
+    collector = _StatCollector()
+    for event, item in iterwalk(element, events=("start", "end")):
+        if not isinstance(item.tag, str):
+            continue
+        if event == "start":
+            collector.start(item.tag)
+        else:
+            collector.end(item.tag, item)
+    return collector.result()
+
+
+def _children(element, tag: str) -> t.Iterator:
+    """Children of an element with a tag, looking through content controls and custom markup"""
+    for child in element:
+        if child.tag == tag:
+            yield child
+        elif child.tag in W_WRAPPERS:
+            yield from _children(child, tag)
+
+
+def _cell_text(cell) -> str:
+    """
+    Text of a cell, its paragraphs joined by new lines the same way python-docx does, without
+    the empty paragraphs Word leaves at the end of a cell
+    """
+    paragraphs = []
+    for paragraph in _children(cell, W_P):
+        texts = []
+        for item in paragraph.iter():
+            if item.tag == W_T:
+                texts.append(item.text or "")
+            elif item.tag in W_TEXT_CHARACTERS:
+                texts.append(W_TEXT_CHARACTERS[item.tag])
+        paragraphs.append("".join(texts))
+    while paragraphs and not paragraphs[-1]:
+        paragraphs.pop()
+    return "\n".join(paragraphs)
+
+
+def _cell_xml(properties: str, text: str, run_props: str = "") -> str:
+    """Cell with a single paragraph holding the text, tabs and line breaks become run content"""
+    if not text:
+        return f"<w:tc>{properties}<w:p/></w:tc>"
+    text = escape_xml(ILLEGAL_CHARACTERS.sub("", text))
+    if "\t" in text or "\n" in text or "\r" in text:
+        content = "".join(_run_part(part) for part in RUN_SPECIAL.split(text) if part)
+    else:
+        content = _run_part(text)
+    return f"<w:tc>{properties}<w:p><w:r>{run_props}{content}</w:r></w:p></w:tc>"
+
+
+def _run_part(text: str) -> str:
+    if text == "\t":
+        return "<w:tab/>"
+    if text in ("\n", "\r", "\r\n"):
+        return "<w:br/>"
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f"<w:t{space}>{text}</w:t>"
+
+
+def escape_xml(text: str) -> str:
+    """
+    Escape &, < and > of an xml text, the same replacements as xml.sax.saxutils.escape without
+    importing it, it loads urllib and the http client
+    """
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def quote_xml(text: str) -> str:
+    """
+    Xml attribute value always enclosed in double quotes, inner double quotes become &quot;.
+    xml.sax.saxutils.quoteattr switches to single quotes when the value holds a double quote
+    """
+    text = escape_xml(text).replace('"', "&quot;")
+    for character, entity in (("\n", "&#10;"), ("\r", "&#13;"), ("\t", "&#9;")):
+        text = text.replace(character, entity)
+    return f'"{text}"'
+
+
+def _int_val(properties, tag: str, default: int = 0) -> int:
+    """Integer w:val of a property element, default when missing or invalid"""
+    item = properties.find(tag) if properties is not None else None
+    try:
+        return int(item.get(W_VAL)) if item is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _is_on(properties, tag: str) -> bool:
+    """State of an on/off property, on when present without a false w:val"""
+    item = properties.find(tag) if properties is not None else None
+    return item is not None and item.get(W_VAL, "true") not in ("false", "0", "off")
+
+
+def _continues(properties, tag: str) -> bool:
+    """The cell continues a merge started by a previous cell, a merge without w:val continues"""
+    item = properties.find(tag) if properties is not None else None
+    return item is not None and item.get(W_VAL, "continue") == "continue"
+
+
+def _first_row(table) -> bool:
+    """The table look formats the first row as header, set as attribute or as w:val bitmask"""
+    look = table.find(f"{W_TBL_PR}/{W_TBL_LOOK}")
+    if look is None:
+        return False
+    if look.get(W_FIRST_ROW) is not None:
+        return look.get(W_FIRST_ROW) in ("1", "true", "on")
+    try:
+        return bool(int(look.get(W_VAL, "0"), 16) & TBL_LOOK_FIRST_ROW)
+    except ValueError:
+        return False
+
+
+def _iterparse(stream: t.BinaryIO, events: t.Tuple[str, ...]) -> t.Iterator:
+    """Incremental lxml parser, lxml is imported on first use and comes with python-docx"""
+    from lxml.etree import iterparse
+
+    return iterparse(stream, events=events)
+
+
+def _document_part_name(archive: zipfile.ZipFile) -> str:
+    """Resolve the name of the main document part from the package relationships"""
+    # The relationships are tiny, the standard library parser avoids importing lxml
+    from xml.etree.ElementTree import iterparse
+
+    try:
+        with archive.open("_rels/.rels") as stream:
+            for _, element in iterparse(stream):
+                if (
+                    element.tag == f"{PKG_REL_NS}Relationship"
+                    and element.get("Type") == OFFICE_DOCUMENT
+                ):
+                    return posixpath.normpath(element.get("Target").lstrip("/"))
+    except KeyError:
+        pass
+    return DEFAULT_DOCUMENT_PART
+
+
+def _release(element) -> None:
+    """Free a parsed element and the siblings parsed before it"""
+    element.clear()
+    while element.getprevious() is not None:
+        del element.getparent()[0]
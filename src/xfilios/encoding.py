@@ -0,0 +1,61 @@
+import base64
+import io
+import typing as t
+
+# Multiple of 3 bytes so that every chunk is encoded without padding and the
+# encoded chunks can simply be concatenated
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+BytesLike = t.Union[bytes, bytearray, memoryview]
+
+
+def iter_base64_bytes(
+    data: BytesLike, chunk_size: int = BASE64_CHUNK_SIZE
+) -> t.Iterator[bytes]:
+    """
+    Encode a bytes like object into base64 chunk by chunk, slices are taken through a memoryview
+    so the payload itself is never copied
+    :param data: bytes, bytearray, memoryview or the buffer of a BytesIO
+    :param chunk_size: Number of raw bytes encoded at once, rounded down to a multiple of 3
+    :return: Iterator of base64 encoded bytes
+    """
+    chunk_size -= chunk_size % 3
+    if chunk_size < 3:
+        raise ValueError("chunk_size must be at least 3 bytes")
+    with memoryview(data) as view:
+        view = view.cast("B")
+        for start in range(0, len(view), chunk_size):
+            yield base64.b64encode(view[start : start + chunk_size])
+
+
+def iter_base64(
+    data: BytesLike, chunk_size: int = BASE64_CHUNK_SIZE
+) -> t.Iterator[str]:
+    """
+    Encode a bytes like object into base64 string chunks
+    :param data: bytes, bytearray, memoryview or the buffer of a BytesIO
+    :param chunk_size: Number of raw bytes encoded at once, rounded down to a multiple of 3
+    :return: Iterator of base64 encoded strings, joined together they form the full encoding
+    """
+    for chunk in iter_base64_bytes(data, chunk_size):
+        yield chunk.decode("ascii")
+
+
+def write_base64(
+    data: BytesLike,
+    target: t.Union[t.TextIO, t.BinaryIO],
+    chunk_size: int = BASE64_CHUNK_SIZE,
+) -> int:
+    """
+    Write the base64 encoding of a bytes like object into a text or binary stream
+    :param data: bytes, bytearray, memoryview or the buffer of a BytesIO
+    :param target: Stream to write into, text streams receive str and all others bytes
+    :param chunk_size: Number of raw bytes encoded at once
+    :return: Number of base64 characters written
+    """
+    is_text = isinstance(target, io.TextIOBase)
+    total = 0
+    for chunk in iter_base64_bytes(data, chunk_size):
+        target.write(chunk.decode("ascii") if is_text else chunk)  # type: ignore
+        total += len(chunk)
+    return total
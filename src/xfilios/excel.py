@@ -1,63 +1,466 @@
 from __future__ import annotations
 
-import base64
+import datetime
 import io
+import math
 import typing as t
 
-import pandas as pd
-
+from .cache import ConversionCache, hash_bytes
+from .compression import CompressionPolicy, needs_repack, repack
+from .encoding import BytesLike
+from .exceptions import TableHandlerError
+from .fileio import PathLike, atomic_write
 from .handler import Handler
-from .html import create_download_link
-from .table import TableHandler
+from .html import iter_download_link
+from .table import DEFAULT_CHUNK_SIZE, LazyTableHandler, TableHandler
+
+# openpyxl and pandas are imported by the engines using them, the native xlsx writer is
+# imported when a workbook is written with it
+if t.TYPE_CHECKING:
+    import pandas as pd
+    from openpyxl.cell import WriteOnlyCell
+
+    from . import xlsx
+
+ENGINES = ["openpyxl", "xlsxwriter", "native"]
+# Number of cells from which engine="auto" switches from openpyxl to the native writer
+AUTO_NATIVE_CELLS = 50_000
+
+
+class WriteOptions(t.NamedTuple):
+    """Options of a single ExcelHandler.to_bytes call"""
+
+    streaming: bool = False
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    parallel: bool = False
+    max_workers: t.Optional[int] = None
+    engine: t.Optional[str] = None
 
 
 class ExcelHandler(Handler):
     """Excel handler to create downloadable excel file using Excel Writer"""
 
-    def __init__(self, tables: t.List[TableHandler]):
+    filetype = "xlsx"
+
+    def __init__(
+        self,
+        tables: t.List[TableHandler],
+        cache: t.Optional[ConversionCache] = None,
+        compression: t.Optional[CompressionPolicy] = None,
+        reuse_rendered: bool = False,
+    ):
         """
         Excel Handler objects init
         :param tables: list of TableHandler instances to convert into Excel downloadable link
+        :param cache: Cache to reuse the xlsx file of tables with the same content
+        :param compression: Deflate level per part of the xlsx file, see xfilios.compression.
+            The native engine compresses with it directly, the output of the other engines is
+            repacked. The defaults of the engine are used if not provided
+        :param reuse_rendered: Keep the compressed worksheets rendered by the native engine and
+            reuse them in the next conversions, only the tables added or replaced since are
+            rendered. The tables are assumed to be unchanged once rendered, call clear_rendered
+            after modifying one in place. The worksheets stay in memory until their table is
+            replaced or removed, or clear_rendered is called. The default and "auto" engines are
+            the native writer then, the other engines raise TableHandlerError
         """
+        if compression is not None:
+            compression.check()
         self.tables = tables
+        self.cache = cache
+        self.compression = compression
+        self.reuse_rendered = reuse_rendered
+        # Worksheets rendered by the native writer with their compression level, by id of the
+        # table, only kept when reuse_rendered
+        self._parts: t.Dict[int, t.Tuple[TableHandler, int, xlsx.Part]] = {}
 
     @classmethod
-    def from_table_handlers(cls, *args: TableHandler) -> ExcelHandler:
+    def from_table_handlers(
+        cls,
+        *args: TableHandler,
+        cache: t.Optional[ConversionCache] = None,
+        compression: t.Optional[CompressionPolicy] = None,
+        reuse_rendered: bool = False,
+    ) -> ExcelHandler:
         """
         Create ExcelHandler from list of table Handlers
         :param args: List of TableHandler Object
+        :param cache: Cache to reuse the xlsx file of tables with the same content
+        :param compression: Deflate level per part of the xlsx file
+        :param reuse_rendered: Reuse the worksheets rendered by the native engine, see __init__
         :return: Instance of Type ExcelHandler
         """
         handlers = [handler for handler in args]
-        return cls(tables=handlers)
+        return cls(
+            tables=handlers,
+            cache=cache,
+            compression=compression,
+            reuse_rendered=reuse_rendered,
+        )
+
+    def add_table(self, table: TableHandler, index: t.Optional[int] = None) -> None:
+        """
+        Add a sheet, with reuse_rendered the sheets already rendered by the native engine are
+        reused on the next conversion and only the new one is rendered
+        :param table: Table of the new sheet
+        :param index: Position of the sheet, appended at the end if not provided
+        """
+        if index is None:
+            self.tables.append(table)
+        else:
+            self.tables.insert(index, table)
+
+    def replace_table(self, key: t.Union[str, int], table: TableHandler) -> None:
+        """
+        Replace a sheet, with reuse_rendered only the new table is rendered again by the native
+        engine
+        :param key: Label or position of the sheet to replace
+        :param table: Table of the new sheet
+        """
+        index = self._index(key)
+        self._parts.pop(id(self.tables[index]), None)
+        self.tables[index] = table
+
+    def remove_table(self, key: t.Union[str, int]) -> TableHandler:
+        """
+        Remove a sheet
+        :param key: Label or position of the sheet to remove
+        :return: The removed table
+        """
+        table = self.tables.pop(self._index(key))
+        self._parts.pop(id(table), None)
+        return table
 
-    def to_bytes(self) -> bytes:
-        with io.BytesIO() as output:
-            writer = pd.ExcelWriter(output)
+    def clear_rendered(self) -> None:
+        """Drop the rendered sheets, e.g. after a table has been modified in place"""
+        self._parts.clear()
+
+    def _index(self, key: t.Union[str, int]) -> int:
+        """Position of a sheet given by label or position"""
+        if isinstance(key, int):
+            if not -len(self.tables) <= key < len(self.tables):
+                raise TableHandlerError(f"There is no sheet at position {key}")
+            return key % len(self.tables)
+        for index, table in enumerate(self.tables):
+            if table.get_label() == key:
+                return index
+        raise TableHandlerError(f"There is no sheet labelled {key}")
+
+    def to_bytes(
+        self,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        parallel: bool = False,
+        max_workers: t.Optional[int] = None,
+        engine: t.Optional[str] = None,
+    ) -> bytes:
+        """
+        Convert the table handlers into the bytes of a xlsx file. The engines write the same
+        cells with the same header style and date formats:
+
+        ==========  ===============  ==============  =============  ================
+        engine      speed            memory          parallel       dependency
+        ==========  ===============  ==============  =============  ================
+        openpyxl    1x               table, or chunk no             openpyxl
+                                     when streaming
+        xlsxwriter  ~2x              chunk           no             xlsxwriter
+        native      ~8x              chunk           yes            none
+        ==========  ===============  ==============  =============  ================
+
+        :param streaming: Use the openpyxl write-only workbook and feed it in chunks, memory is bounded
+            by the chunk size instead of the size of the tables. LazyTableHandler tables are read
+            from their source chunk by chunk without being loaded
+        :param chunk_size: Number of rows converted at once when streaming
+        :param parallel: Render every sheet in a process pool with the native xlsx writer and assemble
+            the parts in sheet order, the tables are pickled to the worker processes. Lazy tables
+            with an iterator or unpicklable source, e.g. a lambda, are rendered in this process
+        :param max_workers: Size of the process pool when parallel, defaults to the number of CPUs
+        :param engine: "openpyxl", "xlsxwriter" (constant memory mode), "native" or "auto" which uses
+            the native writer from AUTO_NATIVE_CELLS cells on and openpyxl below. Defaults to
+            openpyxl, or native when parallel or reuse_rendered
+        :return: Bytes of the xlsx file
+        """
+        options = WriteOptions(
+            streaming, chunk_size, parallel, max_workers, self._engine(engine, parallel)
+        )
+        output = self._serialize(options)
+        return output.getvalue() if isinstance(output, io.BytesIO) else output
+
+    def to_buffer(
+        self,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        parallel: bool = False,
+        max_workers: t.Optional[int] = None,
+        engine: t.Optional[str] = None,
+    ) -> io.BytesIO:
+        """
+        Write the table handlers as xlsx file into an in memory buffer, see to_bytes for the parameters
+        :return: BytesIO positioned at the start of the xlsx file
+        """
+        options = WriteOptions(
+            streaming, chunk_size, parallel, max_workers, self._engine(engine, parallel)
+        )
+        output = self._serialize(options)
+        return output if isinstance(output, io.BytesIO) else io.BytesIO(output)
+
+    def _payload(self) -> BytesLike:
+        """View on the rendered buffer, or the cached bytes when a cache is used"""
+        output = self._serialize(WriteOptions(engine=self._engine(None, False)))
+        return output.getbuffer() if isinstance(output, io.BytesIO) else output
+
+    def _serialize(self, options: WriteOptions) -> t.Union[bytes, io.BytesIO]:
+        """Get the xlsx file from the cache if one is used, otherwise render it into a new buffer"""
+        key = self._cache_key(options)
+        if key is None:
+            return self._render(options)
+        return t.cast(ConversionCache, self.cache).get_or_create(
+            key, lambda: self._render(options).getvalue()
+        )
+
+    def to_path(
+        self,
+        path: PathLike,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        parallel: bool = False,
+        max_workers: t.Optional[int] = None,
+        engine: t.Optional[str] = None,
+    ) -> None:
+        """
+        Write the xlsx file into a local file, see to_bytes for the parameters. The engine writes
+        straight into a temporary file in the same directory which replaces path once complete,
+        the workbook is only staged in memory when a cache or a compression policy is used
+        :param path: Path of the file to write
+        """
+        options = WriteOptions(
+            streaming, chunk_size, parallel, max_workers, self._engine(engine, parallel)
+        )
+        with self._stage("write_file") as record:
+            with atomic_write(path) as file:
+                if self.cache is None and self.compression is None:
+                    self._write_engine(file, options)
+                else:
+                    output = self._serialize(options)
+                    file.write(
+                        output.getbuffer() if isinstance(output, io.BytesIO) else output
+                    )
+                record.size = file.tell()
+
+    def _render(self, options: WriteOptions) -> io.BytesIO:
+        """Write the xlsx file into a new buffer"""
+        output = io.BytesIO()
+        self._write_engine(output, options)
+        output.seek(0)
+        if (
+            self.compression is not None
+            and options.engine != "native"
+            and needs_repack(output, self.compression)
+        ):
+            with self._stage("repack") as record:
+                output = repack(output, self.compression)
+                record.size = len(output.getbuffer())
+        output.seek(0)
+        return output
+
+    def _write_engine(self, output: t.BinaryIO, options: WriteOptions) -> None:
+        """Write the xlsx file with the engine of the options"""
+        if options.engine == "native":
+            self._write_native(output, options)
+            return
+        with self._stage("write_xlsx") as record:
+            if options.engine == "xlsxwriter":
+                self._write_xlsxwriter(output, chunk_size=options.chunk_size)
+            elif options.streaming:
+                self._write_streaming(output, chunk_size=options.chunk_size)
+            else:
+                self._write(output)
+            record.size = output.tell()
+
+    def _cache_key(self, options: WriteOptions) -> t.Optional[str]:
+        """
+        Cache key of the workbook, made from the content hash of every table and the writer mode,
+        None when no cache is used or a table can not be hashed. A LazyTableHandler which is not
+        loaded is not hashed, hashing would read its source once more or consume an iterator
+        """
+        if self.cache is None or any(
+            isinstance(table, LazyTableHandler) and not table.is_loaded()
+            for table in self.tables
+        ):
+            return None
+        try:
+            hashes = [table.content_hash() for table in self.tables]
+        except TableHandlerError:
+            return None
+        mode = (options.engine, options.streaming, options.parallel, self.compression)
+        return hash_bytes(repr(("xlsx", mode, hashes)).encode("utf-8"))
+
+    def _engine(self, engine: t.Optional[str], parallel: bool) -> str:
+        """
+        Resolve the engine of a call, parallel rendering and reuse_rendered are only supported by
+        the native writer
+        """
+        if engine is None:
+            return "native" if parallel or self.reuse_rendered else "openpyxl"
+        if engine == "auto":
+            return (
+                "native"
+                if parallel or self.reuse_rendered or self._cells() >= AUTO_NATIVE_CELLS
+                else "openpyxl"
+            )
+        if engine not in ENGINES:
+            raise TableHandlerError(
+                "{} is not a writer engine. Available engines are {}".format(
+                    engine, ", ".join(ENGINES + ["auto"])
+                )
+            )
+        if parallel and engine != "native":
+            raise TableHandlerError(f"parallel is not supported by the {engine} engine")
+        if self.reuse_rendered and engine != "native":
+            raise TableHandlerError(
+                f"reuse_rendered is not supported by the {engine} engine"
+            )
+        return engine
+
+    def _cells(self) -> float:
+        """Number of cells of all the tables, infinite when a lazy table is not loaded yet"""
+        cells = 0
+        for table in self.tables:
+            if isinstance(table, LazyTableHandler) and not table.is_loaded():
+                return float("inf")
+            cells += len(table) * len(table.get_schema())
+        return cells
+
+    def _write(self, output: t.BinaryIO) -> None:
+        """Write all the tables through pandas ExcelWriter"""
+        import pandas as pd
+
+        with pd.ExcelWriter(output) as writer:
             for table in self.tables:
                 df = table.get_data_as_dataframe()
                 label = table.get_label()
                 df.to_excel(writer, sheet_name=label, index=False)
-            writer.save()
-            output.seek(0)
-            return output.read()
+
+    def _write_streaming(self, output: t.BinaryIO, chunk_size: int) -> None:
+        """
+        Write all the tables through a write-only workbook, rows are flushed to a temporary
+        file per sheet so only one chunk of cells is alive at any time
+        """
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        for table in self.tables:
+            worksheet = workbook.create_sheet(title=table.get_label())
+            worksheet.append(_header_cells(worksheet, table.get_schema()))
+            for chunk in table.iter_chunks(chunk_size):
+                for row in _chunk_rows(chunk):
+                    worksheet.append(row)
+        workbook.save(output)
+
+    def _write_xlsxwriter(self, output: t.BinaryIO, chunk_size: int) -> None:
+        """
+        Write all the tables through xlsxwriter in constant memory mode, every row is flushed to
+        a temporary file as soon as it is complete
+        """
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise TableHandlerError(
+                "The xlsxwriter engine requires the xlsxwriter package: pip install xlsxwriter"
+            )
+        from . import xlsx
+
+        titles = [table.get_label() for table in self.tables]
+        xlsx.check_sheet_titles(titles)
+        workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+        header = workbook.add_format(
+            {"bold": True, "border": 1, "align": "center", "valign": "top"}
+        )
+        formats = {
+            datetime.datetime: workbook.add_format(
+                {"num_format": "yyyy-mm-dd hh:mm:ss"}
+            ),
+            datetime.date: workbook.add_format({"num_format": "yyyy-mm-dd"}),
+        }
+        try:
+            for title, table in zip(titles, self.tables):
+                worksheet = workbook.add_worksheet(title)
+                worksheet.write_row(0, 0, [str(c) for c in table.get_schema()], header)
+                row = 1
+                for chunk in table.iter_chunks(chunk_size):
+                    for values in _chunk_rows(chunk):
+                        _write_xlsxwriter_row(worksheet, row, values, formats)
+                        row += 1
+        finally:
+            workbook.close()
+
+    def _write_native(self, output: t.BinaryIO, options: WriteOptions) -> None:
+        """Render the sheets with the native xlsx writer, in a process pool when parallel"""
+        from . import xlsx
+
+        titles = [table.get_label() for table in self.tables]
+        xlsx.check_sheet_titles(titles)
+        with self._stage("render_sheet") as record:
+            sheets = self._render_sheets(options)
+            record.size = sum(sheet.size for sheet in sheets)
+        with self._stage("save_zip") as record:
+            xlsx.write_workbook(output, titles, sheets, policy=self.compression)
+            record.size = output.tell()
+
+    def _render_sheets(self, options: WriteOptions) -> t.List[xlsx.Part]:
+        """
+        Worksheets of all the tables. With reuse_rendered only the tables which were not rendered
+        before are rendered, tables are assumed to be unchanged once rendered, see clear_rendered
+        """
+        from . import xlsx
+
+        reused = self._parts if self.reuse_rendered else {}
+        levels = [self._sheet_level(index) for index in range(1, len(self.tables) + 1)]
+        missing: t.Dict[int, t.Tuple[TableHandler, int]] = {}
+        for table, level in zip(self.tables, levels):
+            entry = reused.get(id(table))
+            if entry is None or entry[0] is not table or entry[1] != level:
+                missing[id(table)] = (table, level)
+        parts = {}
+        for level in sorted({level for _, level in missing.values()}):
+            keys = [key for key, entry in missing.items() if entry[1] == level]
+            rendered = xlsx.render_sheets(
+                [missing[key][0] for key in keys],
+                chunk_size=options.chunk_size,
+                level=level,
+                max_workers=options.max_workers,
+                parallel=options.parallel,
+            )
+            for key, part in zip(keys, rendered):
+                parts[key] = (missing[key][0], level, part)
+        for table in self.tables:
+            if id(table) not in parts:
+                parts[id(table)] = reused[id(table)]
+        if self.reuse_rendered:
+            self._parts = parts
+        return [parts[id(table)][2] for table in self.tables]
+
+    def _sheet_level(self, index: int) -> int:
+        """Compression level of the worksheet at a one based position"""
+        from . import xlsx
+
+        if self.compression is None:
+            return xlsx.DEFAULT_COMPRESS_LEVEL
+        return self.compression.level_for(xlsx.sheet_name(index))
 
     def to_base64_str(self) -> str:
         """
         Convert table handlers into base64 encoded downloadable string
         """
-        byte_data = self.to_bytes()
-        decoded_data = base64.b64encode(byte_data).decode("utf-8")
-        return decoded_data
+        return "".join(self.iter_base64_chunks())
 
     def create_download_link(self, filename: str) -> str:
         """
         Create download links from base 64 encoded string for the frontend
         :param filename: filename to be used when creating downloadable link
         """
-        content = self.to_base64_str()
-        return create_download_link(
-            base64_str=content, filename=filename, filetype="xlsx"
+        chunks = self.iter_base64_chunks()
+        return "".join(
+            iter_download_link(base64_chunks=chunks, filename=filename, filetype="xlsx")
         )
 
     def __str__(self) -> str:
@@ -71,3 +474,50 @@ class ExcelHandler(Handler):
     def __len__(self) -> int:
         """Len implementation provides total number of TableHandler"""
         return len(self.tables)
+
+
+def _header_cells(worksheet, columns: t.Iterable) -> t.List[WriteOnlyCell]:
+    """Create the header row styled the same way as pandas does it for openpyxl"""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    thin = Side(style="thin")
+    cells = []
+    for column in columns:
+        cell = WriteOnlyCell(worksheet, value=str(column))
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal="center", vertical="top")
+        cells.append(cell)
+    return cells
+
+
+def _chunk_rows(chunk: pd.DataFrame) -> t.List[t.Tuple]:
+    """
+    Convert a chunk of a DataFrame into a list of row tuples, with missing values replaced by
+    None so that they are written as empty cells, and infinite values written as "inf" and
+    "-inf" texts the way pandas and the native engine write them
+    """
+    chunk = chunk.astype(object)
+    chunk = chunk.where(chunk.notna(), None)
+    chunk = chunk.replace({math.inf: "inf", -math.inf: "-inf"})
+    return list(chunk.itertuples(index=False, name=None))
+
+
+def _write_xlsxwriter_row(
+    worksheet, row: int, values: t.Tuple, formats: t.Dict
+) -> None:
+    """Write a row of python values, missing values are left as empty cells"""
+    for column, value in enumerate(values):
+        if value is None:
+            continue
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is not None:
+                raise TableHandlerError(
+                    "Excel does not support timezone aware datetimes, convert them first"
+                )
+            worksheet.write_datetime(row, column, value, formats[datetime.datetime])
+        elif isinstance(value, datetime.date):
+            worksheet.write_datetime(row, column, value, formats[datetime.date])
+        else:
+            worksheet.write(row, column, value)
@@ -2,7 +2,8 @@ import typing as t
 
 
 class FileTypeError(Exception):
-    filetypes = ["docx", "xlsx"]
+    # Names of the formats, filled by xfilios.formats.register_format
+    filetypes: t.List[str] = []
 
     def __init__(self, filetype: str) -> None:
         self.filetype = filetype
@@ -10,6 +11,9 @@ class FileTypeError(Exception):
         super().__init__(self.message)
 
     def create_message(self) -> str:
+        # The built-in formats are registered on import, the error can be raised before that
+        from . import formats  # noqa: F401
+
         text1 = f"{self.filetype} is not a excepted file type."
         text2 = "Only excepted file types are {}".format(", ".join(self.filetypes))
         return f"{text1} {text2}"
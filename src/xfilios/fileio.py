@@ -0,0 +1,121 @@
+"""
+Local file access without staging the content in memory. Files are read through a read only
+memory map and written into a temporary file next to the target which is renamed once complete,
+so a reader never sees a half written file.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import mmap
+import os
+import typing as t
+import uuid
+
+PathLike = t.Union[str, "os.PathLike[str]"]
+
+
+def map_file(path: PathLike) -> t.Union[mmap.mmap, bytes]:
+    """
+    Map a file read only into memory, the pages are loaded by the OS on access and shared with
+    the page cache instead of being copied into the process
+    :param path: Path of the file
+    :return: The memory map, bytes for an empty file which can not be mapped
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MappedReader(io.RawIOBase):
+    """
+    Seekable binary reader over a memory map or any other buffer, e.g. for zipfile which needs
+    seekable() that mmap only provides from Python 3.13. Reads copy only the requested range
+    """
+
+    def __init__(self, buffer: t.Union[mmap.mmap, bytes, memoryview]) -> None:
+        super().__init__()
+        self._buffer = buffer
+        with memoryview(buffer) as view:
+            self._size = view.nbytes
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target: t.Any) -> int:
+        end = min(self._position + len(target), self._size)
+        size = max(end - self._position, 0)
+        # The view is only held during the read so the memory map can be closed at any time
+        with memoryview(self._buffer) as view, view.cast("B") as data:
+            target[:size] = data[self._position : end]
+        self._position += size
+        return size
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._position
+        return super().read(size) or b""
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+
+@contextlib.contextmanager
+def atomic_write(path: PathLike) -> t.Iterator[t.BinaryIO]:
+    """
+    Open a temporary file in the directory of path and move it to path when the block succeeds,
+    the target is left untouched when the block raises
+    :param path: Path of the file to write
+    :return: Binary file handle to write into
+    """
+    path = os.fspath(path)
+    fd, temp_path = _create_temp(path)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            yield t.cast(t.BinaryIO, file)
+            file.flush()
+            os.fsync(file.fileno())
+        # A new file keeps the mode given by the umask, a replaced file keeps its mode
+        with contextlib.suppress(FileNotFoundError):
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+
+
+def _create_temp(path: str) -> t.Tuple[int, str]:
+    """
+    Create a new temporary file next to path. It is created with mode 0o666 so the current umask
+    applies the same way as for open(), the umask itself is never read or changed
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        name = f".{os.path.basename(path)}.{uuid.uuid4().hex[:12]}.tmp"
+        temp_path = os.path.join(directory, name)
+        try:
+            return os.open(temp_path, flags, 0o666), temp_path
+        except FileExistsError:
+            continue
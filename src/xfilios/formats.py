@@ -0,0 +1,184 @@
+"""
+Registry of the file formats the handlers produce and TableHandler.from_format reads. A format
+has a MIME type for downloads and, for tabular formats, a reader turning a file into DataFrames.
+pandas and pyarrow are only imported when a file is read.
+"""
+
+from __future__ import annotations
+
+import io
+import typing as t
+
+from .exceptions import FileTypeError, TableHandlerError
+
+# Callable (content, usecols, nrows, **options) -> list of (label, DataFrame)
+FormatReader = t.Callable[..., t.List[t.Tuple[str, t.Any]]]
+# Label of the table of a single table format
+DEFAULT_LABEL = "Sheet1"
+
+
+class FileFormat(t.NamedTuple):
+    """
+    A registered file format
+    :param name: Name of the format, the filetype used by the handlers and the html links
+    :param mime_type: Content type of a download of the format
+    :param extension: File name extension including the dot
+    :param reader: Reader of the tables of a file, None when the format holds no tables
+    """
+
+    name: str
+    mime_type: str
+    extension: str
+    reader: t.Optional[FormatReader] = None
+
+
+FORMATS: t.Dict[str, FileFormat] = {}
+
+
+def register_format(file_format: FileFormat) -> None:
+    """Register a format, replacing a format of the same name"""
+    if file_format.name not in FORMATS:
+        FileTypeError.filetypes.append(file_format.name)
+    FORMATS[file_format.name] = file_format
+
+
+def get_format(name: str) -> FileFormat:
+    """Get a registered format by name, FileTypeError when it is unknown"""
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise FileTypeError(filetype=name)
+
+
+def check_filetype(name: str) -> None:
+    get_format(name)
+
+
+def get_format_reader(name: str) -> FormatReader:
+    """Reader of a registered format, TableHandlerError when the format holds no tables"""
+    reader = get_format(name).reader
+    if reader is None:
+        raise TableHandlerError(f"Tables can not be read from {name} files")
+    return reader
+
+
+def require_pyarrow() -> t.Any:
+    """Import pyarrow, the Parquet and Arrow formats depend on it"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise TableHandlerError(
+            "The parquet and arrow formats require the pyarrow package: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def read_xlsx(
+    content: t.Any,
+    usecols: t.Optional[t.Union[str, t.List]] = None,
+    nrows: t.Optional[int] = None,
+    sheets: t.Optional[t.List[t.Union[str, int]]] = None,
+    engine: str = "openpyxl",
+) -> t.List[t.Tuple[str, t.Any]]:
+    """Read the sheets of a xlsx file with a reader engine, see xfilios.reader"""
+    from .reader import get_reader_engine
+
+    return get_reader_engine(engine)(content, sheets, usecols=usecols, nrows=nrows)
+
+
+def read_csv(
+    content: t.Any,
+    usecols: t.Optional[t.List] = None,
+    nrows: t.Optional[int] = None,
+    **options: t.Any,
+) -> t.List[t.Tuple[str, t.Any]]:
+    """Read a csv file through pandas, options are passed on to pd.read_csv"""
+    import pandas as pd
+
+    return [
+        (DEFAULT_LABEL, pd.read_csv(content, usecols=usecols, nrows=nrows, **options))
+    ]
+
+
+def read_parquet(
+    content: t.Any,
+    usecols: t.Optional[t.List] = None,
+    nrows: t.Optional[int] = None,
+) -> t.List[t.Tuple[str, t.Any]]:
+    """
+    Read a parquet file through pyarrow, only the requested columns are decoded and with nrows
+    only the row groups holding them
+    """
+    pyarrow = require_pyarrow()
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(_arrow_source(pyarrow, content))
+    if nrows is None:
+        table = parquet_file.read(columns=usecols)
+    else:
+        batches = []
+        remaining = nrows
+        for batch in parquet_file.iter_batches(columns=usecols):
+            if remaining <= 0:
+                break
+            batches.append(batch.slice(0, remaining))
+            remaining -= len(batches[-1])
+        schema = parquet_file.schema_arrow
+        if usecols is not None:
+            schema = pyarrow.schema([schema.field(name) for name in usecols])
+        table = pyarrow.Table.from_batches(batches, schema=schema)
+    return [(DEFAULT_LABEL, table.to_pandas())]
+
+
+def read_arrow(
+    content: t.Any,
+    usecols: t.Optional[t.List] = None,
+    nrows: t.Optional[int] = None,
+) -> t.List[t.Tuple[str, t.Any]]:
+    """
+    Read an Arrow IPC file. Bytes and paths are read without copying, a path is memory mapped,
+    the record batches are only sliced and converted into the DataFrame
+    """
+    pyarrow = require_pyarrow()
+    if isinstance(content, str):
+        content = pyarrow.memory_map(content)
+    reader = pyarrow.ipc.open_file(_arrow_source(pyarrow, content))
+    table = reader.read_all()
+    if usecols is not None:
+        table = table.select(usecols)
+    if nrows is not None:
+        table = table.slice(0, nrows)
+    return [(DEFAULT_LABEL, table.to_pandas())]
+
+
+def _arrow_source(pyarrow: t.Any, content: t.Any) -> t.Any:
+    """Wrap bytes like content, or the buffer of a BytesIO, into a zero copy pyarrow reader"""
+    if isinstance(content, io.BytesIO):
+        content = content.getbuffer()[content.tell() :]
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return pyarrow.BufferReader(pyarrow.py_buffer(content))
+    return content
+
+
+register_format(
+    FileFormat(
+        "docx",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ".docx",
+    )
+)
+register_format(
+    FileFormat(
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        ".xlsx",
+        read_xlsx,
+    )
+)
+register_format(FileFormat("csv", "text/csv", ".csv", read_csv))
+register_format(
+    FileFormat("parquet", "application/vnd.apache.parquet", ".parquet", read_parquet)
+)
+register_format(
+    FileFormat("arrow", "application/vnd.apache.arrow.file", ".arrow", read_arrow)
+)
@@ -1,13 +1,264 @@
+import contextlib
+import contextvars
+import io
+import time
+import typing as t
 from abc import ABC, abstractmethod
 
+from . import aio, serve
+from .encoding import BASE64_CHUNK_SIZE, BytesLike, iter_base64, write_base64
+from .fileio import PathLike, atomic_write
+from .html import create_url_link, iter_download_link
+from .serve import DownloadRegistry
+
+# Files up to this size are embedded as data uri by Handler.create_served_link
+INLINE_MAX_BYTES = 1024 * 1024
+
+
+class StageTiming(t.NamedTuple):
+    """
+    Timing of one stage of a conversion. The stages are "decode", "parse", "build_frame",
+    "render_sheet", "render_table", "write_xlsx", "write_csv", "write_parquet", "write_arrow",
+    "save_zip", "repack", "encode" and "write_file"
+    :param handler: Name of the handler class
+    :param stage: Name of the stage
+    :param seconds: Wall time spent in the stage
+    :param size: Number of bytes produced or consumed by the stage, None when not known
+    """
+
+    handler: str
+    stage: str
+    seconds: float
+    size: t.Optional[int] = None
+
+
+StageHook = t.Callable[[StageTiming], None]
+
+_hooks: t.List[StageHook] = []
+_recorder: contextvars.ContextVar[t.Optional[t.List[StageTiming]]] = (
+    contextvars.ContextVar("xfilios_stages", default=None)
+)
+
+
+def add_hook(hook: StageHook) -> None:
+    """Call the hook with the StageTiming of every stage of every conversion, e.g. to export metrics"""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: StageHook) -> None:
+    """Remove a hook added with add_hook"""
+    _hooks.remove(hook)
+
+
+@contextlib.contextmanager
+def record_stages() -> t.Iterator[t.List[StageTiming]]:
+    """
+    Collect the timings of the conversions run inside the block, including the ones awaited
+    through the async methods
+    :return: List filled with StageTiming in the order the stages finished
+    """
+    stages: t.List[StageTiming] = []
+    token = _recorder.set(stages)
+    try:
+        yield stages
+    finally:
+        _recorder.reset(token)
+
+
+def is_recording() -> bool:
+    """True when a hook is installed or a record_stages block is active"""
+    return bool(_hooks) or _recorder.get() is not None
+
+
+def emit(timing: StageTiming) -> None:
+    """Hand a timing over to the active record_stages block and the hooks"""
+    stages = _recorder.get()
+    if stages is not None:
+        stages.append(timing)
+    for hook in list(_hooks):
+        hook(timing)
+
+
+class Stage:
+    """Context manager timing a stage, set size inside the block to record the bytes"""
+
+    __slots__ = ("handler", "stage", "size", "start")
+
+    def __init__(self, handler: str, stage: str) -> None:
+        self.handler = handler
+        self.stage = stage
+        self.size: t.Optional[int] = None
+        self.start = 0.0
+
+    def __enter__(self) -> "Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        seconds = time.perf_counter() - self.start
+        emit(StageTiming(self.handler, self.stage, seconds, self.size))
+
+
+class _NullStage:
+    """Stage used while nothing is recording, does not read the clock"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        pass
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(handler: str, name: str) -> t.Union[Stage, _NullStage]:
+    """
+    Time a stage of a conversion, a shared no-op context manager is returned when nothing records
+    :param handler: Name of the handler class
+    :param name: Name of the stage
+    """
+    if not _hooks and _recorder.get() is None:
+        return _NULL_STAGE
+    return Stage(handler, name)
+
 
 class Handler(ABC):
     """A Abstract handler interface"""
 
+    # Type of the file the handler produces, a format registered in xfilios.formats
+    filetype: str = ""
+
     @abstractmethod
     def to_base64_str(self) -> str:
         raise NotImplementedError
 
+    @abstractmethod
+    def to_buffer(self) -> io.BytesIO:
+        """Serialize the content into an in memory buffer positioned at the start"""
+        raise NotImplementedError
+
+    def to_bytes(self) -> bytes:
+        """Serialize the content into bytes"""
+        return bytes(self._payload())
+
+    @abstractmethod
+    def create_download_link(self, filename: str) -> str:
+        """Create a html anchor tag downloading the content"""
+        raise NotImplementedError
+
+    def to_path(self, path: PathLike) -> None:
+        """
+        Write the content into a local file, through a temporary file in the same directory
+        which replaces path once it is complete
+        :param path: Path of the file to write
+        """
+        with self._stage("write_file") as record:
+            with atomic_write(path) as file:
+                self._write_file(file)
+                record.size = file.tell()
+
+    def _write_file(self, file: t.BinaryIO) -> None:
+        """Write the content into an open binary file, by default the payload at once"""
+        file.write(self._payload())
+
+    def create_served_link(
+        self,
+        filename: str,
+        base_url: str,
+        registry: t.Optional[DownloadRegistry] = None,
+        inline_max_bytes: int = INLINE_MAX_BYTES,
+    ) -> str:
+        """
+        Create a download link carrying only an url, the file is registered in a DownloadRegistry
+        and streamed by the app of xfilios.serve mounted at base_url. Files up to inline_max_bytes
+        are still embedded as data uri, see create_download_link
+        :param filename: Name of the File when downloaded
+        :param base_url: Url the serve app is mounted at e.g. "/downloads"
+        :param registry: Registry the app serves from, defaults to serve.DEFAULT_REGISTRY
+        :param inline_max_bytes: Size up to which the data uri link is used
+        """
+        payload = self._payload()
+        if memoryview(payload).nbytes <= inline_max_bytes:
+            return "".join(
+                iter_download_link(
+                    iter_base64(payload, BASE64_CHUNK_SIZE), filename, self.filetype
+                )
+            )
+        registry = serve.DEFAULT_REGISTRY if registry is None else registry
+        token = registry.register(payload, filename, self.filetype)
+        url = f"{base_url.rstrip('/')}/{token}"
+        return create_url_link(url, filename, self.filetype)
+
+    async def ato_bytes(self, *args: t.Any, **kwargs: t.Any) -> bytes:
+        """Async to_bytes, run in the executor configured with xfilios.aio.configure"""
+        return await aio.run(self.to_bytes, *args, **kwargs)
+
+    async def ato_buffer(self, *args: t.Any, **kwargs: t.Any) -> io.BytesIO:
+        """Async to_buffer, run in the executor configured with xfilios.aio.configure"""
+        return await aio.run(self.to_buffer, *args, **kwargs)
+
+    async def ato_base64_str(self) -> str:
+        """Async to_base64_str, run in the executor configured with xfilios.aio.configure"""
+        return await aio.run(self.to_base64_str)
+
+    async def acreate_download_link(self, filename: str) -> str:
+        """Async create_download_link, run in the executor configured with xfilios.aio.configure"""
+        return await aio.run(self.create_download_link, filename)
+
+    def iter_base64_chunks(
+        self, chunk_size: int = BASE64_CHUNK_SIZE
+    ) -> t.Iterator[str]:
+        """
+        Encode the content into base64 chunk by chunk, straight from the buffer of the writer
+        :param chunk_size: Number of raw bytes encoded at once
+        :return: Iterator of base64 encoded strings
+        """
+        payload = self._payload()
+        if not is_recording():
+            yield from iter_base64(payload, chunk_size)
+            return
+        # Only the encoding is timed, not the consumer of the chunks
+        seconds = 0.0
+        chunks = iter_base64(payload, chunk_size)
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+            yield chunk
+        emit(StageTiming(type(self).__name__, "encode", seconds, len(payload)))
+
+    def write_base64(
+        self,
+        target: t.Union[t.TextIO, t.BinaryIO],
+        chunk_size: int = BASE64_CHUNK_SIZE,
+    ) -> int:
+        """
+        Write the base64 encoded content into a text or binary stream
+        :param target: Stream to write into
+        :param chunk_size: Number of raw bytes encoded at once
+        :return: Number of base64 characters written
+        """
+        payload = self._payload()
+        with self._stage("encode") as record:
+            record.size = len(payload)
+            return write_base64(payload, target, chunk_size)
+
+    def _stage(self, name: str) -> t.Union[Stage, _NullStage]:
+        """Time a stage of a conversion of this handler, see stage"""
+        return stage(type(self).__name__, name)
+
+    def _payload(self) -> BytesLike:
+        """Serialized content as bytes like object, by default a view on the buffer of to_buffer"""
+        return self.to_buffer().getbuffer()
+
     @abstractmethod
     def __str__(self) -> str:
         raise NotImplementedError
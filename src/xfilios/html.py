@@ -1,8 +1,39 @@
-from .exceptions import FileTypeError
+import typing as t
+
+from .formats import check_filetype
 
 
 def create_download_link(base64_str: str, filename: str, filetype: str) -> str:
-    accepted_type = ["docx", "xlsx"]
-    if filetype not in accepted_type:
-        raise FileTypeError(filetype=filetype)
+    check_filetype(filetype)
     return f'<a href="data:application/octet-stream;base64,{base64_str}" download="{filename}">Click To Download</a>'
+
+
+def create_url_link(url: str, filename: str, filetype: str) -> str:
+    """
+    Anchor tag downloading a file served over http, e.g. by xfilios.serve
+    :param url: Url of the file
+    :param filename: Name of the File when downloaded
+    :param filetype: Type of the file, a format registered in xfilios.formats
+    """
+    check_filetype(filetype)
+    return f'<a href="{url}" download="{filename}">Click To Download</a>'
+
+
+def iter_download_link(
+    base64_chunks: t.Iterable[str], filename: str, filetype: str
+) -> t.Iterator[str]:
+    """
+    Build the same anchor tag as create_download_link from chunks of a base64 string, the
+    anchor is yielded piece by piece so it can be joined once or written into a stream
+    :param base64_chunks: Iterable of base64 encoded chunks e.g. from Handler.iter_base64_chunks
+    :param filename: Name of the File when downloaded
+    :param filetype: Type of the file, a format registered in xfilios.formats
+    """
+    check_filetype(filetype)
+    return _iter_anchor(base64_chunks, filename)
+
+
+def _iter_anchor(base64_chunks: t.Iterable[str], filename: str) -> t.Iterator[str]:
+    yield '<a href="data:application/octet-stream;base64,'
+    yield from base64_chunks
+    yield f'" download="{filename}">Click To Download</a>'
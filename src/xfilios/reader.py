@@ -0,0 +1,399 @@
+"""
+Reader engines turning a xlsx file into DataFrames. The default engine goes through pandas and
+openpyxl, the fast engine streams the sheet xml out of the zip container with an incremental
+parser and collects the values column by column.
+"""
+
+from __future__ import annotations
+
+import datetime
+import posixpath
+import re
+import typing as t
+import zipfile
+
+from .exceptions import TableHandlerError
+
+# pandas and lxml are imported when a workbook is read
+if t.TYPE_CHECKING:
+    import pandas as pd
+
+ReaderEngine = t.Callable[..., t.List[t.Tuple[str, "pd.DataFrame"]]]
+SheetSelection = t.Optional[t.List[t.Union[str, int]]]
+UseCols = t.Optional[t.Union[str, t.List]]
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+TAG_ROW = f"{MAIN_NS}row"
+TAG_C = f"{MAIN_NS}c"
+TAG_V = f"{MAIN_NS}v"
+TAG_IS = f"{MAIN_NS}is"
+TAG_T = f"{MAIN_NS}t"
+TAG_R = f"{MAIN_NS}r"
+
+# Strings pandas reads as missing values by default
+NA_VALUES = frozenset(
+    [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+# Built in number formats of Excel which display a date or a time
+DATE_FORMAT_IDS = frozenset(list(range(14, 23)) + list(range(45, 48)))
+DATE_FORMAT_CODE = re.compile(r"[dmyhs]", re.IGNORECASE)
+FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+DIGITS = "0123456789"
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
+READER_ENGINES: t.Dict[str, ReaderEngine] = {}
+
+
+def register_reader_engine(name: str, engine: ReaderEngine) -> None:
+    """
+    Register an engine usable with TableHandler.from_file_like(engine=name)
+    :param name: Name of the engine
+    :param engine: Callable (content, sheets, usecols, nrows) -> list of (sheet name, DataFrame)
+    """
+    READER_ENGINES[name] = engine
+
+
+def get_reader_engine(name: str) -> ReaderEngine:
+    """Get a registered reader engine by name"""
+    try:
+        return READER_ENGINES[name]
+    except KeyError:
+        raise TableHandlerError(
+            "{} is not a reader engine. Available engines are {}".format(
+                name, ", ".join(READER_ENGINES)
+            )
+        )
+
+
+def select_sheets(sheet_names: t.List[str], sheets: SheetSelection) -> t.List[str]:
+    """Resolve the requested sheet names or positions into sheet names"""
+    if sheets is None:
+        return list(sheet_names)
+    selected = []
+    for sheet in sheets:
+        if isinstance(sheet, int):
+            if not -len(sheet_names) <= sheet < len(sheet_names):
+                raise TableHandlerError(f"Workbook has no sheet at position {sheet}")
+            selected.append(sheet_names[sheet])
+        elif sheet in sheet_names:
+            selected.append(sheet)
+        else:
+            raise TableHandlerError(f"Workbook has no sheet named {sheet}")
+    return selected
+
+
+def read_openpyxl(
+    content: t.Union[t.BinaryIO, str],
+    sheets: SheetSelection = None,
+    usecols: UseCols = None,
+    nrows: t.Optional[int] = None,
+) -> t.List[t.Tuple[str, pd.DataFrame]]:
+    """Read the sheets through pandas and openpyxl, handles every feature of the format"""
+    import pandas as pd
+
+    with pd.ExcelFile(content) as workbook:
+        names = select_sheets(workbook.sheet_names, sheets)
+        return [
+            (name, workbook.parse(name, usecols=usecols, nrows=nrows)) for name in names
+        ]
+
+
+def read_fast(
+    content: t.Union[t.BinaryIO, str],
+    sheets: SheetSelection = None,
+    usecols: UseCols = None,
+    nrows: t.Optional[int] = None,
+) -> t.List[t.Tuple[str, pd.DataFrame]]:
+    """
+    Read the sheets by streaming their xml from the zip container. Only cell values are read,
+    the first row is the header. Formulas give their cached value and rich text its plain text.
+    Columns mixing booleans and missing values stay object columns
+    """
+    with zipfile.ZipFile(content) as archive:
+        paths = _sheet_paths(archive)
+        names = select_sheets(list(paths), sheets)
+        shared_strings = _read_shared_strings(archive)
+        date_styles = _read_date_styles(archive)
+        frames = []
+        for name in names:
+            with archive.open(paths[name]) as stream:
+                df = _read_sheet(stream, shared_strings, date_styles, usecols, nrows)
+            frames.append((name, df))
+        return frames
+
+
+def _sheet_paths(archive: zipfile.ZipFile) -> t.Dict[str, str]:
+    """Map the sheet names to the path of their xml in workbook order"""
+    targets = {}
+    with archive.open("xl/_rels/workbook.xml.rels") as stream:
+        for _, element in _iterparse(stream):
+            if element.tag == f"{PKG_REL_NS}Relationship":
+                target = element.get("Target")
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join("xl", target))
+                targets[element.get("Id")] = target
+    paths = {}
+    with archive.open("xl/workbook.xml") as stream:
+        for _, element in _iterparse(stream):
+            if element.tag == f"{MAIN_NS}sheet":
+                paths[element.get("name")] = targets[element.get(f"{REL_NS}id")]
+    return paths
+
+
+def _read_shared_strings(archive: zipfile.ZipFile) -> t.List[str]:
+    """Read the shared string table, rich text is flattened into plain text"""
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as stream:
+        for _, element in _iterparse(stream):
+            if element.tag == f"{MAIN_NS}si":
+                strings.append(_inline_text(element))
+                element.clear()
+    return strings
+
+
+def _read_date_styles(archive: zipfile.ZipFile) -> t.FrozenSet[int]:
+    """Indexes of the cell styles displaying their number as a date"""
+    if "xl/styles.xml" not in archive.namelist():
+        return frozenset()
+    custom_formats = {}
+    formats = []
+    in_cell_xfs = False
+    with archive.open("xl/styles.xml") as stream:
+        for event, element in _iterparse(stream, events=("start", "end")):
+            if element.tag == f"{MAIN_NS}cellXfs":
+                in_cell_xfs = event == "start"
+            elif event == "end" and element.tag == f"{MAIN_NS}numFmt":
+                custom_formats[int(element.get("numFmtId"))] = element.get("formatCode")
+            elif event == "end" and in_cell_xfs and element.tag == f"{MAIN_NS}xf":
+                formats.append(int(element.get("numFmtId", 0)))
+    return frozenset(
+        index
+        for index, format_id in enumerate(formats)
+        if _is_date_format(format_id, custom_formats.get(format_id))
+    )
+
+
+def _is_date_format(format_id: int, format_code: t.Optional[str]) -> bool:
+    if format_code is None:
+        return format_id in DATE_FORMAT_IDS
+    code = FORMAT_LITERALS.sub("", format_code.split(";")[0])
+    return DATE_FORMAT_CODE.search(code) is not None
+
+
+def _inline_text(element) -> str:
+    """Text of a si or is element, phonetic runs are skipped"""
+    texts = []
+    for child in element:
+        if child.tag == TAG_T:
+            texts.append(child.text or "")
+        elif child.tag == TAG_R:
+            texts.extend(run.text or "" for run in child if run.tag == TAG_T)
+    return "".join(texts)
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _usecols_filter(
+    usecols: UseCols, header: t.Dict[int, t.Any]
+) -> t.Optional[t.Set[int]]:
+    """Resolve usecols into the set of column indexes to keep, None keeps all the columns"""
+    if usecols is None:
+        return None
+    if isinstance(usecols, str):
+        indexes = set()
+        for part in usecols.replace(" ", "").upper().split(","):
+            first, _, last = part.partition(":")
+            start = _column_index(first)
+            indexes.update(range(start, _column_index(last or first) + 1))
+        return indexes
+    names = {str(value): index for index, value in header.items()}
+    indexes = set()
+    for column in usecols:
+        if isinstance(column, int):
+            indexes.add(column)
+        elif str(column) in names:
+            indexes.add(names[str(column)])
+        else:
+            raise TableHandlerError(
+                f"Usecols do not match columns, column not found {column}"
+            )
+    return indexes
+
+
+def _cell_value(element, shared_strings, date_styles):
+    """Convert a c element into a python value, None for empty and missing values"""
+    cell_type = element.get("t", "n")
+    if cell_type == "inlineStr":
+        inline = element.find(TAG_IS)
+        value = _inline_text(inline) if inline is not None else ""
+        return None if value in NA_VALUES else value
+    text = element.findtext(TAG_V)
+    if text is None or cell_type == "e":
+        return None
+    if cell_type == "s":
+        value = shared_strings[int(text)]
+        return None if value in NA_VALUES else value
+    if cell_type in ("str", "d"):
+        return None if text in NA_VALUES else text
+    if cell_type == "b":
+        return text == "1"
+    number = float(text)
+    if date_styles and int(element.get("s", 0)) in date_styles:
+        days, fraction = divmod(number, 1)
+        milliseconds = round(fraction * 86_400_000)
+        return EXCEL_EPOCH + datetime.timedelta(days=days, milliseconds=milliseconds)
+    return int(number) if number.is_integer() else number
+
+
+def _read_sheet(
+    stream: t.BinaryIO,
+    shared_strings: t.List[str],
+    date_styles: t.FrozenSet[int],
+    usecols: UseCols,
+    nrows: t.Optional[int],
+) -> pd.DataFrame:
+    """Read a worksheet into columns, the first non empty row is the header"""
+    header: t.Dict[int, t.Any] = {}
+    keep: t.Optional[t.Set[int]] = None
+    columns: t.Dict[int, t.List] = {}
+    indexes: t.Dict[str, int] = {}
+    total = 0
+    for element in _iter_rows(stream):
+        if nrows is not None and total >= nrows:
+            break
+        if not header:
+            for position, cell in enumerate(element.iter(TAG_C)):
+                value = _cell_value(cell, shared_strings, date_styles)
+                if value is not None:
+                    header[_cell_index(cell, position, indexes)] = value
+            keep = _usecols_filter(usecols, header) if header else None
+            if keep is not None:
+                header = {
+                    index: value for index, value in header.items() if index in keep
+                }
+            continue
+        found = False
+        for position, cell in enumerate(element.iter(TAG_C)):
+            index = _cell_index(cell, position, indexes)
+            if keep is not None and index not in keep:
+                continue
+            value = _cell_value(cell, shared_strings, date_styles)
+            if value is None:
+                continue
+            found = True
+            column = columns.get(index)
+            if column is None:
+                column = columns[index] = []
+            if len(column) < total:
+                column.extend([None] * (total - len(column)))
+            column.append(value)
+        if found:
+            total += 1
+    return _build_frame(header, columns, total, keep)
+
+
+def _cell_index(cell, position: int, indexes: t.Dict[str, int]) -> int:
+    """Zero based column index of a c element, the column letters are parsed once per sheet"""
+    reference = cell.get("r")
+    if not reference:
+        return position
+    letters = reference.rstrip(DIGITS)
+    index = indexes.get(letters)
+    if index is None:
+        index = indexes[letters] = _column_index(letters)
+    return index
+
+
+def _build_frame(
+    header: t.Dict[int, t.Any],
+    columns: t.Dict[int, t.List],
+    total: int,
+    keep: t.Optional[t.Set[int]],
+) -> pd.DataFrame:
+    """Build the DataFrame from the collected columns, named like pandas names them"""
+    import pandas as pd
+
+    indexes = set(header) | set(columns)
+    if keep is not None:
+        indexes |= {index for index in keep if index <= max(indexes, default=-1)}
+    width = max(indexes, default=-1) + 1
+    data = {}
+    names: t.Dict[str, int] = {}
+    for index in range(width):
+        if keep is not None and index not in keep:
+            continue
+        name = header.get(index)
+        name = f"Unnamed: {index}" if name is None else name
+        if name in names:
+            names[name] += 1
+            name = f"{name}.{names[name]}"
+        else:
+            names[name] = 0
+        column = columns.get(index, [])
+        column.extend([None] * (total - len(column)))
+        data[name] = _build_series(column)
+    return pd.DataFrame(data)
+
+
+def _build_series(values: t.List) -> pd.Series:
+    """Build a column, strings holding numbers are converted the same way pandas does it"""
+    import pandas as pd
+
+    series = pd.Series(values, dtype=None if values else object)
+    if any(isinstance(value, str) for value in values):
+        try:
+            return pd.to_numeric(series)
+        except (ValueError, TypeError):
+            return series
+    return series
+
+
+def _iter_rows(stream: t.BinaryIO) -> t.Iterator:
+    """Yield the row elements of a worksheet, every row is cleared once it has been read"""
+    for _, element in _iterparse(stream, tag=TAG_ROW):
+        yield element
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def _iterparse(stream: t.BinaryIO, **options: t.Any) -> t.Iterator:
+    """Incremental lxml parser of a part, lxml comes with python-docx"""
+    from lxml.etree import iterparse
+
+    return iterparse(stream, **options)
+
+
+register_reader_engine("openpyxl", read_openpyxl)
+register_reader_engine("fast", read_fast)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import typing as t
+
+from .exceptions import TableHandlerError
+
+# pandas and numpy are imported when a schema is applied
+if t.TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+BOOLEAN_VALUES = {
+    True: True,
+    False: False,
+    1: True,
+    0: False,
+    "true": True,
+    "false": False,
+    "True": True,
+    "False": False,
+    "TRUE": True,
+    "FALSE": False,
+}
+
+
+class Column(t.NamedTuple):
+    """
+    Definition of a single column of a Schema
+    :param name: Name of the column in the TableHandler
+    :param dtype: Target dtype e.g. "int64", "float32", "datetime64[ns]", "bool", "category"
+    :param nullable: If False every missing value is reported as violation
+    :param rename_from: Key or header of the column in the source data, defaults to name
+    """
+
+    name: str
+    dtype: t.Optional[str] = None
+    nullable: bool = True
+    rename_from: t.Optional[str] = None
+
+    @property
+    def source(self) -> str:
+        """Name of the column in the source data"""
+        return self.rename_from or self.name
+
+
+class ValidationReport:
+    """Result of applying a Schema, the row positions failing each check per column"""
+
+    def __init__(self) -> None:
+        self.missing_columns: t.List[str] = []
+        self.coercion_errors: t.Dict[str, t.List[int]] = {}
+        self.null_violations: t.Dict[str, t.List[int]] = {}
+
+    def is_valid(self) -> bool:
+        """True when no column is missing and every value passed the checks"""
+        return not (
+            self.missing_columns or self.coercion_errors or self.null_violations
+        )
+
+    def invalid_rows(self) -> t.List[int]:
+        """Sorted row positions having at least one violation"""
+        rows: t.Set[int] = set()
+        for positions in [
+            *self.coercion_errors.values(),
+            *self.null_violations.values(),
+        ]:
+            rows.update(positions)
+        return sorted(rows)
+
+    def to_dict(self) -> t.Dict:
+        return {
+            "valid": self.is_valid(),
+            "missing_columns": self.missing_columns,
+            "coercion_errors": self.coercion_errors,
+            "null_violations": self.null_violations,
+        }
+
+    def __str__(self) -> str:
+        """String representation of the class"""
+        return (
+            f"{self.__class__.__name__}(valid={self.is_valid()}, "
+            f"missing_columns={self.missing_columns}, "
+            f"coercion_errors={list(self.coercion_errors)}, "
+            f"null_violations={list(self.null_violations)})"
+        )
+
+    def __repr__(self) -> str:
+        """Dev string representation of the class"""
+        return f"{self.__class__.__name__}({self.to_dict()})"
+
+
+class Schema:
+    """Typed schema applied to records or rows while the DataFrame is built"""
+
+    def __init__(self, columns: t.List[Column]) -> None:
+        """
+        Initializer of the Schema class
+        :param columns: Columns in the order they should have in the table
+        """
+        names = [column.name for column in columns]
+        if len(set(names)) != len(names):
+            raise TableHandlerError("Column names of a schema must be unique")
+        self.columns = columns
+
+    def get_names(self) -> t.List[str]:
+        """Names of the columns in the table"""
+        return [column.name for column in self.columns]
+
+    def apply(self, data: t.Sequence) -> t.Tuple[pd.DataFrame, ValidationReport]:
+        """
+        Build the DataFrame from records (dicts) or rows (lists/tuples in schema order) in one
+        pass with only the schema columns. Every column is then coerced and checked with
+        vectorized operations
+        :param data: List of records or rows
+        :return: The DataFrame and the validation report, invalid values are left as missing
+        """
+        import numpy as np
+        import pandas as pd
+
+        report = ValidationReport()
+        sources = [column.source for column in self.columns]
+        try:
+            df = pd.DataFrame.from_records(data, columns=sources)
+        except Exception as e:
+            raise TableHandlerError(e)
+        if len(data) and isinstance(data[0], dict):
+            # A key absent from every record leaves an empty column, only those are looked up
+            report.missing_columns = [
+                column.name
+                for position, column in enumerate(self.columns)
+                if df.iloc[:, position].isna().all()
+                and not any(column.source in record for record in data)
+            ]
+        df.columns = self.get_names()
+        for column in self.columns:
+            if column.name in report.missing_columns:
+                continue
+            values, failed = _coerce(df[column.name], column.dtype)
+            df[column.name] = values
+            if failed.any():
+                report.coercion_errors[column.name] = np.flatnonzero(failed).tolist()
+            if not column.nullable:
+                violations = values.isna().to_numpy() & ~failed
+                if violations.any():
+                    report.null_violations[column.name] = np.flatnonzero(
+                        violations
+                    ).tolist()
+        return df, report
+
+    def __str__(self) -> str:
+        """String representation of the class"""
+        return f"{self.__class__.__name__}({self.get_names()})"
+
+    def __repr__(self) -> str:
+        """Dev string representation of the class"""
+        return f"{self.__class__.__name__}({self.columns})"
+
+    def __len__(self) -> int:
+        """Number of columns in the schema"""
+        return len(self.columns)
+
+
+def _coerce(
+    values: pd.Series, dtype: t.Optional[str]
+) -> t.Tuple[pd.Series, np.ndarray]:
+    """
+    Convert a column into the target dtype
+    :return: The converted column and a mask of the values which could not be converted
+    """
+    import numpy as np
+    import pandas as pd
+
+    present = values.notna().to_numpy()
+    if dtype is None:
+        return values, np.zeros(len(values), dtype=bool)
+    if dtype in ("bool", "boolean"):
+        converted = values.astype(object).map(BOOLEAN_VALUES).astype("boolean")
+        failed = present & converted.isna().to_numpy()
+        if dtype == "bool" and not converted.isna().any():
+            converted = converted.astype(bool)
+        return converted, failed
+    try:
+        target = pd.api.types.pandas_dtype(dtype)
+    except TypeError as e:
+        raise TableHandlerError(e)
+    kind = target.kind if isinstance(target, np.dtype) else None
+    if kind == "f":
+        converted = pd.to_numeric(values, errors="coerce")
+        return converted.astype(target), present & converted.isna().to_numpy()
+    if kind in ("i", "u"):
+        converted = pd.to_numeric(values, errors="coerce")
+        # Values which are not integral or do not fit into the target dtype are failed
+        limits = np.iinfo(target)
+        valid = (converted % 1 == 0) & converted.between(limits.min, limits.max)
+        converted = converted.where(converted.isna() | valid)
+        failed = present & converted.isna().to_numpy()
+        if not converted.isna().any():
+            return converted.astype(target), failed
+        # Integer columns with missing values use the nullable integer dtype
+        nullable = f"{'UInt' if kind == 'u' else 'Int'}{target.itemsize * 8}"
+        return converted.astype(nullable), failed
+    if kind == "M":
+        converted = pd.to_datetime(values, errors="coerce").astype(target)
+        return converted, present & converted.isna().to_numpy()
+    try:
+        return values.astype(target), np.zeros(len(values), dtype=bool)
+    except (TypeError, ValueError):
+        return pd.Series(pd.NA, index=values.index, dtype=object), present
@@ -0,0 +1,198 @@
+"""
+Delivery of the serialized files over plain HTTP. The bytes are registered under a short lived
+token and streamed in chunks by a small WSGI or ASGI app, the download link only carries the URL.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+import typing as t
+from urllib.parse import quote
+
+from .encoding import BytesLike
+from .formats import check_filetype, get_format
+
+DEFAULT_TTL = 300
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class Download(t.NamedTuple):
+    """A registered file"""
+
+    data: BytesLike
+    filename: str
+    filetype: str
+    expires: float
+
+    @property
+    def size(self) -> int:
+        return memoryview(self.data).nbytes
+
+    def headers(self) -> t.List[t.Tuple[str, str]]:
+        """Response headers of the download"""
+        fallback = self.filename.encode("ascii", "replace").decode("ascii")
+        fallback = fallback.replace('"', "").replace("\\", "")
+        disposition = f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(self.filename)}"
+        return [
+            ("Content-Type", get_format(self.filetype).mime_type),
+            ("Content-Length", str(self.size)),
+            ("Content-Disposition", disposition),
+            ("Cache-Control", "no-store"),
+        ]
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> t.Iterator[bytes]:
+        """Body of the response in chunks, only one chunk is copied at a time"""
+        view = memoryview(self.data).cast("B")
+        for start in range(0, len(view), chunk_size):
+            yield view[start : start + chunk_size].tobytes()
+
+
+class DownloadRegistry:
+    """Thread safe store of the files waiting to be downloaded, entries expire after a ttl"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, single_use: bool = False) -> None:
+        """
+        Initializer of the DownloadRegistry class
+        :param ttl: Seconds a registered file can be downloaded
+        :param single_use: Remove a file once it has been downloaded, HEAD requests keep it
+        """
+        self.ttl = ttl
+        self.single_use = single_use
+        self._downloads: t.Dict[str, Download] = {}
+        self._lock = threading.Lock()
+
+    def register(self, data: BytesLike, filename: str, filetype: str) -> str:
+        """
+        Register the bytes of a file
+        :param data: Content of the file, kept as is without copying
+        :param filename: Name of the file when downloaded
+        :param filetype: Type of the file, a format registered in xfilios.formats
+        :return: Url safe token of the download
+        """
+        check_filetype(filetype)
+        token = secrets.token_urlsafe(16)
+        download = Download(data, filename, filetype, time.monotonic() + self.ttl)
+        with self._lock:
+            self._purge()
+            self._downloads[token] = download
+        return token
+
+    def get(self, token: str, consume: bool = True) -> t.Optional[Download]:
+        """
+        The registered file of a token, None when unknown or expired
+        :param token: Token returned by register
+        :param consume: Remove a single_use file, False only looks it up e.g. for HEAD requests
+        """
+        with self._lock:
+            self._purge()
+            if self.single_use and consume:
+                return self._downloads.pop(token, None)
+            return self._downloads.get(token)
+
+    def remove(self, token: str) -> None:
+        with self._lock:
+            self._downloads.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._downloads.clear()
+
+    def _purge(self) -> None:
+        """Drop the expired downloads, the lock must be held"""
+        now = time.monotonic()
+        for token in [k for k, v in self._downloads.items() if v.expires <= now]:
+            del self._downloads[token]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge()
+            return len(self._downloads)
+
+    def __contains__(self, token: str) -> bool:
+        with self._lock:
+            self._purge()
+            return token in self._downloads
+
+
+DEFAULT_REGISTRY = DownloadRegistry()
+
+
+def _token(path: str) -> str:
+    """Token of a request path, the last segment e.g. /downloads/<token>"""
+    return path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def wsgi_app(
+    registry: DownloadRegistry = DEFAULT_REGISTRY, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> t.Callable:
+    """
+    WSGI app serving the registered files at <mount point>/<token>, e.g. mounted in Flask or Dash
+    with werkzeug DispatcherMiddleware
+    """
+
+    def app(environ: t.Dict, start_response: t.Callable) -> t.Iterable[bytes]:
+        method = environ.get("REQUEST_METHOD", "GET")
+        if method not in ("GET", "HEAD"):
+            start_response("405 Method Not Allowed", [("Allow", "GET, HEAD")])
+            return [b""]
+        download = registry.get(
+            _token(environ.get("PATH_INFO", "")), consume=method == "GET"
+        )
+        if download is None:
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"Download not found or expired"]
+        start_response("200 OK", download.headers())
+        if method == "HEAD":
+            return [b""]
+        return download.iter_chunks(chunk_size)
+
+    return app
+
+
+def asgi_app(
+    registry: DownloadRegistry = DEFAULT_REGISTRY, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> t.Callable:
+    """
+    ASGI app serving the registered files at <mount point>/<token>, e.g. mounted in FastAPI or
+    Starlette with app.mount("/downloads", asgi_app())
+    """
+
+    async def app(scope: t.Dict, receive: t.Callable, send: t.Callable) -> None:
+        if scope["type"] != "http":
+            return
+        method = scope.get("method", "GET")
+        if method not in ("GET", "HEAD"):
+            await _send_plain(send, 405, b"", [(b"allow", b"GET, HEAD")])
+            return
+        download = registry.get(_token(scope.get("path", "")), consume=method == "GET")
+        if download is None:
+            await _send_plain(send, 404, b"Download not found or expired")
+            return
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in download.headers()
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        if method == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+        for chunk in download.iter_chunks(chunk_size):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+async def _send_plain(
+    send: t.Callable, status: int, body: bytes, headers: t.Optional[t.List] = None
+) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain")] + (headers or []),
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
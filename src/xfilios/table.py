@@ -1,15 +1,36 @@
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import io
+import itertools
+import os
 import typing as t
 
-import pandas as pd
+from . import aio
+from .exceptions import FileTypeError, TableHandlerError
+from .fileio import PathLike
+from .formats import get_format_reader
+from .handler import stage
+from .reader import get_reader_engine
+from .schema import Column, Schema, ValidationReport
 
-from .exceptions import TableHandlerError
+# pandas is imported when a table is built, importing the module does not need it
+if t.TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 10_000
+CATEGORY_RATIO = 0.5
+
+RowSource = t.Union[t.Iterable, t.Callable[[], t.Iterable]]
 
 
 class TableHandler:
     """Table data handler for the application a wrapper on top of dataframes"""
 
+    _memory_before: t.Optional[int] = None
+    validation_report: t.Optional[ValidationReport] = None
+
     def __init__(self, df: pd.DataFrame, schema: t.List, label: str) -> None:
         """
         Initializer of the TableHandler class
@@ -27,38 +48,63 @@ class TableHandler:
         data: t.List[t.Dict],
         col_headers: t.Optional[t.OrderedDict[str, str]],
         label: str,
+        optimize_memory: bool = False,
     ) -> TableHandler:
         """
         Create A TableHandler object from list of records
         :param data: List of records, similar structure as pd.DataFrame().to_dict(orient="records")
         :param col_headers: Column Rename Map, if Not provided default DataFrame column will be used
         :param label: A label/tag which will be used when creating sheet name in excel file
+        :param optimize_memory: Store the columns with compact dtypes, see optimize_memory
         :return: Object of type TableHandler
         """
+        import pandas as pd
+
         try:
-            df = pd.DataFrame(data)
             if col_headers:
-                schema = list(col_headers.values())
-                df = df.rename(columns=dict(col_headers))
-                df = df[schema]
-
-                return cls(df=df, schema=schema, label=label)
-            return cls(df=df, schema=list(df.columns), label=label)
+                # Only the renamed columns are built, in one pass through Schema.apply
+                columns = Schema(
+                    [Column(name, rename_from=key) for key, name in col_headers.items()]
+                )
+                with stage(cls.__name__, "build_frame"):
+                    df, report = columns.apply(data)
+                if report.missing_columns:
+                    raise TableHandlerError(
+                        f"Columns {report.missing_columns} are missing from the records"
+                    )
+                handler = cls(df=df, schema=columns.get_names(), label=label)
+            else:
+                with stage(cls.__name__, "build_frame"):
+                    df = pd.DataFrame(data)
+                handler = cls(df=df, schema=list(df.columns), label=label)
+            if optimize_memory:
+                handler.optimize_memory()
+            return handler
+        except TableHandlerError:
+            raise
         except Exception as e:
             raise TableHandlerError(e)
 
     @classmethod
     def from_list(
-        cls, data: t.List, col_headers: t.Optional[t.List[str]], label: str
+        cls,
+        data: t.List,
+        col_headers: t.Optional[t.List[str]],
+        label: str,
+        optimize_memory: bool = False,
     ) -> TableHandler:
         """
         Create A TableHandler object from list of list e.g data = [[...], [...]] or data = [(...), (...)]
         :param data: list of a list of rows to create DataFrame
         :param col_headers: column name to use for the DataFrame, if not provided default will be used
         :param label: A label/tag which will be used when creating sheet name in excel file
+        :param optimize_memory: Store the columns with compact dtypes, see optimize_memory
         """
+        import pandas as pd
+
         try:
-            df = pd.DataFrame(data)
+            with stage(cls.__name__, "build_frame"):
+                df = pd.DataFrame(data)
             if col_headers:
                 if len(col_headers) != len(df.columns):
                     raise TableHandlerError(
@@ -66,30 +112,254 @@ class TableHandler:
                     )
                 df.columns = col_headers
             schema = list(df.columns)
-            return cls(df=df, schema=schema, label=label)
+            handler = cls(df=df, schema=schema, label=label)
+            if optimize_memory:
+                handler.optimize_memory()
+            return handler
 
         except Exception as e:
             raise TableHandlerError(e)
 
     @classmethod
-    def from_file_like(cls, content: t.Union[t.TextIO, t.BinaryIO]) -> TableHandler:
+    def from_schema(
+        cls,
+        data: t.Sequence,
+        schema: Schema,
+        label: str,
+        optimize_memory: bool = False,
+    ) -> TableHandler:
+        """
+        Create A TableHandler object with a typed schema, the columns are selected, renamed and
+        coerced while the DataFrame is built. Invalid values do not raise, they are left missing
+        and reported in get_validation_report
+        :param data: List of records, or list of rows with the values in schema order
+        :param schema: Schema with the name, dtype, nullability and source name of every column
+        :param label: A label/tag which will be used when creating sheet name in excel file
+        :param optimize_memory: Store the columns with compact dtypes, see optimize_memory
         """
-        Create itself from a file like object from streamlit
+        with stage(cls.__name__, "build_frame"):
+            df, report = schema.apply(data)
+        handler = cls(df=df, schema=schema.get_names(), label=label)
+        handler.validation_report = report
+        if optimize_memory:
+            handler.optimize_memory()
+        return handler
+
+    @classmethod
+    def from_file_like(
+        cls,
+        content: t.Union[t.TextIO, t.BinaryIO],
+        usecols: t.Optional[t.Union[str, t.List]] = None,
+        nrows: t.Optional[int] = None,
+        engine: str = "openpyxl",
+        optimize_memory: bool = False,
+    ) -> TableHandler:
+        """
+        Create itself from the first sheet of a file like object from streamlit
         :param content: File like object from frontend
+        :param usecols: Columns to read, same as in pd.read_excel
+        :param nrows: Number of rows to read, the rest of the sheet is not parsed
+        :param engine: Reader engine, see from_file_like_all
+        :param optimize_memory: Store the columns with compact dtypes, see optimize_memory
+        """
+        return cls.from_file_like_all(
+            content,
+            sheets=[0],
+            usecols=usecols,
+            nrows=nrows,
+            engine=engine,
+            optimize_memory=optimize_memory,
+        )[0]
+
+    @classmethod
+    def from_file_like_all(
+        cls,
+        content: t.Union[t.TextIO, t.BinaryIO],
+        sheets: t.Optional[t.List[t.Union[str, int]]] = None,
+        usecols: t.Optional[t.Union[str, t.List]] = None,
+        nrows: t.Optional[int] = None,
+        engine: str = "openpyxl",
+        optimize_memory: bool = False,
+    ) -> t.List[TableHandler]:
+        """
+        Create one TableHandler per sheet of a file like object, the workbook is opened only once
+        :param content: File like object from frontend
+        :param sheets: Names or positions of the sheets to read, all the sheets if not provided
+        :param usecols: Columns to read from every sheet, same as in pd.read_excel
+        :param nrows: Number of rows to read from every sheet, the rest of the sheet is not parsed
+        :param engine: Reader engine, "openpyxl" reads through pandas and supports every feature
+            of the format, "fast" streams the sheet xml and only reads the cell values. Other
+            engines can be added with xfilios.reader.register_reader_engine
+        :param optimize_memory: Store the columns with compact dtypes, see optimize_memory
+        :return: List of TableHandler in the order of the requested sheets
         """
         try:
-            all_sheets = pd.ExcelFile(content)
-            sheet_name = all_sheets.sheet_names[0]
-            df = pd.read_excel(content, sheet_name=sheet_name)
-            schema = list(df.columns)
-            schema = [str(item) for item in schema]
-            label = sheet_name
-            return cls(df, schema, label)
+            read = get_reader_engine(engine)
+            handlers = []
+            with stage(cls.__name__, "parse"):
+                frames = read(content, sheets, usecols=usecols, nrows=nrows)
+                for sheet_name, df in frames:
+                    schema = [str(item) for item in df.columns]
+                    handler = cls(df, schema, sheet_name)
+                    if optimize_memory:
+                        handler.optimize_memory()
+                    handlers.append(handler)
+            return handlers
         except TableHandlerError as e:
             raise TableHandlerError(e)
         except Exception as e:
             raise TableHandlerError(e)
 
+    @classmethod
+    def from_path(
+        cls,
+        path: PathLike,
+        usecols: t.Optional[t.Union[str, t.List]] = None,
+        nrows: t.Optional[int] = None,
+        engine: str = "openpyxl",
+        optimize_memory: bool = False,
+    ) -> TableHandler:
+        """
+        Create itself from the first sheet of a local xlsx file, see from_path_all
+        :param path: Path of the xlsx file
+        """
+        return cls.from_path_all(
+            path,
+            sheets=[0],
+            usecols=usecols,
+            nrows=nrows,
+            engine=engine,
+            optimize_memory=optimize_memory,
+        )[0]
+
+    @classmethod
+    def from_path_all(
+        cls,
+        path: PathLike,
+        sheets: t.Optional[t.List[t.Union[str, int]]] = None,
+        usecols: t.Optional[t.Union[str, t.List]] = None,
+        nrows: t.Optional[int] = None,
+        engine: str = "openpyxl",
+        optimize_memory: bool = False,
+    ) -> t.List[TableHandler]:
+        """
+        Create one TableHandler per sheet of a local xlsx file. The reader engine opens the file
+        itself and only reads the parts it needs, the file is never copied into memory as a whole.
+        The parameters are the same as in from_file_like_all
+        :param path: Path of the xlsx file
+        """
+        if not os.path.isfile(path):
+            raise TableHandlerError(f"{path} is not a file")
+        return cls.from_file_like_all(
+            os.fspath(path),  # type: ignore[arg-type]
+            sheets=sheets,
+            usecols=usecols,
+            nrows=nrows,
+            engine=engine,
+            optimize_memory=optimize_memory,
+        )
+
+    @classmethod
+    def from_format(
+        cls,
+        content: t.Union[t.TextIO, t.BinaryIO, bytes, PathLike],
+        filetype: str,
+        usecols: t.Optional[t.List] = None,
+        nrows: t.Optional[int] = None,
+        label: t.Optional[str] = None,
+        optimize_memory: bool = False,
+        **options: t.Any,
+    ) -> TableHandler:
+        """
+        Create itself from the first table of a file in a format registered in xfilios.formats,
+        e.g. "csv", "parquet", "arrow" or "xlsx"
+        :param content: File like object, bytes or path of the file
+        :param filetype: Name of the format
+        :param usecols: Columns to read, the other columns are not decoded where the format allows
+        :param nrows: Number of rows to read
+        :param label: Label of the handler, the name given by the reader e.g. the sheet name if
+            not provided
+        :param optimize_memory: Store the columns with compact dtypes, see optimize_memory
+        :param options: Options of the reader of the format e.g. sep for csv or engine for xlsx
+        """
+        if isinstance(content, os.PathLike):
+            content = os.fspath(content)
+        elif isinstance(content, (bytes, bytearray, memoryview)):
+            content = io.BytesIO(content)
+        try:
+            read = get_format_reader(filetype)
+            with stage(cls.__name__, "parse"):
+                name, df = read(content, usecols=usecols, nrows=nrows, **options)[0]
+                handler = cls(df, [str(item) for item in df.columns], label or name)
+            if optimize_memory:
+                handler.optimize_memory()
+            return handler
+        except (TableHandlerError, FileTypeError):
+            raise
+        except Exception as e:
+            raise TableHandlerError(e)
+
+    @classmethod
+    def from_csv(
+        cls,
+        content: t.Union[t.TextIO, t.BinaryIO, bytes, PathLike],
+        label: t.Optional[str] = None,
+        usecols: t.Optional[t.List] = None,
+        nrows: t.Optional[int] = None,
+        optimize_memory: bool = False,
+        **options: t.Any,
+    ) -> TableHandler:
+        """
+        Create itself from a csv file, options are passed on to pd.read_csv e.g. sep or dtype
+        """
+        return cls.from_format(
+            content, "csv", usecols, nrows, label, optimize_memory, **options
+        )
+
+    @classmethod
+    def from_parquet(
+        cls,
+        content: t.Union[t.BinaryIO, bytes, PathLike],
+        label: t.Optional[str] = None,
+        usecols: t.Optional[t.List] = None,
+        nrows: t.Optional[int] = None,
+        optimize_memory: bool = False,
+    ) -> TableHandler:
+        """
+        Create itself from a parquet file through pyarrow, only usecols are decoded and with nrows
+        only the first row groups
+        """
+        return cls.from_format(
+            content, "parquet", usecols, nrows, label, optimize_memory
+        )
+
+    @classmethod
+    def from_arrow(
+        cls,
+        content: t.Union[t.BinaryIO, bytes, PathLike],
+        label: t.Optional[str] = None,
+        usecols: t.Optional[t.List] = None,
+        nrows: t.Optional[int] = None,
+        optimize_memory: bool = False,
+    ) -> TableHandler:
+        """
+        Create itself from an Arrow IPC file through pyarrow, bytes are read in place and a path
+        is memory mapped
+        """
+        return cls.from_format(content, "arrow", usecols, nrows, label, optimize_memory)
+
+    @classmethod
+    async def afrom_file_like(cls, *args: t.Any, **kwargs: t.Any) -> TableHandler:
+        """Async from_file_like, run in the executor configured with xfilios.aio.configure"""
+        return await aio.run(cls.from_file_like, *args, **kwargs)
+
+    @classmethod
+    async def afrom_file_like_all(
+        cls, *args: t.Any, **kwargs: t.Any
+    ) -> t.List[TableHandler]:
+        """Async from_file_like_all, run in the executor configured with xfilios.aio.configure"""
+        return await aio.run(cls.from_file_like_all, *args, **kwargs)
+
     def get_data_as_dataframe(self) -> pd.DataFrame:
         """Get the DataFrame store in the class"""
         return self.df
@@ -102,10 +372,72 @@ class TableHandler:
         """Getter for the schema field"""
         return self.schema
 
+    def get_validation_report(self) -> t.Optional[ValidationReport]:
+        """Getter for the validation report, only set when created with from_schema"""
+        return self.validation_report
+
     def get_data_as_records(self) -> t.List[t.Dict]:
         """Get the records stored in the dataframe as List of Dict"""
         return self.df.to_dict(orient="records")
 
+    def optimize_memory(self, category_ratio: float = CATEGORY_RATIO) -> None:
+        """
+        Store the columns with compact dtypes: numbers are downcast when no value changes, string
+        columns with few distinct values become categoricals and the other string columns are
+        backed by Arrow when pyarrow is installed. The size before is kept for memory_report
+        :param category_ratio: Maximum ratio of distinct values to rows for a categorical column
+        """
+        df = self.get_data_as_dataframe()
+        if self._memory_before is None:
+            self._memory_before = _memory_usage(df)
+        self.df = df.apply(_optimize_column, category_ratio=category_ratio)
+
+    def memory_report(self) -> t.Dict[str, int]:
+        """Memory used by the DataFrame in bytes, before and after optimize_memory"""
+        after = _memory_usage(self.get_data_as_dataframe())
+        before = after if self._memory_before is None else self._memory_before
+        return {"before": before, "after": after, "saved": before - after}
+
+    def iter_chunks(self, size: int = DEFAULT_CHUNK_SIZE) -> t.Iterator[pd.DataFrame]:
+        """
+        Iterate over the table as DataFrames of at most size rows
+        :param size: Number of rows per chunk
+        """
+        _check_chunk_size(size)
+        df = self.get_data_as_dataframe()
+        for start in range(0, len(df), size):
+            yield df.iloc[start : start + size]
+
+    def iter_records(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> t.Iterator[t.Dict]:
+        """
+        Iterate over the table record by record, converting chunk_size rows at a time
+        :param chunk_size: Number of rows converted to records at once
+        """
+        for chunk in self.iter_chunks(chunk_size):
+            yield from chunk.to_dict(orient="records")
+
+    def content_hash(self) -> str:
+        """
+        Hash of the label, the schema and the content of the table, computed chunk by chunk
+        so that LazyTableHandler tables are hashed without being loaded. Hashing reads the source
+        of such a table, an iterator source is consumed by it
+        :return: hex digest used as cache key
+        """
+        import pandas as pd
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((self.get_label(), self.get_schema())).encode("utf-8"))
+        try:
+            for chunk in self.iter_chunks():
+                digest.update(
+                    repr([str(dtype) for dtype in chunk.dtypes]).encode("utf-8")
+                )
+                hashed = pd.util.hash_pandas_object(chunk, index=False)
+                digest.update(hashed.to_numpy().tobytes())
+        except TypeError as e:
+            raise TableHandlerError(e)
+        return digest.hexdigest()
+
     def __str__(self) -> str:
         """String Representation of the class"""
         return f"{self.__class__.__name__}(df=({self.df.shape}), {self.schema}, {self.label})"
@@ -117,3 +449,224 @@ class TableHandler:
     def __len__(self) -> int:
         """Len representation provides the len of the DataFrame attached"""
         return len(self.df)
+
+
+class LazyTableHandler(TableHandler):
+    """
+    Table handler backed by a row source instead of a DataFrame. Rows are only pulled from the
+    source and turned into DataFrames chunk by chunk, the full table is never built unless it is
+    explicitly asked for with get_data_as_dataframe.
+    """
+
+    def __init__(
+        self,
+        source: RowSource,
+        label: str,
+        col_headers: t.Optional[t.Union[t.OrderedDict[str, str], t.List[str]]] = None,
+        orient: str = "records",
+    ) -> None:
+        """
+        Initializer of the LazyTableHandler class
+        :param source: Iterable of rows, or a callable returning one. A plain iterator can only be
+            read once, a container or a callable can be read any number of times
+        :param label: A label/tag which will be used as excel sheet name when creating a excel file
+        :param col_headers: Column rename map for records or column names for lists, same as in
+            TableHandler.from_records and TableHandler.from_list
+        :param orient: "records" when the rows are dicts, "list" when the rows are lists or tuples
+        """
+        if orient not in ("records", "list"):
+            raise TableHandlerError(f"orient must be records or list, got {orient}")
+        self.source = source
+        self.label = label
+        self.col_headers = col_headers
+        self.orient = orient
+        self.schema = (
+            list(col_headers.values()) if isinstance(col_headers, dict) else col_headers
+        )
+        self._df: t.Optional[pd.DataFrame] = None
+        self._head: t.List = []
+        self._consumed = False
+
+    @classmethod
+    def from_records(  # type: ignore[override]
+        cls,
+        data: RowSource,
+        col_headers: t.Optional[t.OrderedDict[str, str]],
+        label: str,
+    ) -> LazyTableHandler:
+        """
+        Create A LazyTableHandler object from an iterable of records
+        :param data: Iterable of dicts or a callable returning one
+        :param col_headers: Column Rename Map, if Not provided the keys of the first record will be used
+        :param label: A label/tag which will be used when creating sheet name in excel file
+        """
+        return cls(source=data, label=label, col_headers=col_headers, orient="records")
+
+    @classmethod
+    def from_list(  # type: ignore[override]
+        cls, data: RowSource, col_headers: t.Optional[t.List[str]], label: str
+    ) -> LazyTableHandler:
+        """
+        Create A LazyTableHandler object from an iterable of lists or tuples
+        :param data: Iterable of rows or a callable returning one
+        :param col_headers: column name to use for the DataFrame, if not provided default will be used
+        :param label: A label/tag which will be used when creating sheet name in excel file
+        """
+        return cls(source=data, label=label, col_headers=col_headers, orient="list")
+
+    @property
+    def df(self) -> pd.DataFrame:  # type: ignore[override]
+        """The whole table, built from the source on first access"""
+        import pandas as pd
+
+        if self._df is None:
+            chunks = list(self.iter_chunks())
+            if chunks:
+                self._df = pd.concat(chunks)
+            else:
+                self._df = pd.DataFrame(columns=self.schema or [])
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame) -> None:
+        """Replace the whole table, e.g. by optimize_memory, the source is no longer read"""
+        self._df = df
+
+    def is_loaded(self) -> bool:
+        """Check if the whole table has already been built"""
+        return self._df is not None
+
+    def get_schema(self) -> t.List:
+        """Getter for the schema field, reads the first row of the source if it is unknown"""
+        if self.schema is None:
+            rows = self._open()
+            head = list(itertools.islice(rows, 1))
+            if self._is_iterator():
+                self._head = head
+                self._consumed = False
+            self.schema = list(self._build_frame(head, start=0).columns)
+        return self.schema
+
+    def get_data_as_records(self) -> t.List[t.Dict]:
+        """Get the records of the source as List of Dict without building the whole DataFrame"""
+        if self._df is not None:
+            return super().get_data_as_records()
+        return list(self.iter_records())
+
+    def iter_chunks(self, size: int = DEFAULT_CHUNK_SIZE) -> t.Iterator[pd.DataFrame]:
+        """
+        Iterate over the source as DataFrames of at most size rows
+        :param size: Number of rows per chunk
+        """
+        if self._df is not None:
+            yield from super().iter_chunks(size)
+            return
+        _check_chunk_size(size)
+        rows = self._open()
+        start = 0
+        while True:
+            batch = list(itertools.islice(rows, size))
+            if not batch:
+                return
+            chunk = self._build_frame(batch, start=start)
+            if self.schema is None:
+                self.schema = list(chunk.columns)
+            elif list(chunk.columns) != self.schema:
+                chunk = chunk.reindex(columns=self.schema)
+            start += len(batch)
+            yield chunk
+
+    def _is_iterator(self) -> bool:
+        """Check if the source is a one shot iterator"""
+        return not callable(self.source) and iter(self.source) is self.source
+
+    def _open(self) -> t.Iterator:
+        """Open a new iterator over the rows of the source"""
+        if callable(self.source):
+            return iter(self.source())
+        if not self._is_iterator():
+            return iter(self.source)
+        if self._consumed:
+            raise TableHandlerError(
+                f"The row source of table {self.label} is an iterator which is already consumed"
+            )
+        self._consumed = True
+        head, self._head = self._head, []
+        return itertools.chain(head, self.source)
+
+    def _build_frame(self, rows: t.List, start: int) -> pd.DataFrame:
+        """Build the DataFrame of a single chunk of rows"""
+        import pandas as pd
+
+        try:
+            if self.orient == "records" and isinstance(self.col_headers, dict):
+                df = pd.DataFrame.from_records(
+                    rows, columns=list(self.col_headers.keys())
+                )
+                df.columns = list(self.col_headers.values())
+            elif self.orient == "list" and self.col_headers:
+                df = pd.DataFrame(rows, columns=self.col_headers)
+            else:
+                df = pd.DataFrame(rows)
+            df.index = pd.RangeIndex(start, start + len(df))
+            return df
+        except Exception as e:
+            raise TableHandlerError(e)
+
+    def __str__(self) -> str:
+        """String Representation of the class"""
+        return f"{self.__class__.__name__}(source=..., {self.schema}, {self.label})"
+
+    def __repr__(self) -> str:
+        """Dev string representation of the class"""
+        return (
+            f"{self.__class__.__name__}({self.source!r}, {self.schema}, {self.label})"
+        )
+
+    def __len__(self) -> int:
+        """Len of the table, counted by reading the source if the table is not built yet"""
+        if self._df is not None or self._is_iterator():
+            return len(self.df)
+        return sum(1 for _ in self._open())
+
+
+def _memory_usage(df: pd.DataFrame) -> int:
+    """Deep memory usage of a DataFrame in bytes"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _arrow_string_dtype() -> t.Optional[pd.StringDtype]:
+    """Arrow backed string dtype, None when pyarrow is not installed"""
+    import pandas as pd
+
+    if importlib.util.find_spec("pyarrow") is None:
+        return None
+    return pd.StringDtype("pyarrow")
+
+
+def _optimize_column(column: pd.Series, category_ratio: float) -> pd.Series:
+    """Convert a column into the most compact dtype holding the same values"""
+    import numpy as np
+    import pandas as pd
+
+    kind = column.dtype.kind if isinstance(column.dtype, np.dtype) else None
+    if kind in ("i", "u"):
+        downcast = "unsigned" if len(column) and column.min() >= 0 else "integer"
+        return pd.to_numeric(column, downcast=downcast)
+    if kind == "f":
+        smaller = pd.to_numeric(column, downcast="float")
+        unchanged = (smaller.astype(column.dtype) == column) | column.isna()
+        return smaller if unchanged.all() else column
+    is_string = kind == "O" or isinstance(column.dtype, pd.StringDtype)
+    if not is_string or not pd.api.types.infer_dtype(column, skipna=True) == "string":
+        return column
+    if len(column) and column.nunique() / len(column) <= category_ratio:
+        return column.astype("category")
+    arrow_dtype = _arrow_string_dtype()
+    return column if arrow_dtype is None else column.astype(arrow_dtype)
+
+
+def _check_chunk_size(size: int) -> None:
+    """Validate the number of rows per chunk"""
+    if size < 1:
+        raise TableHandlerError("Chunk size must be a positive integer")
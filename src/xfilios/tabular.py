@@ -0,0 +1,188 @@
+"""
+Handlers of the single table formats csv, parquet and arrow. Large exports skip the xlsx
+container: the csv is written chunk by chunk, the columnar formats hand the DataFrame columns to
+pyarrow instead of converting the values cell by cell.
+"""
+
+from __future__ import annotations
+
+import io
+import typing as t
+from abc import abstractmethod
+
+from .encoding import BytesLike
+from .formats import require_pyarrow
+from .handler import Handler
+from .html import iter_download_link
+from .table import DEFAULT_CHUNK_SIZE, TableHandler
+
+
+class TabularHandler(Handler):
+    """Base of the handlers writing one TableHandler into a single table file"""
+
+    def __init__(self, table: TableHandler) -> None:
+        """
+        Initializer of the single table handlers
+        :param table: The TableHandler to write
+        """
+        self.table = table
+
+    def to_buffer(self) -> io.BytesIO:
+        """Serialize the table into an in memory buffer positioned at the start"""
+        return io.BytesIO(self._payload())
+
+    def to_base64_str(self) -> str:
+        """Convert the table into a base64 encoded downloadable string"""
+        return "".join(self.iter_base64_chunks())
+
+    def create_download_link(self, filename: str) -> str:
+        """
+        Create download links from base 64 encoded string for the frontend
+        :param filename: filename to be used when creating downloadable link
+        """
+        chunks = self.iter_base64_chunks()
+        return "".join(
+            iter_download_link(
+                base64_chunks=chunks, filename=filename, filetype=self.filetype
+            )
+        )
+
+    def _payload(self) -> BytesLike:
+        with self._stage(f"write_{self.filetype}") as record:
+            payload = self._write()
+            record.size = memoryview(payload).nbytes
+        return payload
+
+    @abstractmethod
+    def _write(self) -> BytesLike:
+        """Serialize the table"""
+        raise NotImplementedError
+
+    def __str__(self) -> str:
+        """String representation of the class"""
+        return f"{self.__class__.__name__}(TableHandler(...))"
+
+    def __repr__(self) -> str:
+        """Dev string representation of the class"""
+        return f"{self.__class__.__name__}({self.table!r})"
+
+    def __len__(self) -> int:
+        """Number of rows of the table"""
+        return len(self.table)
+
+
+class CsvHandler(TabularHandler):
+    """Csv handler, the table is encoded chunk by chunk and written to files as it goes"""
+
+    filetype = "csv"
+
+    def __init__(
+        self,
+        table: TableHandler,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        encoding: str = "utf-8",
+        **options: t.Any,
+    ) -> None:
+        """
+        Initializer of the CsvHandler class
+        :param table: The TableHandler to write, a LazyTableHandler is streamed without being
+            loaded as DataFrame
+        :param chunk_size: Number of rows encoded at once
+        :param encoding: Encoding of the file, "utf-8-sig" lets Excel detect utf-8
+        :param options: Options passed on to DataFrame.to_csv e.g. sep or date_format
+        """
+        super().__init__(table)
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.options = options
+
+    def iter_bytes(self) -> t.Iterator[bytes]:
+        """Encoded csv chunk by chunk, the header comes with the first chunk"""
+        header = True
+        for chunk in self.table.iter_chunks(self.chunk_size):
+            text = chunk.to_csv(index=False, header=header, **self.options)
+            yield text.encode(self.encoding)
+            header = False
+        if header:
+            import pandas as pd
+
+            empty = pd.DataFrame(columns=self.table.get_schema())
+            yield empty.to_csv(index=False, **self.options).encode(self.encoding)
+
+    def _write(self) -> BytesLike:
+        return b"".join(self.iter_bytes())
+
+    def _write_file(self, file: t.BinaryIO) -> None:
+        """Write the chunks one by one, the file is never held in memory as a whole"""
+        for chunk in self.iter_bytes():
+            file.write(chunk)
+
+
+class ParquetHandler(TabularHandler):
+    """Parquet handler written through pyarrow"""
+
+    filetype = "parquet"
+
+    def __init__(
+        self,
+        table: TableHandler,
+        codec: t.Optional[str] = "snappy",
+        row_group_size: t.Optional[int] = None,
+    ) -> None:
+        """
+        Initializer of the ParquetHandler class
+        :param table: The TableHandler to write
+        :param codec: Compression of the column chunks e.g. "snappy", "zstd" or None
+        :param row_group_size: Maximum number of rows per row group, the pyarrow default if not
+            provided
+        """
+        super().__init__(table)
+        self.codec = codec
+        self.row_group_size = row_group_size
+
+    def _write(self) -> BytesLike:
+        pyarrow = require_pyarrow()
+        import pyarrow.parquet as pq
+
+        sink = pyarrow.BufferOutputStream()
+        pq.write_table(
+            _arrow_table(pyarrow, self.table),
+            sink,
+            compression=self.codec or "none",
+            row_group_size=self.row_group_size,
+        )
+        return memoryview(sink.getvalue())
+
+
+class ArrowHandler(TabularHandler):
+    """Arrow IPC file handler, the format readers map into memory without parsing"""
+
+    filetype = "arrow"
+
+    def __init__(self, table: TableHandler, codec: t.Optional[str] = None) -> None:
+        """
+        Initializer of the ArrowHandler class
+        :param table: The TableHandler to write
+        :param codec: Compression of the record batches, "lz4" or "zstd", uncompressed if not
+            provided so the file can be read without copying
+        """
+        super().__init__(table)
+        self.codec = codec
+
+    def _write(self) -> BytesLike:
+        pyarrow = require_pyarrow()
+        table = _arrow_table(pyarrow, self.table)
+        sink = pyarrow.BufferOutputStream()
+        options = pyarrow.ipc.IpcWriteOptions(compression=self.codec)
+        with pyarrow.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return memoryview(sink.getvalue())
+
+
+def _arrow_table(pyarrow: t.Any, table: TableHandler) -> t.Any:
+    """
+    Arrow table of a TableHandler, numeric columns without missing values and arrow backed
+    columns are taken over without copying
+    """
+    df = table.get_data_as_dataframe()
+    return pyarrow.Table.from_pandas(df, preserve_index=False)
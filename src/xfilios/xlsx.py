@@ -0,0 +1,454 @@
+"""
+Minimal native xlsx writer. Every worksheet only uses inline strings and a fixed style sheet, so
+sheets are rendered and compressed independently of each other (and in parallel) and the final
+file is assembled from the compressed parts.
+"""
+
+from __future__ import annotations
+
+import datetime
+import pickle
+import re
+import struct
+import typing as t
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .compression import CompressionPolicy
+from .docxml import escape_xml, quote_xml
+from .exceptions import TableHandlerError
+from .table import DEFAULT_CHUNK_SIZE, LazyTableHandler, TableHandler
+
+DEFAULT_COMPRESS_LEVEL = 6
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# Style indexes of the cellXfs in STYLES_XML
+STYLE_HEADER = 1
+STYLE_DATETIME = 2
+STYLE_DATE = 3
+
+STYLES_XML = (
+    XML_HEADER + f'<styleSheet xmlns="{MAIN_NS}">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="yyyy\\-mm\\-dd\\ hh:mm:ss"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy\\-mm\\-dd"/>'
+    "</numFmts>"
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    "</fonts>"
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="2"><border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/>'
+    '<bottom style="thin"/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" '
+    'applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="top"/></xf>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    "</cellXfs>"
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+
+SHEET_START = (
+    XML_HEADER + f'<worksheet xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><sheetData>'
+)
+SHEET_END = "</sheetData></worksheet>"
+
+ILLEGAL_CHARACTERS = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+INVALID_TITLE = re.compile(r"[\\*?:/\[\]]")
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+MAX_TITLE_LENGTH = 31
+
+
+class Part(t.NamedTuple):
+    """A compressed entry of the zip container"""
+
+    data: bytes
+    crc: int
+    size: int
+    method: int
+
+
+def compress(data: bytes, level: int = DEFAULT_COMPRESS_LEVEL) -> Part:
+    """
+    Compress the content of a zip entry, level 0 stores it without compression
+    :param data: Uncompressed content
+    :param level: zlib compression level from 0 to 9
+    """
+    if level == 0:
+        return Part(data=data, crc=zlib.crc32(data), size=len(data), method=ZIP_STORED)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    return Part(
+        data=compressed, crc=zlib.crc32(data), size=len(data), method=ZIP_DEFLATED
+    )
+
+
+def sheet_name(index: int) -> str:
+    """Name of the zip entry of the worksheet at a one based position"""
+    return f"xl/worksheets/sheet{index}.xml"
+
+
+def column_letter(index: int) -> str:
+    """Convert a zero based column index into an Excel column letter e.g 0 -> A, 27 -> AB"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def check_sheet_titles(titles: t.List[str]) -> None:
+    """Validate the sheet names the same way Excel does, names must also be unique"""
+    seen = set()
+    for title in titles:
+        if INVALID_TITLE.search(title) or not title or len(title) > MAX_TITLE_LENGTH:
+            raise TableHandlerError(f"{title!r} is not a valid Excel sheet name")
+        if title.lower() in seen:
+            raise TableHandlerError(f"Sheet name {title!r} is used more than once")
+        seen.add(title.lower())
+
+
+def render_sheet(
+    table: TableHandler,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    level: int = DEFAULT_COMPRESS_LEVEL,
+) -> Part:
+    """
+    Render the worksheet xml of a table and compress it chunk by chunk, only the compressed
+    worksheet is kept in memory
+    :param table: TableHandler to render, LazyTableHandler tables are read chunk by chunk
+    :param chunk_size: Number of rows rendered at once
+    :param level: zlib compression level from 0 to 9
+    """
+    crc = 0
+    size = 0
+    compressor = zlib.compressobj(max(level, 0), zlib.DEFLATED, -15)
+    output = []
+    for text in _iter_sheet_xml(table, chunk_size):
+        data = text.encode("utf-8")
+        crc = zlib.crc32(data, crc)
+        size += len(data)
+        output.append(data if level == 0 else compressor.compress(data))
+    if level == 0:
+        return Part(data=b"".join(output), crc=crc, size=size, method=ZIP_STORED)
+    output.append(compressor.flush())
+    return Part(data=b"".join(output), crc=crc, size=size, method=ZIP_DEFLATED)
+
+
+def render_sheets(
+    tables: t.List[TableHandler],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    level: int = DEFAULT_COMPRESS_LEVEL,
+    max_workers: t.Optional[int] = None,
+    parallel: bool = False,
+) -> t.List[Part]:
+    """
+    Render the worksheets of all the tables, in table order
+    :param parallel: Render the sheets in a process pool, the tables are pickled to the workers.
+        A LazyTableHandler reading an iterator or a callable which can not be pickled, e.g. a
+        lambda, is rendered in the calling process while the workers render the other sheets
+    :param max_workers: Size of the process pool, defaults to the number of CPUs
+    """
+    if not parallel or len(tables) < 2:
+        return [render_sheet(table, chunk_size, level) for table in tables]
+    from concurrent.futures import ProcessPoolExecutor
+
+    parts: t.List[t.Optional[Part]] = [None] * len(tables)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                index: executor.submit(render_sheet, table, chunk_size, level)
+                for index, table in enumerate(tables)
+                if _is_picklable(table)
+            }
+            for index, table in enumerate(tables):
+                if index not in futures:
+                    parts[index] = render_sheet(table, chunk_size, level)
+            for index, future in futures.items():
+                parts[index] = future.result()
+    except TableHandlerError:
+        raise
+    except Exception as e:
+        raise TableHandlerError(f"Could not render the sheets in parallel: {e}")
+    return t.cast(t.List[Part], parts)
+
+
+def _is_picklable(table: TableHandler) -> bool:
+    """Check if a table can be sent to a worker process"""
+    if not isinstance(table, LazyTableHandler):
+        return True
+    source = table.source
+    if not callable(source):
+        # A container is pickled with the table, an iterator would only be consumed in the copy
+        return iter(source) is not source
+    try:
+        pickle.dumps(source)
+    except Exception:
+        return False
+    return True
+
+
+def write_workbook(
+    output: t.BinaryIO,
+    titles: t.List[str],
+    sheets: t.List[Part],
+    level: int = DEFAULT_COMPRESS_LEVEL,
+    policy: t.Optional[CompressionPolicy] = None,
+) -> None:
+    """
+    Assemble the xlsx zip container from rendered worksheets
+    :param output: Binary stream to write the xlsx file into
+    :param titles: Sheet names in order
+    :param sheets: Rendered worksheets in the same order as titles
+    :param level: zlib compression level of the workbook parts
+    :param policy: Compression policy of the workbook parts, replaces level when provided
+    """
+    check_sheet_titles(titles)
+    writer = ZipWriter(output)
+    for name, content in _workbook_parts(titles):
+        part_level = level if policy is None else policy.level_for(name)
+        writer.write(name, compress(content.encode("utf-8"), part_level))
+    for index, sheet in enumerate(sheets, start=1):
+        writer.write(sheet_name(index), sheet)
+    writer.close()
+
+
+class ZipWriter:
+    """
+    Write already compressed parts into a zip container. The entries get a fixed timestamp so
+    that the same parts always produce the same file
+    """
+
+    LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+    CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+    END_RECORD = struct.Struct("<IHHHHIIH")
+    DOS_TIME = 0
+    DOS_DATE = (1 << 5) | 1
+
+    def __init__(self, output: t.BinaryIO) -> None:
+        self.output = output
+        self.offset = 0
+        self.entries: t.List[t.Tuple[bytes, Part, int]] = []
+
+    def write(self, name: str, part: Part) -> None:
+        """Write a compressed part as zip entry"""
+        if len(part.data) > 0xFFFFFFFF or part.size > 0xFFFFFFFF:
+            raise TableHandlerError(
+                f"{name} is too large for a zip container without zip64"
+            )
+        encoded = name.encode("utf-8")
+        header = self.LOCAL_HEADER.pack(
+            0x04034B50,
+            20,
+            0x800,
+            part.method,
+            self.DOS_TIME,
+            self.DOS_DATE,
+            part.crc,
+            len(part.data),
+            part.size,
+            len(encoded),
+            0,
+        )
+        self.entries.append((encoded, part, self.offset))
+        self.output.write(header)
+        self.output.write(encoded)
+        self.output.write(part.data)
+        self.offset += len(header) + len(encoded) + len(part.data)
+
+    def close(self) -> None:
+        """Write the central directory"""
+        start = self.offset
+        for encoded, part, offset in self.entries:
+            header = self.CENTRAL_HEADER.pack(
+                0x02014B50,
+                20,
+                20,
+                0x800,
+                part.method,
+                self.DOS_TIME,
+                self.DOS_DATE,
+                part.crc,
+                len(part.data),
+                part.size,
+                len(encoded),
+                0,
+                0,
+                0,
+                0,
+                0,
+                offset,
+            )
+            self.output.write(header)
+            self.output.write(encoded)
+            self.offset += len(header) + len(encoded)
+        total = len(self.entries)
+        self.output.write(
+            self.END_RECORD.pack(
+                0x06054B50, 0, 0, total, total, self.offset - start, start, 0
+            )
+        )
+
+
+def _workbook_parts(titles: t.List[str]) -> t.List[t.Tuple[str, str]]:
+    """Content of all the parts of the workbook except the worksheets"""
+    total = len(titles)
+    sheet_types = "".join(
+        f'<Override PartName="/{sheet_name(index)}" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for index in range(1, total + 1)
+    )
+    content_types = (
+        XML_HEADER
+        + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/'
+        'vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        f"{sheet_types}</Types>"
+    )
+    root_rels = (
+        XML_HEADER + f'<Relationships xmlns="{PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    )
+    sheets = "".join(
+        f'<sheet name={quote_xml(title)} sheetId="{index}" r:id="rId{index}"/>'
+        for index, title in enumerate(titles, start=1)
+    )
+    workbook = (
+        XML_HEADER + f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+        f"<sheets>{sheets}</sheets></workbook>"
+    )
+    sheet_rels = "".join(
+        f'<Relationship Id="rId{index}" Type="{REL_NS}/worksheet" '
+        f'Target="worksheets/sheet{index}.xml"/>'
+        for index in range(1, total + 1)
+    )
+    workbook_rels = (
+        XML_HEADER + f'<Relationships xmlns="{PKG_REL_NS}">{sheet_rels}'
+        f'<Relationship Id="rId{total + 1}" Type="{REL_NS}/styles" Target="styles.xml"/>'
+        "</Relationships>"
+    )
+    return [
+        ("[Content_Types].xml", content_types),
+        ("_rels/.rels", root_rels),
+        ("xl/workbook.xml", workbook),
+        ("xl/_rels/workbook.xml.rels", workbook_rels),
+        ("xl/styles.xml", STYLES_XML),
+    ]
+
+
+def _iter_sheet_xml(table: TableHandler, chunk_size: int) -> t.Iterator[str]:
+    """Yield the worksheet xml of a table piece by piece"""
+    yield SHEET_START
+    header = "".join(
+        _string_cell(f"{column_letter(index)}1", str(column), STYLE_HEADER)
+        for index, column in enumerate(table.get_schema())
+    )
+    yield f'<row r="1">{header}</row>'
+    start = 2
+    for chunk in table.iter_chunks(chunk_size):
+        rows = range(start, start + len(chunk))
+        columns = [
+            _column_cells(chunk.iloc[:, index], column_letter(index), rows)
+            for index in range(chunk.shape[1])
+        ]
+        yield "".join(
+            f'<row r="{row}">{"".join(cells)}</row>'
+            for row, cells in zip(rows, zip(*columns))
+        )
+        start += len(chunk)
+    yield SHEET_END
+
+
+def _column_cells(series: pd.Series, letter: str, rows: range) -> t.List[str]:
+    """Render the cells of one column of a chunk, missing values give empty strings"""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+        values = series.to_numpy().astype(str)
+        return [f'<c r="{letter}{row}"><v>{v}</v></c>' for row, v in zip(rows, values)]
+    if isinstance(dtype, np.dtype) and dtype.kind == "b":
+        values = series.to_numpy().astype(int).astype(str)
+        return [
+            f'<c r="{letter}{row}" t="b"><v>{v}</v></c>' for row, v in zip(rows, values)
+        ]
+    if isinstance(dtype, np.dtype) and dtype.kind == "f":
+        array = series.to_numpy()
+        if not np.isinf(array).any():
+            values = array.astype(str)
+            missing = np.isnan(array)
+            return [
+                "" if miss else f'<c r="{letter}{row}"><v>{v}</v></c>'
+                for row, v, miss in zip(rows, values, missing)
+            ]
+    if isinstance(dtype, np.dtype) and dtype.kind == "M":
+        serials = ((series - EXCEL_EPOCH) / pd.Timedelta(days=1)).to_numpy()
+        return [
+            (
+                ""
+                if np.isnan(serial)
+                else f'<c r="{letter}{row}" s="{STYLE_DATETIME}"><v>{serial!r}</v></c>'
+            )
+            for row, serial in zip(rows, serials.tolist())
+        ]
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        raise TableHandlerError(
+            "Excel does not support datetimes with timezones. Please ensure that datetimes "
+            "are timezone unaware before writing to Excel."
+        )
+    return [
+        _value_cell(f"{letter}{row}", value)
+        for row, value in zip(rows, series.astype(object).tolist())
+    ]
+
+
+def _value_cell(ref: str, value: t.Any) -> str:
+    """Render a single cell of a column without a numpy dtype"""
+    if value is None or value is pd.NaT or value is pd.NA:
+        return ""
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c r="{ref}"><v>{int(value)}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        if value != value:
+            return ""
+        if value in (float("inf"), float("-inf")):
+            return _string_cell(ref, str(value))
+        return f'<c r="{ref}"><v>{float(value)!r}</v></c>'
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            raise TableHandlerError("Excel does not support datetimes with timezones.")
+        serial = (value - EXCEL_EPOCH) / datetime.timedelta(days=1)
+        return f'<c r="{ref}" s="{STYLE_DATETIME}"><v>{serial!r}</v></c>'
+    if isinstance(value, datetime.date):
+        serial = (value - EXCEL_EPOCH.date()).days
+        return f'<c r="{ref}" s="{STYLE_DATE}"><v>{serial}</v></c>'
+    return _string_cell(ref, str(value))
+
+
+def _string_cell(ref: str, value: str, style: int = 0) -> str:
+    """Render an inline string cell"""
+    text = escape_xml(ILLEGAL_CHARACTERS.sub("", value))
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    style_attr = f' s="{style}"' if style else ""
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t{space}>{text}</t></is></c>'
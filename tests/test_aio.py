@@ -0,0 +1,79 @@
+import asyncio
+import base64
+import io
+import threading
+import time
+
+import pytest
+
+from tests import create_demo_docx, get_records
+from xfilios import aio
+from xfilios.docx import DocxHandler
+from xfilios.excel import ExcelHandler
+from xfilios.table import TableHandler
+
+
+class TestAio:
+    @pytest.fixture(autouse=True)
+    def executor(self):
+        aio.configure(max_workers=4)
+        yield
+        aio.shutdown()
+        aio.configure()
+
+    @pytest.fixture
+    def subject(self):
+        table = TableHandler.from_list(
+            data=list(get_records()), col_headers=["Qty", "Id", "Desc"], label="Sheet"
+        )
+        return ExcelHandler([table])
+
+    def test_ato_bytes(self, subject):
+        content = asyncio.run(subject.ato_bytes(streaming=True))
+        table = TableHandler.from_file_like(io.BytesIO(content))
+        assert table.get_schema() == ["Qty", "Id", "Desc"]
+
+    def test_ato_base64_str(self):
+        handler = DocxHandler(document=create_demo_docx(), name="demo.docx")
+        encoded = asyncio.run(handler.ato_base64_str())
+        assert base64.b64decode(encoded)[:2] == b"PK"
+
+    def test_afrom_file_like(self, subject):
+        content = io.BytesIO(subject.to_bytes())
+        table = asyncio.run(TableHandler.afrom_file_like(content, engine="fast"))
+        assert len(table) == 3
+
+    def test_max_concurrency(self):
+        aio.configure(max_workers=4, max_concurrency=2)
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        async def main():
+            await asyncio.gather(*(aio.run(work) for _ in range(6)))
+
+        asyncio.run(main())
+        assert peak[0] == 2
+
+    def test_cancel_pending(self):
+        aio.configure(max_workers=1, max_concurrency=1)
+        calls = []
+
+        async def main():
+            first = asyncio.ensure_future(aio.run(time.sleep, 0.1))
+            second = asyncio.ensure_future(aio.run(calls.append, 1))
+            await asyncio.sleep(0.01)
+            second.cancel()
+            await first
+            with pytest.raises(asyncio.CancelledError):
+                await second
+
+        asyncio.run(main())
+        assert calls == []
@@ -0,0 +1,78 @@
+import base64
+import io
+
+import pytest
+
+from tests import create_demo_docx, get_records
+from xfilios.batch import convert_many
+from xfilios.exceptions import DocxHandlerError, TableHandlerError
+from xfilios.excel import ExcelHandler
+from xfilios.table import TableHandler
+
+
+def docx_bytes():
+    output = io.BytesIO()
+    create_demo_docx().save(output)
+    return output.getvalue()
+
+
+def xlsx_bytes():
+    table = TableHandler.from_list(
+        data=list(get_records()), col_headers=["Qty", "Id", "Desc"], label="Sheet"
+    )
+    return ExcelHandler([table]).to_bytes()
+
+
+def upper_name(data: bytes, name: str) -> str:
+    return name.upper()
+
+
+class TestConvertMany:
+    @pytest.fixture
+    def source(self):
+        return docx_bytes()
+
+    def test_base64_keeps_order(self, source, tmp_path):
+        path = tmp_path / "demo.docx"
+        path.write_bytes(source)
+        inputs = [source, str(path), ("named.docx", source)]
+        result = convert_many(inputs, target="base64", max_workers=2)
+        assert [item.name for item in result.items] == [
+            "item-0",
+            "demo.docx",
+            "named.docx",
+        ]
+        assert all(base64.b64decode(value) == source for value in result.values())
+
+    def test_errors_are_isolated(self, source):
+        result = convert_many([source, b"not a docx", source], max_workers=2)
+        assert [item.ok for item in result.items] == [True, False, True]
+        assert isinstance(result.errors()[0].error, DocxHandlerError)
+        with pytest.raises(DocxHandlerError):
+            result.raise_errors()
+
+    def test_xlsx_errors(self):
+        result = convert_many([xlsx_bytes(), b"broken"], target="xlsx", parallel=False)
+        assert TableHandler.from_file_like(
+            io.BytesIO(result.values()[0])
+        ).get_schema() == [
+            "Qty",
+            "Id",
+            "Desc",
+        ]
+        assert isinstance(result.items[1].error, TableHandlerError)
+
+    def test_stat_and_throughput(self, source):
+        result = convert_many([source] * 3, target="stat", parallel=False)
+        assert result.values()[0]["tables"] == 1
+        throughput = result.throughput()
+        assert throughput["items"] == 3 and throughput["failed"] == 0
+        assert throughput["items_per_second"] > 0
+
+    def test_callable_target(self, source):
+        result = convert_many([("a.docx", source), ("b.docx", source)], upper_name)
+        assert result.values() == ["A.DOCX", "B.DOCX"]
+
+    def test_unknown_target(self, source):
+        with pytest.raises(ValueError):
+            convert_many([source], target="pdf")
@@ -0,0 +1,88 @@
+import pytest
+
+from tests import create_demo_docx
+from xfilios.cache import ConversionCache
+from xfilios.docx import DocxHandler
+from xfilios.excel import ExcelHandler
+from xfilios.table import LazyTableHandler, TableHandler
+
+
+class TestConversionCache:
+    @pytest.fixture
+    def subject(self):
+        return ConversionCache(max_bytes=10)
+
+    def test_hit_and_miss(self, subject):
+        assert subject.get("a") is None
+        subject.put("a", b"1234")
+        assert subject.get("a") == b"1234"
+        stats = subject.stats()
+        assert (stats["hits"], stats["misses"], stats["bytes"]) == (1, 1, 4)
+
+    def test_lru_eviction(self, subject):
+        subject.put("a", b"1234")
+        subject.put("b", b"1234")
+        subject.get("a")
+        subject.put("c", b"1234")
+        assert "a" in subject and "c" in subject and "b" not in subject
+        assert subject.stats()["evictions"] == 1
+
+    def test_spill(self, tmp_path):
+        subject = ConversionCache(max_bytes=4, spill_dir=str(tmp_path))
+        subject.put("a", b"1234")
+        subject.put("b", b"5678")
+        assert "a" not in subject
+        assert subject.get("a") == b"1234"
+        assert subject.stats()["spills"] >= 1
+        subject.clear()
+        assert subject.get("b") is None
+
+
+class TestHandlerCache:
+    @pytest.fixture
+    def cache(self):
+        return ConversionCache()
+
+    @staticmethod
+    def create_excel_handler(cache):
+        table = TableHandler.from_list(
+            data=[[1, "a"], [2, "b"]], col_headers=["id", "name"], label="demo"
+        )
+        return ExcelHandler([table], cache=cache)
+
+    def test_excel_handler(self, cache):
+        first = self.create_excel_handler(cache).to_bytes()
+        second = self.create_excel_handler(cache).to_base64_str()
+        assert cache.stats()["hits"] == 1
+        assert first == self.create_excel_handler(cache).to_bytes()
+        assert second
+
+    def test_excel_handler_content_change(self, cache):
+        self.create_excel_handler(cache).to_bytes()
+        handler = self.create_excel_handler(cache)
+        handler.tables[0].df.loc[0, "name"] = "changed"
+        handler.to_bytes()
+        assert cache.stats()["misses"] == 2
+
+    def test_docx_handler(self, cache):
+        content = DocxHandler(document=create_demo_docx(), name="demo").to_base64_str()
+        first = DocxHandler.from_base64(content, cache=cache).to_byte()
+        second = DocxHandler.from_base64(content, cache=cache).to_byte()
+        assert first == second
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_excel_handler_lazy_table(self, cache, streaming):
+        calls = []
+
+        def rows():
+            calls.append(1)
+            return iter([(1, "a"), (2, "b")])
+
+        tables = [
+            LazyTableHandler.from_list(iter([(1, "a"), (2, "b")]), ["id", "name"], "once"),
+            LazyTableHandler.from_list(rows, ["id", "name"], "callable"),
+        ]
+        assert ExcelHandler(tables, cache=cache).to_bytes(streaming=streaming)
+        assert len(calls) == 1
+        assert cache.stats()["misses"] == 0
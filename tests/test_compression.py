@@ -0,0 +1,116 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from tests import create_demo_docx, get_records
+from tests.test_docx import zip_contents
+from xfilios.compression import (
+    BALANCED,
+    SMALLEST,
+    STORED,
+    CompressionPolicy,
+    needs_repack,
+    repack,
+)
+from xfilios.docx import DocxHandler, LazyDocxHandler
+from xfilios.excel import ExcelHandler
+from xfilios.table import TableHandler
+
+
+def methods(content: bytes):
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        return {info.filename: info.compress_type for info in archive.infolist()}
+
+
+class TestRepack:
+    @pytest.fixture
+    def source(self):
+        output = io.BytesIO()
+        create_demo_docx().save(output)
+        return output.getvalue()
+
+    def test_contents_are_kept(self, source):
+        content = repack(source, SMALLEST).getvalue()
+        assert zip_contents(content) == zip_contents(source)
+        assert list(methods(content)) == list(methods(source))
+
+    def test_stored(self, source):
+        content = repack(source, STORED).getvalue()
+        assert set(methods(content).values()) == {zipfile.ZIP_STORED}
+        assert len(content) > len(source)
+
+    def test_stored_patterns(self, source):
+        policy = CompressionPolicy(level=9, stored=("word/*.xml",))
+        for name, method in methods(repack(source, policy).getvalue()).items():
+            expected = (
+                zipfile.ZIP_STORED
+                if name.startswith("word/") and name.endswith(".xml")
+                else zipfile.ZIP_DEFLATED
+            )
+            assert method == expected
+
+    def test_invalid_level(self):
+        with pytest.raises(ValueError):
+            ExcelHandler([], compression=CompressionPolicy(level=11))
+
+
+class TestHandlerCompression:
+    @pytest.fixture
+    def table(self):
+        return TableHandler.from_list(
+            data=list(get_records()) * 50,
+            col_headers=["Qty", "Id", "Desc"],
+            label="Sheet",
+        )
+
+    @pytest.mark.parametrize("engine", ["openpyxl", "native"])
+    def test_excel_stored(self, table, engine):
+        content = ExcelHandler([table], compression=STORED).to_bytes(engine=engine)
+        assert set(methods(content).values()) == {zipfile.ZIP_STORED}
+        expected = ExcelHandler([table]).to_bytes()
+        pd.testing.assert_frame_equal(
+            pd.read_excel(io.BytesIO(content)), pd.read_excel(io.BytesIO(expected))
+        )
+
+    def test_excel_levels(self, table):
+        fast = ExcelHandler([table], compression=CompressionPolicy(level=1)).to_bytes(
+            engine="native"
+        )
+        small = ExcelHandler([table], compression=SMALLEST).to_bytes(engine="native")
+        assert len(small) <= len(fast)
+
+    def test_docx(self):
+        handler = DocxHandler(create_demo_docx(), "demo.docx", compression=STORED)
+        content = handler.to_byte()
+        assert set(methods(content).values()) == {zipfile.ZIP_STORED}
+        assert DocxHandler.stat_file_like(content) == handler.get_stat()
+
+    def test_docx_default_level_is_not_repacked(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr("xfilios.docx.repack", lambda *args: calls.append(args))
+        policy = CompressionPolicy(level=6)
+        handler = DocxHandler(create_demo_docx(), "demo.docx", compression=policy)
+        content = handler.to_byte()
+        assert calls == []
+        assert set(methods(content).values()) == {zipfile.ZIP_DEFLATED}
+
+    def test_needs_repack(self):
+        output = io.BytesIO()
+        create_demo_docx().save(output)
+        assert not needs_repack(output, CompressionPolicy(level=6))
+        assert needs_repack(output, CompressionPolicy(level=6, stored=("*.xml",)))
+        assert needs_repack(output, SMALLEST)
+        assert needs_repack(output, BALANCED)  # the thumbnail is stored
+        stored = io.BytesIO(repack(output, STORED).getvalue())
+        assert needs_repack(stored, CompressionPolicy(level=6))
+
+    def test_lazy_docx_is_repacked_without_parsing(self):
+        output = io.BytesIO()
+        create_demo_docx().save(output)
+        handler = LazyDocxHandler(output.getvalue(), "demo.docx", compression=STORED)
+        content = handler.to_byte()
+        assert set(methods(content).values()) == {zipfile.ZIP_STORED}
+        assert zip_contents(content) == zip_contents(output.getvalue())
+        assert not handler.is_loaded
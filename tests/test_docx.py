@@ -1,8 +1,26 @@
+import base64
+import io
+import zipfile
+
+import pandas as pd
 import pytest
 from docx.document import Document
+from docx.oxml import OxmlElement
+from docx.shared import Cm
 
 from tests import create_demo_docx
-from xfilios.docx import DocxHandler
+from xfilios.cache import ConversionCache
+from xfilios.docx import DocxHandler, LazyDocxHandler
+from xfilios.excel import ExcelHandler
+from xfilios.exceptions import DocxHandlerError
+from xfilios.html import create_download_link
+from xfilios.table import TableHandler
+
+
+def zip_contents(content: bytes):
+    """Content of every part of a zip file, ignoring the timestamps of the entries"""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
 
 
 class TestDocxHandler:
@@ -27,3 +45,218 @@ class TestDocxHandler:
     def test_get_stat(self, subject):
         expected = {"tables": 1, "paragraphs": 3}
         assert subject.get_stat() == expected
+
+    def test_to_base64_str(self, subject):
+        content = zip_contents(subject.to_byte())
+        assert zip_contents(base64.b64decode(subject.to_base64_str())) == content
+
+    def test_iter_base64_chunks(self, subject):
+        chunks = list(subject.iter_base64_chunks(chunk_size=1024))
+        assert len(chunks) > 1
+        content = zip_contents(base64.b64decode("".join(chunks)))
+        assert content == zip_contents(subject.to_byte())
+
+    def test_write_base64(self, subject):
+        target = io.StringIO()
+        written = subject.write_base64(target)
+        assert written == len(target.getvalue())
+        content = zip_contents(base64.b64decode(target.getvalue()))
+        assert content == zip_contents(subject.to_byte())
+
+    def test_create_download_link(self, subject):
+        link = subject.create_download_link(filename=self.NAME)
+        template = create_download_link(
+            base64_str="{content}", filename=self.NAME, filetype="docx"
+        )
+        prefix, suffix = template.split("{content}")
+        assert link.startswith(prefix) and link.endswith(suffix)
+        encoded = link[len(prefix) : -len(suffix)]
+        assert zip_contents(base64.b64decode(encoded)) == zip_contents(subject.to_byte())
+
+    def test_get_stat_detailed(self, subject):
+        stat = subject.get_stat(detailed=True)
+        assert stat["tables"] == 1
+        assert stat["paragraphs"] == 3
+        assert stat["sections"] == 1
+        assert stat["words"] == 29
+
+    def test_stat_file_like(self, subject):
+        content = io.BytesIO(subject.to_byte())
+        assert DocxHandler.stat_file_like(content, detailed=True) == subject.get_stat(
+            detailed=True
+        )
+
+    def test_stat_file_like_invalid(self):
+        with pytest.raises(DocxHandlerError):
+            DocxHandler.stat_file_like(io.BytesIO(b"not a docx"))
+
+
+class TestLazyDocxHandler:
+    NAME = "demo.docx"
+
+    @pytest.fixture
+    def source(self):
+        output = io.BytesIO()
+        create_demo_docx().save(output)
+        return output.getvalue()
+
+    @pytest.fixture
+    def subject(self, source):
+        content = io.BytesIO(source)
+        content.name = self.NAME
+        return LazyDocxHandler.from_file_like(content)
+
+    def test_to_byte_returns_source(self, subject, source):
+        assert subject.to_byte() == source
+        assert not subject.is_loaded
+
+    def test_base64_returns_source(self, subject, source):
+        assert base64.b64decode(subject.to_base64_str()) == source
+        handler = LazyDocxHandler.from_base64(subject.to_base64_str(), self.NAME)
+        assert handler.to_byte() == source
+
+    def test_get_stat_without_loading(self, subject):
+        assert subject.get_stat() == {"tables": 1, "paragraphs": 3}
+        assert len(subject) == 3
+        assert not subject.is_loaded
+
+    def test_edit_marks_dirty(self, subject, source):
+        subject.document.add_paragraph("An added paragraph")
+        assert subject.is_loaded and subject.is_dirty
+        content = subject.to_byte()
+        assert content != source
+        assert DocxHandler.stat_file_like(content)["paragraphs"] == 4
+        assert subject.get_stat()["paragraphs"] == 4
+
+    def test_invalid_source(self):
+        with pytest.raises(DocxHandlerError):
+            LazyDocxHandler(source=b"not a docx", name=self.NAME)
+
+
+class TestTableExtraction:
+    @pytest.fixture
+    def document(self):
+        document = create_demo_docx()
+        table = document.add_table(rows=4, cols=3)
+        for row, texts in enumerate(
+            [["Region", "", "Total"], ["", "", ""], ["North", "1", "10"], ["", "2", "20"]]
+        ):
+            for column, text in enumerate(texts):
+                table.cell(row, column).text = text
+        table.cell(0, 0).merge(table.cell(0, 1))
+        table.cell(0, 2).merge(table.cell(1, 2))
+        table.cell(2, 0).merge(table.cell(3, 0))
+        table.cell(1, 0).text = "Name"
+        table.cell(1, 1).text = "Code"
+        for row in table.rows[:2]:
+            row._tr.get_or_add_trPr().append(OxmlElement("w:tblHeader"))
+        return document
+
+    @pytest.fixture
+    def subject(self, document):
+        return DocxHandler(document=document, name="tables.docx")
+
+    def test_demo_table(self, subject):
+        demo = subject.to_table_handlers()[0]
+        assert demo.get_label() == "Table 1"
+        assert demo.get_schema() == ["Qty", "Id", "Desc"]
+        assert demo.get_data_as_records()[0] == {"Qty": "3", "Id": "101", "Desc": "Spam"}
+
+    def test_merged_cells(self, subject):
+        merged = subject.to_table_handlers()[1]
+        assert merged.get_schema() == ["Region Name", "Region Code", "Total"]
+        assert merged.get_data_as_dataframe().values.tolist() == [
+            ["North", "1", "10"],
+            ["North", "2", "20"],
+        ]
+
+    def test_merged_cells_not_filled(self, subject):
+        merged = subject.to_table_handlers(header=False, fill_merged=False)[1]
+        assert merged.get_schema() == ["Column 1", "Column 2", "Column 3"]
+        df = merged.get_data_as_dataframe()
+        assert df.iloc[0, 0] == "Region" and pd.isna(df.iloc[0, 1])
+        assert df.iloc[0, 2] == "Total" and pd.isna(df.iloc[1, 2])
+
+    def test_streamed_matches_loaded(self, subject):
+        output = io.BytesIO()
+        subject.document.save(output)
+        lazy = LazyDocxHandler(source=output.getvalue(), name="tables.docx")
+        streamed = lazy.to_table_handlers(label="{index}")
+        assert not lazy.is_loaded
+        loaded = subject.to_table_handlers(label="{index}")
+        assert [h.get_data_as_records() for h in streamed] == [
+            h.get_data_as_records() for h in loaded
+        ]
+        assert [h.get_label() for h in streamed] == ["1", "2"]
+
+    def test_into_excel(self, subject):
+        excel = ExcelHandler(subject.to_table_handlers())
+        sheets = pd.read_excel(excel.to_buffer(), sheet_name=None, dtype=str)
+        assert list(sheets) == ["Table 1", "Table 2"]
+        assert sheets["Table 2"]["Region Name"].tolist() == ["North", "North"]
+
+
+class TestAddTable:
+    @pytest.fixture
+    def table(self):
+        return TableHandler.from_records(
+            [
+                {"Qty": 3, "Desc": "Spam & eggs", "Note": "a\tb\nc"},
+                {"Qty": 7, "Desc": " Eggs", "Note": None},
+            ],
+            None,
+            "Sheet",
+        )
+
+    @pytest.fixture
+    def subject(self):
+        return DocxHandler(document=create_demo_docx(), name="report.docx")
+
+    def test_round_trip(self, subject, table):
+        added = subject.add_table(table, style="Table Grid", header_fill="D9D9D9")
+        assert added.style.name == "Table Grid"
+        assert [cell.text for cell in added.rows[0].cells] == ["Qty", "Desc", "Note"]
+        assert added.cell(1, 2).text == "a\tb\nc"
+        assert added.cell(2, 1).text == " Eggs"
+        content = DocxHandler.stat_file_like(subject.to_byte())
+        assert content["tables"] == 2
+        result = subject.to_table_handlers()[1]
+        assert result.get_schema() == ["Qty", "Desc", "Note"]
+        assert result.get_data_as_dataframe().iloc[:, 1].tolist() == ["Spam & eggs", " Eggs"]
+
+    def test_without_header(self, subject, table):
+        added = subject.add_table(table, header=False, na_rep="-")
+        assert len(added.rows) == 2
+        assert added.cell(1, 2).text == "-"
+
+    def test_column_widths(self, subject, table):
+        added = subject.add_table(table, column_widths=[Cm(2), Cm(6), Cm(4)])
+        widths = [column.width.twips for column in added.columns]
+        assert widths == [Cm(2).twips, Cm(6).twips, Cm(4).twips]
+        with pytest.raises(DocxHandlerError):
+            subject.add_table(table, column_widths=[Cm(2)])
+
+    def test_unknown_style(self, subject, table):
+        with pytest.raises(DocxHandlerError):
+            subject.add_table(table, style="No Such Style")
+
+    def test_cached_document(self, subject, table):
+        source = io.BytesIO(subject.to_byte())
+        source.name = "report.docx"
+        cached = DocxHandler.from_file_like(source, cache=ConversionCache())
+        before = cached.to_byte()
+        cached.add_table(table)
+        assert cached.to_byte() != before
+        assert DocxHandler.stat_file_like(cached.to_byte())["tables"] == 2
+
+    def test_default_widths_fill_the_page(self, subject, table):
+        section = subject.document.sections[-1]
+        width = section.page_width - section.left_margin - section.right_margin
+        added = subject.add_table(table)
+        assert [column.width for column in added.columns] == [width // 3] * 3
+
+    def test_lazy_becomes_dirty(self, subject, table):
+        lazy = LazyDocxHandler(source=subject.to_byte(), name="report.docx")
+        lazy.add_table(table)
+        assert lazy.is_dirty
+        assert lazy.get_stat()["tables"] == 2
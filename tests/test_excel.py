@@ -0,0 +1,241 @@
+import io
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from xfilios import xlsx
+from xfilios.excel import ExcelHandler
+from xfilios.exceptions import TableHandlerError
+from xfilios.table import LazyTableHandler, TableHandler
+
+
+class TestExcelHandler:
+    @pytest.fixture
+    def subject(self):
+        first = TableHandler.from_list(
+            data=[[1, "a", 1.5], [2, None, None], [3, "c", 3.5]],
+            col_headers=["id", "name", "value"],
+            label="first",
+        )
+        second = TableHandler.from_records(
+            data=[{"x": 1}, {"x": 2}], col_headers=None, label="second"
+        )
+        return ExcelHandler.from_table_handlers(first, second)
+
+    @staticmethod
+    def read_back(content: bytes):
+        return pd.read_excel(io.BytesIO(content), sheet_name=None)
+
+    def test_excel_len(self, subject):
+        assert len(subject) == 2
+
+    def test_to_bytes(self, subject):
+        sheets = self.read_back(subject.to_bytes())
+        assert list(sheets) == ["first", "second"]
+        assert list(sheets["first"].columns) == ["id", "name", "value"]
+        assert len(sheets["second"]) == 2
+
+    def test_to_bytes_streaming_matches_default(self, subject):
+        expected = self.read_back(subject.to_bytes())
+        result = self.read_back(subject.to_bytes(streaming=True, chunk_size=2))
+        assert list(result) == list(expected)
+        for label in expected:
+            pd.testing.assert_frame_equal(result[label], expected[label])
+
+    def test_to_bytes_streaming_lazy_table(self):
+        table = LazyTableHandler.from_list(
+            data=lambda: ((i, f"row-{i}") for i in range(25)),
+            col_headers=["id", "text"],
+            label="lazy",
+        )
+        content = ExcelHandler([table]).to_bytes(streaming=True, chunk_size=10)
+        result = self.read_back(content)["lazy"]
+        assert len(result) == 25
+        assert not table.is_loaded()
+
+    def test_to_bytes_parallel_matches_default(self, subject):
+        expected = self.read_back(subject.to_bytes())
+        result = self.read_back(subject.to_bytes(parallel=True, max_workers=2))
+        assert list(result) == list(expected)
+        for label in expected:
+            pd.testing.assert_frame_equal(result[label], expected[label])
+
+    def test_to_bytes_parallel_lazy_tables(self, subject):
+        subject.tables.append(
+            LazyTableHandler.from_list(
+                lambda: ((i, f"row-{i}") for i in range(25)), ["id", "text"], "lambda"
+            )
+        )
+        subject.tables.append(
+            LazyTableHandler.from_list(
+                ((i, f"row-{i}") for i in range(25)), ["id", "text"], "generator"
+            )
+        )
+        result = self.read_back(subject.to_bytes(parallel=True, max_workers=2))
+        assert list(result) == ["first", "second", "lambda", "generator"]
+        assert len(result["lambda"]) == len(result["generator"]) == 25
+
+    def test_to_bytes_parallel_unpicklable_values(self, subject):
+        subject.tables[1].df["x"] = [lambda: 1, lambda: 2]
+        with pytest.raises(TableHandlerError):
+            subject.to_bytes(parallel=True, max_workers=2)
+
+    def test_to_bytes_parallel_duplicate_label(self, subject):
+        subject.tables.append(subject.tables[0])
+        with pytest.raises(TableHandlerError):
+            subject.to_bytes(parallel=True)
+
+    @pytest.mark.parametrize("engine", ["native", "auto"])
+    def test_to_bytes_engine_matches_default(self, subject, engine):
+        expected = self.read_back(subject.to_bytes())
+        result = self.read_back(subject.to_bytes(engine=engine))
+        for label in expected:
+            pd.testing.assert_frame_equal(result[label], expected[label])
+
+    def test_to_bytes_xlsxwriter_matches_default(self, subject):
+        pytest.importorskip("xlsxwriter")
+        expected = self.read_back(subject.to_bytes())
+        result = self.read_back(subject.to_bytes(engine="xlsxwriter", chunk_size=2))
+        for label in expected:
+            pd.testing.assert_frame_equal(result[label], expected[label])
+
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"streaming": True}, {"engine": "native"}, {"engine": "xlsxwriter"}],
+    )
+    def test_infinite_values(self, options):
+        if options.get("engine") == "xlsxwriter":
+            pytest.importorskip("xlsxwriter")
+        table = TableHandler.from_list(
+            [[1.5, float("inf")], [float("-inf"), None]], ["a", "b"], "inf"
+        )
+        content = ExcelHandler([table]).to_bytes(**options)
+        worksheet = openpyxl.load_workbook(io.BytesIO(content)).active
+        rows = list(worksheet.iter_rows(min_row=2, values_only=True))
+        assert rows == [(1.5, "inf"), ("-inf", None)]
+
+    def test_auto_engine(self, subject, monkeypatch):
+        assert subject._engine("auto", parallel=False) == "openpyxl"
+        monkeypatch.setattr("xfilios.excel.AUTO_NATIVE_CELLS", 10)
+        assert subject._engine("auto", parallel=False) == "native"
+
+    def test_auto_engine_keeps_lazy_table_unloaded(self):
+        calls = []
+
+        def rows():
+            calls.append(1)
+            return ((i, f"row-{i}") for i in range(25))
+
+        table = LazyTableHandler.from_list(rows, ["id", "text"], "lazy")
+        content = ExcelHandler([table]).to_bytes(engine="auto", chunk_size=10)
+        assert len(pd.read_excel(io.BytesIO(content))) == 25
+        assert not table.is_loaded()
+        assert len(calls) == 1
+
+    def test_auto_engine_iterator_source(self):
+        rows = iter([(i, f"row-{i}") for i in range(25)])
+        table = LazyTableHandler.from_list(rows, ["id", "text"], "lazy")
+        content = ExcelHandler([table]).to_bytes(engine="auto")
+        assert len(pd.read_excel(io.BytesIO(content))) == 25
+
+    def test_unknown_engine(self, subject):
+        with pytest.raises(TableHandlerError):
+            subject.to_bytes(engine="xlwt")
+
+    def test_parallel_requires_native(self, subject):
+        with pytest.raises(TableHandlerError):
+            subject.to_bytes(engine="openpyxl", parallel=True)
+
+
+class TestIncrementalUpdates:
+    @pytest.fixture
+    def subject(self):
+        tables = [
+            TableHandler.from_records(
+                data=[{"x": index, "y": str(index)}], col_headers=None, label=label
+            )
+            for index, label in enumerate(["first", "second", "third"])
+        ]
+        return ExcelHandler(tables, reuse_rendered=True)
+
+    @pytest.fixture
+    def rendered(self, monkeypatch):
+        """Labels of the tables rendered by the native writer"""
+        labels = []
+        render_sheets = xlsx.render_sheets
+
+        def spy(tables, **kwargs):
+            labels.extend(table.get_label() for table in tables)
+            return render_sheets(tables, **kwargs)
+
+        monkeypatch.setattr(xlsx, "render_sheets", spy)
+        return labels
+
+    @staticmethod
+    def labels(content: bytes):
+        return list(pd.read_excel(io.BytesIO(content), sheet_name=None))
+
+    def test_add_table_renders_only_new_sheet(self, subject, rendered):
+        subject.to_bytes(engine="native")
+        table = TableHandler.from_records([{"z": 1}], None, "fourth")
+        subject.add_table(table, index=1)
+        content = subject.to_bytes(engine="native")
+        assert rendered == ["first", "second", "third", "fourth"]
+        assert self.labels(content) == ["first", "fourth", "second", "third"]
+        sheets = pd.read_excel(io.BytesIO(content), sheet_name=None)
+        expected = ExcelHandler(subject.tables).to_bytes(engine="openpyxl")
+        expected = pd.read_excel(io.BytesIO(expected), sheet_name=None)
+        for label in expected:
+            pd.testing.assert_frame_equal(sheets[label], expected[label])
+
+    def test_engines(self, subject, rendered):
+        subject.to_bytes()
+        subject.to_bytes(engine="auto")
+        assert rendered == ["first", "second", "third"]
+        with pytest.raises(TableHandlerError):
+            subject.to_bytes(engine="openpyxl")
+
+    def test_replace_table(self, subject, rendered):
+        subject.to_bytes(engine="native")
+        table = TableHandler.from_records([{"z": 1}], None, "new")
+        subject.replace_table("second", table)
+        content = subject.to_bytes(engine="native")
+        assert rendered[3:] == ["new"]
+        assert self.labels(content) == ["first", "new", "third"]
+
+    def test_remove_table(self, subject, rendered):
+        subject.to_bytes(engine="native")
+        removed = subject.remove_table(0)
+        content = subject.to_bytes(engine="native")
+        assert removed.get_label() == "first"
+        assert rendered[3:] == []
+        assert self.labels(content) == ["second", "third"]
+
+    def test_clear_rendered(self, subject, rendered):
+        subject.to_bytes(engine="native")
+        subject.clear_rendered()
+        subject.to_bytes(engine="native")
+        assert len(rendered) == 6
+
+    def test_not_reused_by_default(self, subject, rendered):
+        handler = ExcelHandler(subject.tables)
+        handler.to_bytes(engine="native")
+        handler.tables[0].df.loc[0, "x"] = 99
+        content = handler.to_bytes(engine="native")
+        assert len(rendered) == 6
+        assert pd.read_excel(io.BytesIO(content))["x"].tolist() == [99]
+        assert handler._parts == {}
+
+    def test_unknown_sheet(self, subject):
+        with pytest.raises(TableHandlerError):
+            subject.remove_table("missing")
+        with pytest.raises(TableHandlerError):
+            subject.replace_table(3, subject.tables[0])
+
+
+@pytest.mark.parametrize(
+    "index, expected", [(0, "A"), (25, "Z"), (26, "AA"), (27, "AB"), (702, "AAA")]
+)
+def test_column_letter(index, expected):
+    assert xlsx.column_letter(index) == expected
@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+from tests import create_demo_docx, get_records
+from tests.test_docx import zip_contents
+from xfilios.docx import DocxHandler, LazyDocxHandler
+from xfilios.exceptions import DocxHandlerError, TableHandlerError
+from xfilios.excel import ExcelHandler
+from xfilios.fileio import MappedReader, atomic_write, map_file
+from xfilios.table import TableHandler
+
+
+@pytest.fixture
+def docx_path(tmp_path):
+    path = tmp_path / "demo.docx"
+    create_demo_docx().save(str(path))
+    return path
+
+
+@pytest.fixture
+def table():
+    return TableHandler.from_list(
+        data=list(get_records()), col_headers=["Qty", "Id", "Desc"], label="Sheet"
+    )
+
+
+class TestAtomicWrite:
+    def test_replaces_target(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"old")
+        with atomic_write(path) as file:
+            file.write(b"new")
+        assert path.read_bytes() == b"new"
+        assert os.listdir(tmp_path) == ["file.bin"]
+
+    def test_failure_keeps_target(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"old")
+        with pytest.raises(RuntimeError):
+            with atomic_write(path) as file:
+                file.write(b"partial")
+                raise RuntimeError
+        assert path.read_bytes() == b"old"
+        assert os.listdir(tmp_path) == ["file.bin"]
+
+    def test_file_modes(self, tmp_path):
+        new = tmp_path / "new.bin"
+        with atomic_write(new) as file:
+            file.write(b"new")
+        mask = os.umask(0)
+        os.umask(mask)
+        assert new.stat().st_mode & 0o777 == 0o666 & ~mask
+        existing = tmp_path / "existing.bin"
+        existing.write_bytes(b"old")
+        existing.chmod(0o600)
+        with atomic_write(existing) as file:
+            file.write(b"new")
+        assert existing.stat().st_mode & 0o777 == 0o600
+
+    def test_map_empty_file(self, tmp_path):
+        path = tmp_path / "empty"
+        path.write_bytes(b"")
+        assert map_file(path) == b""
+
+    def test_mapped_reader(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"0123456789")
+        reader = MappedReader(map_file(path))
+        assert reader.read(3) == b"012"
+        assert reader.seek(-2, os.SEEK_END) == 8
+        assert reader.read() == b"89"
+        assert reader.read(1) == b""
+
+
+class TestPaths:
+    @pytest.mark.parametrize("engine", [None, "native"])
+    def test_excel_to_path_and_back(self, tmp_path, table, engine):
+        path = tmp_path / "report.xlsx"
+        ExcelHandler([table]).to_path(path, engine=engine)
+        for reader in ["openpyxl", "fast"]:
+            result = TableHandler.from_path(path, engine=reader)
+            assert result.get_schema() == ["Qty", "Id", "Desc"]
+            assert len(result) == 3
+
+    def test_from_path_all(self, tmp_path, table):
+        path = tmp_path / "report.xlsx"
+        second = TableHandler.from_records([{"x": 1}], None, "Other")
+        ExcelHandler([table, second]).to_path(path)
+        labels = [handler.get_label() for handler in TableHandler.from_path_all(path)]
+        assert labels == ["Sheet", "Other"]
+
+    def test_table_missing_path(self, tmp_path):
+        with pytest.raises(TableHandlerError):
+            TableHandler.from_path(tmp_path / "missing.xlsx")
+
+    def test_docx_from_path(self, docx_path, tmp_path):
+        handler = DocxHandler.from_path(docx_path)
+        assert handler.name == "demo.docx"
+        assert handler.get_stat() == {"tables": 1, "paragraphs": 3}
+        handler.to_path(tmp_path / "copy.docx")
+        assert DocxHandler.stat_file_like((tmp_path / "copy.docx").read_bytes()) == (
+            handler.get_stat()
+        )
+
+    def test_docx_invalid_path(self, tmp_path):
+        path = tmp_path / "broken.docx"
+        path.write_bytes(b"broken")
+        with pytest.raises(DocxHandlerError):
+            DocxHandler.from_path(path)
+
+    def test_lazy_docx_from_path(self, docx_path, tmp_path):
+        handler = LazyDocxHandler.from_path(docx_path)
+        assert handler.to_byte() == docx_path.read_bytes()
+        assert handler.get_stat() == {"tables": 1, "paragraphs": 3}
+        handler.to_path(tmp_path / "copy.docx")
+        assert (tmp_path / "copy.docx").read_bytes() == docx_path.read_bytes()
+        assert not handler.is_loaded
+
+    def test_lazy_docx_close(self, docx_path):
+        with LazyDocxHandler.from_path(docx_path) as handler:
+            assert handler.get_stat() == {"tables": 1, "paragraphs": 3}
+        assert handler.source.closed
+
+    def test_write_to_local(self, docx_path, tmp_path):
+        DocxHandler.from_path(docx_path).write_to_local(str(tmp_path), "local.docx")
+        assert zip_contents((tmp_path / "local.docx").read_bytes()).keys() == (
+            zip_contents(docx_path.read_bytes()).keys()
+        )
@@ -0,0 +1,41 @@
+import pytest
+
+from xfilios.excel import ExcelHandler
+from xfilios.exceptions import FileTypeError, TableHandlerError
+from xfilios.formats import FileFormat, FORMATS, get_format, register_format
+from xfilios.html import create_download_link
+from xfilios.table import TableHandler
+
+
+class TestFormats:
+    @pytest.fixture
+    def subject(self):
+        register_format(FileFormat("tsv", "text/tab-separated-values", ".tsv"))
+        yield get_format("tsv")
+        FORMATS.pop("tsv")
+        FileTypeError.filetypes.remove("tsv")
+
+    def test_builtin_formats(self):
+        assert list(FORMATS)[:5] == ["docx", "xlsx", "csv", "parquet", "arrow"]
+        assert get_format("csv").mime_type == "text/csv"
+        assert FileTypeError.filetypes[:5] == ["docx", "xlsx", "csv", "parquet", "arrow"]
+
+    def test_registered_format_is_accepted(self, subject):
+        assert "tsv" in FileTypeError.filetypes
+        assert create_download_link("", "a.tsv", "tsv").endswith("Click To Download</a>")
+        with pytest.raises(TableHandlerError):
+            TableHandler.from_format(b"a\tb", "tsv")
+
+    def test_unknown_format(self):
+        with pytest.raises(FileTypeError) as error:
+            TableHandler.from_format(b"", "odt")
+        assert "csv" in error.value.filetypes
+
+    def test_from_format_bytes(self):
+        table = TableHandler.from_list([[1, "a"], [2, "b"]], ["id", "name"], "demo")
+        content = ExcelHandler([table]).to_bytes()
+        result = TableHandler.from_format(content, "xlsx")
+        assert result.get_label() == "demo"
+        assert result.get_data_as_records() == table.get_data_as_records()
+        csv = TableHandler.from_format(b"id,name\n1,a\n", "csv")
+        assert csv.get_data_as_records() == [{"id": 1, "name": "a"}]
@@ -0,0 +1,74 @@
+import asyncio
+import io
+
+import pytest
+
+from tests import create_demo_docx, get_records
+from xfilios import aio
+from xfilios.docx import DocxHandler
+from xfilios.excel import ExcelHandler
+from xfilios.handler import add_hook, record_stages, remove_hook, stage
+from xfilios.table import TableHandler
+
+
+class TestInstrumentation:
+    @pytest.fixture
+    def subject(self):
+        table = TableHandler.from_list(
+            data=list(get_records()), col_headers=["Qty", "Id", "Desc"], label="Sheet"
+        )
+        return ExcelHandler([table])
+
+    def test_record_stages(self, subject):
+        with record_stages() as stages:
+            subject.to_base64_str()
+        assert [timing.stage for timing in stages] == ["write_xlsx", "encode"]
+        assert all(timing.handler == "ExcelHandler" for timing in stages)
+        assert stages[0].size == stages[1].size > 0
+        assert all(timing.seconds >= 0 for timing in stages)
+
+    def test_native_stages(self, subject):
+        with record_stages() as stages:
+            subject.to_bytes(parallel=True)
+        assert [timing.stage for timing in stages] == ["render_sheet", "save_zip"]
+
+    def test_hook(self, subject):
+        received = []
+        add_hook(received.append)
+        try:
+            content = io.BytesIO(subject.to_bytes())
+            TableHandler.from_file_like(content)
+        finally:
+            remove_hook(received.append)
+        assert [timing.stage for timing in received] == ["write_xlsx", "parse"]
+        subject.to_bytes()
+        assert len(received) == 2
+
+    def test_docx_stages(self):
+        encoded = DocxHandler(create_demo_docx(), "demo.docx").to_base64_str()
+        with record_stages() as stages:
+            handler = DocxHandler.from_base64(encoded)
+            handler.write_base64(io.StringIO())
+        assert [timing.stage for timing in stages] == [
+            "decode",
+            "parse",
+            "save_zip",
+            "encode",
+        ]
+
+    def test_disabled_is_shared_noop(self):
+        assert stage("A", "x") is stage("B", "y")
+        with stage("A", "x") as record:
+            record.size = 10
+
+    def test_async_stages(self, subject):
+        async def main():
+            with record_stages() as stages:
+                await subject.ato_bytes()
+            return stages
+
+        try:
+            stages = asyncio.run(main())
+        finally:
+            aio.shutdown()
+        assert [timing.stage for timing in stages] == ["write_xlsx"]
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import xfilios
+from tests import create_demo_docx
+
+HEAVY = ["pandas", "numpy", "docx", "lxml", "openpyxl", "pyarrow", "asyncio"]
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter importing this xfilios"""
+    env = dict(os.environ)
+    source = os.path.dirname(os.path.dirname(xfilios.__file__))
+    env["PYTHONPATH"] = os.pathsep.join([source, env.get("PYTHONPATH", "")])
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def imported_after(code: str):
+    """Heavy top level packages in sys.modules after running code"""
+    check = f"import json, sys\nprint(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    return json.loads(run_python(f"{code}\n{check}").stdout.splitlines()[-1])
+
+
+class TestLazyImports:
+    @pytest.fixture
+    def docx_file(self, tmp_path):
+        path = tmp_path / "demo.docx"
+        create_demo_docx().save(str(path))
+        return path
+
+    @pytest.mark.parametrize(
+        "module", ["docx", "batch", "excel", "table", "tabular", "reader", "schema"]
+    )
+    def test_light_modules(self, module):
+        assert imported_after(f"import xfilios.{module}") == []
+
+    def test_light_package(self):
+        assert imported_after("import xfilios") == []
+
+    def test_excel_defers_openpyxl(self):
+        code = (
+            "from xfilios.excel import ExcelHandler\n"
+            "from xfilios.table import TableHandler\n"
+            "table = TableHandler.from_list([[1, 'a']], ['id', 'name'], 'demo')\n"
+            "ExcelHandler([table]).to_bytes(engine='native')"
+        )
+        assert "openpyxl" not in imported_after(code)
+
+    def test_lazy_docx_passthrough(self, docx_file):
+        code = (
+            "import xfilios\n"
+            f"handler = xfilios.LazyDocxHandler.from_path({str(docx_file)!r})\n"
+            "handler.to_base64_str()"
+        )
+        assert imported_after(code) == []
+
+    def test_exports_resolve(self):
+        for name in xfilios.__all__:
+            assert getattr(xfilios, name) is not None
+        with pytest.raises(AttributeError):
+            xfilios.NoSuchHandler
+
+    def test_import_time(self):
+        """Importing the docx handler takes a fraction of the time of importing pandas"""
+        stderr = run_python("import xfilios.docx; import pandas", "-X", "importtime").stderr
+        cumulative = {}
+        for line in stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, total, name = line.split("|")
+                if total.strip().isdigit():
+                    cumulative[name.strip()] = int(total)
+        assert cumulative["xfilios.docx"] < cumulative["pandas"] / 2
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from xfilios.exceptions import TableHandlerError
+from xfilios.schema import Column, Schema
+from xfilios.table import TableHandler
+
+
+class TestSchema:
+    @pytest.fixture
+    def schema(self):
+        return Schema(
+            [
+                Column("Id", dtype="int64", nullable=False, rename_from="id"),
+                Column("Price", dtype="float64", rename_from="price"),
+                Column("Active", dtype="bool", rename_from="active"),
+                Column("Name", dtype="string"),
+            ]
+        )
+
+    @pytest.fixture
+    def records(self):
+        return [
+            {"id": 1, "price": "1.5", "active": True, "Name": "a", "extra": 1},
+            {"id": "x", "price": 2, "active": "false", "Name": "b", "extra": 2},
+            {"id": None, "price": "free", "active": 0, "Name": "c", "extra": 3},
+        ]
+
+    def test_from_schema(self, schema, records):
+        subject = TableHandler.from_schema(records, schema=schema, label="demo")
+        df = subject.get_data_as_dataframe()
+        assert subject.get_schema() == ["Id", "Price", "Active", "Name"]
+        assert list(df.columns) == ["Id", "Price", "Active", "Name"]
+        assert str(df["Id"].dtype) == "Int64"
+        assert df["Price"].tolist()[0] == 1.5
+        assert df["Active"].tolist() == [True, False, False]
+
+    def test_validation_report(self, schema, records):
+        subject = TableHandler.from_schema(records, schema=schema, label="demo")
+        report = subject.get_validation_report()
+        assert not report.is_valid()
+        assert report.coercion_errors == {"Id": [1], "Price": [2]}
+        assert report.null_violations == {"Id": [2]}
+        assert report.invalid_rows() == [1, 2]
+
+    def test_missing_columns(self, schema):
+        subject = TableHandler.from_schema([{"id": 1}], schema=schema, label="demo")
+        report = subject.get_validation_report()
+        assert report.missing_columns == ["Price", "Active", "Name"]
+
+    def test_empty_column_is_not_missing(self):
+        schema = Schema([Column("a"), Column("b")])
+        df, report = schema.apply([{"a": 1, "b": None}, {"a": 2}])
+        assert report.missing_columns == []
+        assert df["b"].isna().all()
+
+    def test_rows(self, schema):
+        subject = TableHandler.from_schema(
+            [(1, 2.5, True, "a")], schema=schema, label="demo"
+        )
+        assert subject.get_validation_report().is_valid()
+        assert subject.get_data_as_records() == [
+            {"Id": 1, "Price": 2.5, "Active": True, "Name": "a"}
+        ]
+
+    @pytest.mark.parametrize(
+        "dtype,records,dtype_name",
+        [
+            ("int8", [{"a": 300}, {"a": 1}], "Int8"),
+            ("int8", [{"a": 300}, {"a": None}], "Int8"),
+            ("uint8", [{"a": -1}, {"a": 1}], "UInt8"),
+        ],
+    )
+    def test_integer_out_of_range(self, dtype, records, dtype_name):
+        df, report = Schema([Column("a", dtype=dtype)]).apply(records)
+        assert report.coercion_errors == {"a": [0]}
+        assert str(df["a"].dtype) == dtype_name
+        assert df["a"].tolist()[0] is pd.NA
+
+    def test_datetime_unit(self):
+        records = [{"a": "2024-01-02"}, {"a": "never"}]
+        df, report = Schema([Column("a", dtype="datetime64[s]")]).apply(records)
+        assert str(df["a"].dtype) == "datetime64[s]"
+        assert report.coercion_errors == {"a": [1]}
+
+    def test_duplicate_names(self):
+        with pytest.raises(TableHandlerError):
+            Schema([Column("a"), Column("a")])
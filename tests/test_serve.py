@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from tests import create_demo_docx, get_records
+from tests.test_docx import zip_contents
+from xfilios.docx import DocxHandler
+from xfilios.excel import ExcelHandler
+from xfilios.exceptions import FileTypeError
+from xfilios.formats import get_format
+from xfilios.serve import DownloadRegistry, asgi_app, wsgi_app
+from xfilios.table import TableHandler
+
+
+class TestDownloadRegistry:
+    @pytest.fixture
+    def subject(self):
+        return DownloadRegistry(ttl=60)
+
+    def test_register(self, subject):
+        token = subject.register(b"content", "report.xlsx", "xlsx")
+        assert token in subject and len(subject) == 1
+        download = subject.get(token)
+        assert download.size == 7
+        assert ("Content-Type", get_format("xlsx").mime_type) in download.headers()
+        assert b"".join(download.iter_chunks(3)) == b"content"
+
+    def test_expired(self):
+        registry = DownloadRegistry(ttl=0)
+        token = registry.register(b"content", "report.xlsx", "xlsx")
+        assert registry.get(token) is None
+        assert len(registry) == 0
+
+    def test_single_use(self):
+        registry = DownloadRegistry(single_use=True)
+        token = registry.register(b"content", "report.xlsx", "xlsx")
+        assert registry.get(token) is not None
+        assert registry.get(token) is None
+
+    def test_filetype(self, subject):
+        with pytest.raises(FileTypeError):
+            subject.register(b"content", "report.pdf", "pdf")
+
+
+class TestApps:
+    @pytest.fixture
+    def registry(self):
+        return DownloadRegistry()
+
+    def test_wsgi(self, registry):
+        token = registry.register(b"x" * 10, "report.xlsx", "xlsx")
+        app = wsgi_app(registry, chunk_size=4)
+        responses = []
+        body = app(
+            {"REQUEST_METHOD": "GET", "PATH_INFO": f"/downloads/{token}"},
+            lambda status, headers: responses.append((status, dict(headers))),
+        )
+        chunks = list(body)
+        status, headers = responses[0]
+        assert status == "200 OK"
+        assert headers["Content-Length"] == "10"
+        assert headers["Content-Disposition"].startswith('attachment; filename="report.xlsx"')
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+    def test_wsgi_not_found(self, registry):
+        responses = []
+        wsgi_app(registry)(
+            {"REQUEST_METHOD": "GET", "PATH_INFO": "/downloads/unknown"},
+            lambda status, headers: responses.append(status),
+        )
+        assert responses == ["404 Not Found"]
+
+    def test_wsgi_head_does_not_consume(self):
+        registry = DownloadRegistry(single_use=True)
+        token = registry.register(b"x" * 10, "report.xlsx", "xlsx")
+        app = wsgi_app(registry)
+        responses = []
+        for method in ("HEAD", "GET", "GET"):
+            body = app(
+                {"REQUEST_METHOD": method, "PATH_INFO": f"/downloads/{token}"},
+                lambda status, headers: responses.append(status),
+            )
+            list(body)
+        assert responses == ["200 OK", "200 OK", "404 Not Found"]
+
+    def test_asgi(self, registry):
+        token = registry.register(b"x" * 10, "report.docx", "docx")
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": f"/downloads/{token}"}
+        asyncio.run(asgi_app(registry, chunk_size=4)(scope, None, send))
+        assert messages[0]["status"] == 200
+        assert (b"content-type", get_format("docx").mime_type.encode()) in messages[0]["headers"]
+        assert b"".join(message["body"] for message in messages[1:]) == b"x" * 10
+        assert not messages[-1].get("more_body")
+
+    def test_asgi_head_does_not_consume(self):
+        registry = DownloadRegistry(single_use=True)
+        token = registry.register(b"x" * 10, "report.docx", "docx")
+        statuses = []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        app = asgi_app(registry)
+        for method in ("HEAD", "GET", "GET"):
+            scope = {"type": "http", "method": method, "path": f"/downloads/{token}"}
+            asyncio.run(app(scope, None, send))
+        assert statuses == [200, 200, 404]
+
+
+class TestCreateServedLink:
+    def test_small_file_is_inlined(self):
+        handler = DocxHandler(document=create_demo_docx(), name="demo.docx")
+        link = handler.create_served_link("demo.docx", base_url="/downloads")
+        assert link.startswith('<a href="data:application/octet-stream;base64,')
+
+    def test_large_file_is_served(self):
+        table = TableHandler.from_list(
+            data=list(get_records()), col_headers=["Qty", "Id", "Desc"], label="Sheet"
+        )
+        handler = ExcelHandler([table])
+        registry = DownloadRegistry()
+        link = handler.create_served_link(
+            "report.xlsx", "/downloads/", registry=registry, inline_max_bytes=0
+        )
+        token = link.split('href="/downloads/')[1].split('"')[0]
+        assert link.endswith('" download="report.xlsx">Click To Download</a>')
+        download = registry.get(token)
+        content = b"".join(download.iter_chunks())
+        assert zip_contents(content) == zip_contents(handler.to_bytes())
@@ -0,0 +1,187 @@
+import io
+
+import pandas as pd
+import pytest
+
+from xfilios.excel import ExcelHandler
+from xfilios.exceptions import TableHandlerError
+from xfilios.table import LazyTableHandler, TableHandler
+
+
+def generate_records(total: int):
+    return ({"id": i, "name": f"name-{i}"} for i in range(total))
+
+
+class TestTableHandler:
+    @pytest.fixture
+    def subject(self):
+        return TableHandler.from_records(
+            data=list(generate_records(5)), col_headers=None, label="demo"
+        )
+
+    def test_iter_chunks(self, subject):
+        sizes = [len(chunk) for chunk in subject.iter_chunks(2)]
+        assert sizes == [2, 2, 1]
+
+    def test_iter_records(self, subject):
+        assert list(subject.iter_records(2)) == subject.get_data_as_records()
+
+    def test_from_records_col_headers(self):
+        subject = TableHandler.from_records(
+            data=list(generate_records(2)),
+            col_headers={"name": "Name", "id": "Id"},
+            label="demo",
+        )
+        assert subject.get_schema() == ["Name", "Id"]
+        assert subject.get_data_as_records()[1] == {"Name": "name-1", "Id": 1}
+
+    def test_from_records_missing_col_header(self):
+        with pytest.raises(TableHandlerError):
+            TableHandler.from_records(
+                data=list(generate_records(2)),
+                col_headers={"id": "Id", "price": "Price"},
+                label="demo",
+            )
+
+
+class TestLazyTableHandler:
+    @pytest.fixture
+    def subject(self):
+        return LazyTableHandler.from_records(
+            data=lambda: generate_records(5), col_headers=None, label="demo"
+        )
+
+    def test_iter_chunks_does_not_load(self, subject):
+        chunks = list(subject.iter_chunks(2))
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert list(chunks[-1].index) == [4]
+        assert not subject.is_loaded()
+
+    def test_schema(self, subject):
+        assert subject.get_schema() == ["id", "name"]
+
+    def test_records_match_eager(self, subject):
+        eager = TableHandler.from_records(
+            data=list(generate_records(5)), col_headers=None, label="demo"
+        )
+        assert subject.get_data_as_records() == eager.get_data_as_records()
+        assert not subject.is_loaded()
+        assert len(subject) == 5
+
+    def test_col_headers(self):
+        handler = LazyTableHandler.from_list(
+            data=[(1, "a"), (2, "b")], col_headers=["Id", "Name"], label="demo"
+        )
+        assert list(handler.get_data_as_dataframe().columns) == ["Id", "Name"]
+
+    def test_iterator_source_read_once(self):
+        handler = LazyTableHandler.from_records(
+            data=generate_records(3), col_headers=None, label="demo"
+        )
+        assert handler.get_schema() == ["id", "name"]
+        assert len(list(handler.iter_records())) == 3
+        with pytest.raises(TableHandlerError):
+            list(handler.iter_records())
+
+
+class TestTableHandlerFromFileLike:
+    @pytest.fixture
+    def content(self):
+        tables = [
+            TableHandler.from_list(
+                data=[[i, f"{label}-{i}", i * 1.5] for i in range(10)],
+                col_headers=["id", "name", "value"],
+                label=label,
+            )
+            for label in ["first", "second", "third"]
+        ]
+        return io.BytesIO(ExcelHandler(tables).to_bytes())
+
+    def test_from_file_like(self, content):
+        subject = TableHandler.from_file_like(content)
+        assert subject.get_label() == "first"
+        assert subject.get_schema() == ["id", "name", "value"]
+        assert len(subject) == 10
+
+    def test_from_file_like_all(self, content):
+        subjects = TableHandler.from_file_like_all(content)
+        assert [subject.get_label() for subject in subjects] == [
+            "first",
+            "second",
+            "third",
+        ]
+
+    def test_from_file_like_all_selected(self, content):
+        subjects = TableHandler.from_file_like_all(
+            content, sheets=["third", 1], usecols=["id", "name"], nrows=4
+        )
+        assert [subject.get_label() for subject in subjects] == ["third", "second"]
+        assert subjects[0].get_schema() == ["id", "name"]
+        assert len(subjects[0]) == 4
+
+    def test_from_file_like_all_unknown_sheet(self, content):
+        with pytest.raises(TableHandlerError):
+            TableHandler.from_file_like_all(content, sheets=["missing"])
+
+    @pytest.mark.parametrize(
+        "options", [{}, {"usecols": ["id", "value"], "nrows": 3}, {"usecols": "A:B"}]
+    )
+    def test_fast_engine_matches_openpyxl(self, content, options):
+        expected = TableHandler.from_file_like_all(content, **options)
+        subjects = TableHandler.from_file_like_all(content, engine="fast", **options)
+        assert len(subjects) == len(expected)
+        for subject, table in zip(subjects, expected):
+            assert subject.get_label() == table.get_label()
+            assert subject.get_schema() == table.get_schema()
+            pd.testing.assert_frame_equal(
+                subject.get_data_as_dataframe(), table.get_data_as_dataframe()
+            )
+
+    def test_unknown_engine(self, content):
+        with pytest.raises(TableHandlerError):
+            TableHandler.from_file_like(content, engine="missing")
+
+
+class TestTableHandlerOptimizeMemory:
+    @pytest.fixture
+    def subject(self):
+        data = [
+            {"id": i, "price": i * 0.5, "status": ["open", "closed"][i % 2]}
+            for i in range(1000)
+        ]
+        return TableHandler.from_records(
+            data=data, col_headers=None, label="demo", optimize_memory=True
+        )
+
+    def test_dtypes(self, subject):
+        dtypes = subject.get_data_as_dataframe().dtypes
+        assert dtypes["id"] == "uint16"
+        assert dtypes["price"] == "float32"
+        assert dtypes["status"] == "category"
+
+    def test_values_unchanged(self, subject):
+        records = subject.get_data_as_records()
+        assert records[3] == {"id": 3, "price": 1.5, "status": "closed"}
+
+    def test_memory_report(self, subject):
+        report = subject.memory_report()
+        assert report["saved"] == report["before"] - report["after"]
+        assert report["saved"] > 0
+
+    def test_float_precision_kept(self):
+        subject = TableHandler.from_list(
+            data=[[0.1], [0.2]], col_headers=["value"], label="demo", optimize_memory=True
+        )
+        assert subject.get_data_as_dataframe()["value"].dtype == "float64"
+
+    def test_lazy_table(self):
+        subject = LazyTableHandler.from_list(
+            lambda: ((i, ["open", "closed"][i % 2]) for i in range(100)),
+            ["id", "status"],
+            "demo",
+        )
+        subject.optimize_memory()
+        assert subject.is_loaded()
+        assert subject.get_data_as_dataframe()["status"].dtype == "category"
+        assert len(subject) == 100
+        assert subject.memory_report()["saved"] > 0
@@ -0,0 +1,83 @@
+import io
+
+import pandas as pd
+import pytest
+
+from tests import get_records
+from xfilios.handler import record_stages
+from xfilios.table import LazyTableHandler, TableHandler
+from xfilios.tabular import ArrowHandler, CsvHandler, ParquetHandler
+
+
+@pytest.fixture
+def table():
+    return TableHandler.from_list(
+        data=list(get_records()), col_headers=["Qty", "Id", "Desc"], label="Sheet"
+    )
+
+
+class TestCsvHandler:
+    @pytest.fixture
+    def subject(self, table):
+        return CsvHandler(table, chunk_size=2)
+
+    def test_to_bytes(self, subject):
+        content = subject.to_bytes().decode("utf-8")
+        assert content.splitlines() == [
+            "Qty,Id,Desc",
+            "3,101,Spam",
+            "7,422,Eggs",
+            '4,631,"Spam, spam, eggs, and spam"',
+        ]
+
+    def test_round_trip(self, subject, table):
+        result = TableHandler.from_csv(subject.to_bytes(), label="Back", dtype={"Id": str})
+        assert result.get_label() == "Back"
+        assert result.get_data_as_records() == table.get_data_as_records()
+
+    def test_lazy_table_is_streamed(self, table):
+        lazy = LazyTableHandler.from_list(list(get_records()), ["Qty", "Id", "Desc"], "Sheet")
+        content = CsvHandler(lazy, chunk_size=1, sep=";").to_bytes()
+        assert not lazy.is_loaded()
+        assert content.decode("utf-8").splitlines()[1] == "3;101;Spam"
+
+    def test_to_path(self, subject, tmp_path):
+        path = tmp_path / "table.csv"
+        subject.to_path(path)
+        assert path.read_bytes() == subject.to_bytes()
+        assert len(TableHandler.from_csv(path)) == 3
+
+    def test_create_download_link(self, subject):
+        with record_stages() as stages:
+            link = subject.create_download_link("table.csv")
+        assert link.endswith('download="table.csv">Click To Download</a>')
+        assert [timing.stage for timing in stages] == ["write_csv", "encode"]
+
+
+class TestColumnarHandlers:
+    @pytest.fixture(autouse=True)
+    def pyarrow(self):
+        return pytest.importorskip("pyarrow")
+
+    @pytest.mark.parametrize(
+        "handler, reader",
+        [(ParquetHandler, TableHandler.from_parquet), (ArrowHandler, TableHandler.from_arrow)],
+    )
+    def test_round_trip(self, table, handler, reader):
+        content = handler(table).to_bytes()
+        result = reader(content)
+        pd.testing.assert_frame_equal(
+            result.get_data_as_dataframe(), table.get_data_as_dataframe()
+        )
+        subset = reader(io.BytesIO(content), usecols=["Desc"], nrows=2)
+        assert subset.get_schema() == ["Desc"]
+        assert len(subset) == 2
+
+    def test_arrow_path_is_mapped(self, table, tmp_path):
+        path = tmp_path / "table.arrow"
+        ArrowHandler(table, codec="zstd").to_path(path)
+        assert TableHandler.from_arrow(path).get_schema() == ["Qty", "Id", "Desc"]
+
+    def test_parquet_codec(self, table):
+        content = ParquetHandler(table, codec=None).to_bytes()
+        assert len(TableHandler.from_format(content, "parquet")) == 3